@@ -2,16 +2,36 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.core.database import get_db
-from app.models.restaurant import Cuisine
+from app.models.restaurant import Cuisine, Restaurant, RestaurantCuisine
 from app.schemas.cuisine import CuisineCreate, CuisineUpdate, CuisineResponse
+from app.services import destination_snapshot
+from app.services.catalogue_sync import on_catalogue_changed
+from app.utils import http_cache
 
 router = APIRouter()
 
+
+async def _region_ids_serving(db: AsyncSession, cuisine_id: int) -> set:
+    """Các vùng có nhà hàng bán cuisine này (tên cuisine nằm trong chỉ mục / context AI của vùng)."""
+    result = await db.execute(
+        select(Restaurant.region_id)
+        .join(RestaurantCuisine, RestaurantCuisine.restaurant_id == Restaurant.id)
+        .where(RestaurantCuisine.cuisine_id == cuisine_id)
+        .distinct()
+    )
+    return set(result.scalars().all())
+
+
 # GET ALL
 @router.get("/cuisines", response_model=list[CuisineResponse])
-async def get_cuisines(db: AsyncSession = Depends(get_db)):
+async def get_cuisines(
+    cache: http_cache.CachedResponse = Depends(http_cache.cached("cuisines")),
+    db: AsyncSession = Depends(get_db)
+):
+    if (hit := cache.cached()) is not None:
+        return hit
     result = await db.execute(select(Cuisine).order_by(Cuisine.id))
-    return result.scalars().all()
+    return cache.respond(result.scalars().all(), model=list[CuisineResponse])
 
 # CREATE
 @router.post("/cuisines", response_model=CuisineResponse)
@@ -24,6 +44,7 @@ async def create_cuisine(item: CuisineCreate, db: AsyncSession = Depends(get_db)
     new_cuisine = Cuisine(name=item.name)
     db.add(new_cuisine)
     await db.commit()
+    http_cache.bump("cuisines")
     await db.refresh(new_cuisine)
     return new_cuisine
 
@@ -35,8 +56,12 @@ async def update_cuisine(id: int, item: CuisineUpdate, db: AsyncSession = Depend
     if not cuisine:
         raise HTTPException(404, "Not found")
 
+    region_ids = await _region_ids_serving(db, id)
     cuisine.name = item.name
     await db.commit()
+    http_cache.bump("cuisines") # Tên cuisine cũng nằm trong danh sách nhà hàng
+    destination_snapshot.invalidate_all()
+    await on_catalogue_changed(db, region_ids)
     await db.refresh(cuisine)
     return cuisine
 
@@ -48,6 +73,10 @@ async def delete_cuisine(id: int, db: AsyncSession = Depends(get_db)):
     if not cuisine:
         raise HTTPException(404, "Not found")
 
+    region_ids = await _region_ids_serving(db, id)
     await db.delete(cuisine)
     await db.commit()
+    http_cache.bump("cuisines")
+    destination_snapshot.invalidate_all()
+    await on_catalogue_changed(db, region_ids)
     return {"message": "Deleted"}
\ No newline at end of file
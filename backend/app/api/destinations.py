@@ -1,34 +1,81 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
 from app.core.database import get_db
-from app.models.region import Region
-from app.models.restaurant import Restaurant, RestaurantCuisine # Cần import các model này
-from app.schemas.destinations import DestinationDetail 
+from app.schemas.destinations import DestinationDetail
+from app.services import destination_snapshot
+from app.utils import http_cache
+from app.utils.pagination import cursor_value_ok, encode_keyset, decode_keyset
 
 router = APIRouter()
 
+# Tài nguyên mà response phụ thuộc (bump ở các API ghi tương ứng)
+_RESOURCES = ("regions", "hotels", "restaurants", "places", "cuisines")
+
+
 @router.get("/{region_id}", response_model=DestinationDetail)
-async def get_destination_detail(region_id: int, db: AsyncSession = Depends(get_db)):
-    # Sử dụng selectinload để tải dữ liệu phân tầng hiệu quả trong Async
-    query = (
-        select(Region)
-        .options(
-            selectinload(Region.hotels),
-            selectinload(Region.spots),
-            # Tải Restaurant -> RestaurantCuisine -> Cuisine (để lấy tên món ăn)
-            selectinload(Region.restaurants)
-                .selectinload(Restaurant.cuisines_data)
-                .selectinload(RestaurantCuisine.cuisine)
-        )
-        .where(Region.id == region_id)
-    )
-    
-    result = await db.execute(query)
-    region = result.scalar_one_or_none() 
-    
-    if not region:
+async def get_destination_detail(
+    region_id: int,
+    mode: Literal["full", "summary"] = Query("full", description="summary: số lượng + top-N mỗi phần"),
+    cache: http_cache.CachedResponse = Depends(http_cache.cached(*_RESOURCES)),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Thông tin điểm đến. mode=summary trả về snapshot dựng sẵn của vùng (không truy vấn DB
+    cho tới khi catalogue của vùng thay đổi); mode=full trả về mọi mục như trước,
+    trang lớn nên dùng GET /{region_id}/{section} để phân trang từng phần.
+    """
+    if (hit := cache.cached()) is not None:
+        return hit
+
+    snapshot = await destination_snapshot.get_snapshot(db, region_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Không tìm thấy thông tin điểm đến này.")
+
+    data = dict(snapshot)
+    if mode == "full":
+        for section in destination_snapshot.SECTIONS:
+            data[section], _ = await destination_snapshot.fetch_section(db, region_id, section)
+    return cache.respond(data)
+
+
+@router.get("/{region_id}/{section}")
+async def get_destination_section(
+    region_id: int,
+    section: Literal["hotels", "restaurants", "spots"],
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Giá trị header X-Next-Cursor của trang trước"),
+    cache: http_cache.CachedResponse = Depends(http_cache.cached(*_RESOURCES)),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Một trang hotels / restaurants / spots của vùng, rating cao trước.
+    Nếu còn trang sau, cursor của trang đó nằm trong header X-Next-Cursor.
+    """
+    if (hit := cache.cached()) is not None:
+        return hit
+
+    after = None
+    if cursor:
+        try:
+            cursor_section, rating, last_id = decode_keyset(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Cursor không hợp lệ")
+        if cursor_section != section:
+            raise HTTPException(status_code=400, detail="Cursor không thuộc phần này")
+        model = destination_snapshot.SECTIONS[section][0]
+        if not cursor_value_ok(model.rating, rating) or not cursor_value_ok(model.id, last_id):
+            raise HTTPException(status_code=400, detail="Cursor không hợp lệ")
+        after = (rating, last_id)
+
+    # Snapshot đã cache: kiểm tra vùng tồn tại mà không tốn thêm truy vấn
+    if await destination_snapshot.get_snapshot(db, region_id) is None:
         raise HTTPException(status_code=404, detail="Không tìm thấy thông tin điểm đến này.")
-    
-    return region
\ No newline at end of file
+
+    items, next_after = await destination_snapshot.fetch_section(db, region_id, section, limit=limit, after=after)
+
+    headers = {}
+    if next_after is not None:
+        headers["X-Next-Cursor"] = encode_keyset(section, *next_after)
+    return cache.respond(items, headers=headers)
@@ -0,0 +1,53 @@
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.services.facet_service import get_facets
+from app.utils import http_cache
+
+router = APIRouter()
+
+
+@router.get("/facets/{kind}")
+async def get_catalogue_facets(
+    kind: Literal["hotels", "restaurants", "places"],
+    region_id: Optional[int] = None,
+    tags: Optional[List[str]] = Query(None, description="Phải có đủ mọi tag"),
+    cuisine_ids: Optional[List[int]] = Query(None, description="Chỉ restaurants: phải có đủ mọi cuisine"),
+    min_price: Optional[int] = Query(None, ge=0),
+    max_price: Optional[int] = Query(None, ge=0),
+    min_rating: Optional[float] = Query(None, ge=0),
+    is_active: Literal["true", "false", "all"] = Query("true", description="true: chỉ mục đang hiện, false: chỉ mục đã ẩn, all: cả hai"),
+    price_edges: Optional[str] = Query(None, description="Mốc chia khoảng giá, ví dụ 100000,200000,500000"),
+    cache: http_cache.CachedResponse = Depends(http_cache.cached("hotels", "restaurants", "places", "cuisines")),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Số lượng theo tag, khoảng giá, khoảng rating (và cuisine với restaurants) cho bộ lọc hiện tại,
+    để panel bộ lọc không phải tải cả danh sách. Khoảng giá / rating được đếm khi bỏ qua
+    bộ lọc giá / rating của chính nó.
+    """
+    if (hit := cache.cached()) is not None:
+        return hit
+
+    edges = None
+    if price_edges:
+        try:
+            edges = [int(v) for v in price_edges.split(",") if v.strip()]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="price_edges phải là các số nguyên cách nhau bởi dấu phẩy")
+        if not edges or len(edges) > 20:
+            raise HTTPException(status_code=400, detail="price_edges cần từ 1 đến 20 mốc")
+
+    filters = {
+        "region_id": region_id,
+        "tags": tags,
+        "cuisine_ids": cuisine_ids,
+        "min_price": min_price,
+        "max_price": max_price,
+        "min_rating": min_rating,
+        "is_active": is_active,
+    }
+    return cache.respond(await get_facets(db, kind, filters, price_edges=edges))
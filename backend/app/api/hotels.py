@@ -1,15 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from typing import List, Literal, Optional
 import json
 
 from app.core.database import get_db
 from app.models.hotel import Hotel
 from app.schemas.hotel import HotelCreate, HotelUpdate
 from app.models.region import Region
+from app.services.catalogue_sync import on_catalogue_changed
+from app.utils import http_cache
+from app.utils.pagination import cursor_value_ok, encode_keyset, decode_keyset, keyset_page
 
 router = APIRouter()
 
+# Các trường có thể chọn qua ?fields= (mặc định: tất cả)
+HOTEL_FIELDS = {c.key: c for c in Hotel.__table__.columns}
+LISTING_FIELDS = [*HOTEL_FIELDS, "region_name"]
+
 # =========================
 # GET ALL
 # =========================
@@ -22,24 +30,95 @@ async def get_hotel(
         select(Hotel).where(Hotel.id == hotel_id)
     )
     hotel = result.scalar_one_or_none()
-    return hotel
+    if hotel is None:
+        return None
+    return {f: getattr(hotel, f) for f in HOTEL_FIELDS}
+
+# sort -> (cột sắp xếp, giảm dần?); mỗi kiểu có index (cột, id) tương ứng trong model
+HOTEL_SORTS = {
+    "id": (Hotel.id, False),
+    "price_asc": (Hotel.price_per_night, False),
+    "price_desc": (Hotel.price_per_night, True),
+    "rating": (Hotel.rating, True),
+    "name": (Hotel.name, False),
+}
+
+
+def _parse_fields(fields: Optional[str]) -> list:
+    if not fields:
+        return LISTING_FIELDS
+    selected = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in selected if f not in LISTING_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Trường không hợp lệ: {', '.join(unknown)}. Cho phép: {', '.join(LISTING_FIELDS)}"
+        )
+    return selected
 
-@router.get("/hotels")
-async def get_hotels(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(
-        select(Hotel, Region.name.label("region_name"))
-        .join(Region, Hotel.region_id == Region.id)
-    )
 
-    rows = result.all()
+@router.get("/hotels")
+async def get_hotels(
+    response: Response,
+    region_id: Optional[int] = None,
+    min_price: Optional[int] = Query(None, ge=0),
+    max_price: Optional[int] = Query(None, ge=0),
+    min_rating: Optional[float] = Query(None, ge=0),
+    tags: Optional[List[str]] = Query(None, description="Khách sạn phải có đủ mọi tag"),
+    is_active: Optional[bool] = None,
+    sort: Literal["id", "price_asc", "price_desc", "rating", "name"] = "id",
+    fields: Optional[str] = Query(None, description="Danh sách trường cách nhau bởi dấu phẩy, ví dụ id,name,price_per_night"),
+    limit: int = Query(50, ge=1, le=200, description="Số khách sạn mỗi trang"),
+    all_items: bool = Query(False, alias="all", description="true: bỏ phân trang, trả về mọi khách sạn (trang quản trị)"),
+    cursor: Optional[str] = Query(None, description="Giá trị header X-Next-Cursor của trang trước"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Danh sách khách sạn có lọc, sắp xếp, chọn trường và phân trang keyset.
+    Nếu còn trang sau, cursor của trang đó nằm trong header X-Next-Cursor.
+    Mặc định trả về từng trang `limit` khách sạn; ?all=true trả về tất cả trong một response.
+    """
+    if all_items:
+        limit = None
+    selected = _parse_fields(fields)
+    sort_col, descending = HOTEL_SORTS[sort]
+
+    after = None
+    if cursor:
+        try:
+            cursor_sort, value, last_id = decode_keyset(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Cursor không hợp lệ")
+        if cursor_sort != sort:
+            raise HTTPException(status_code=400, detail="Cursor không thuộc kiểu sắp xếp này")
+        if not cursor_value_ok(sort_col, value) or not cursor_value_ok(Hotel.id, last_id):
+            raise HTTPException(status_code=400, detail="Cursor không hợp lệ")
+        after = (value, last_id)
+
+    columns = [HOTEL_FIELDS[f] for f in selected if f in HOTEL_FIELDS]
+    stmt = select(*columns).select_from(Hotel).join(Region, Hotel.region_id == Region.id)
+    if "region_name" in selected:
+        stmt = stmt.add_columns(Region.name.label("region_name"))
+
+    if region_id is not None:
+        stmt = stmt.where(Hotel.region_id == region_id)
+    if min_price is not None:
+        stmt = stmt.where(Hotel.price_per_night >= min_price)
+    if max_price is not None:
+        stmt = stmt.where(Hotel.price_per_night <= max_price)
+    if min_rating is not None:
+        stmt = stmt.where(Hotel.rating >= min_rating)
+    if tags:
+        stmt = stmt.where(Hotel.tags.contains(tags))  # @> dùng GIN index
+    if is_active is not None:
+        stmt = stmt.where(Hotel.is_active == is_active)
+
+    rows, next_after = await keyset_page(db, stmt, sort_col, Hotel.id, descending, after=after, limit=limit)
+    if next_after is not None:
+        response.headers["X-Next-Cursor"] = encode_keyset(sort, *next_after)
+
+    return [{f: row._mapping[f] for f in selected} for row in rows]
 
-    return [
-        {
-            **hotel.__dict__,
-            "region_name": region_name
-        }
-        for hotel, region_name in rows
-    ]
 # =========================
 # CREATE
 # =========================
@@ -59,6 +138,8 @@ async def create_hotel(
     db.add(hotel)
     await db.commit()
     await db.refresh(hotel)
+    http_cache.bump("hotels")
+    await on_catalogue_changed(db, {hotel.region_id})
 
     return {"message": "Tạo khách sạn thành công", "id": hotel.id}
 
@@ -79,6 +160,7 @@ async def update_hotel(
     if not hotel:
         raise HTTPException(status_code=404, detail="Không tìm thấy khách sạn")
 
+    old_region_id = hotel.region_id
     data = hotel_in.model_dump(exclude_unset=True)
 
     if "image_urls" in data:
@@ -92,6 +174,8 @@ async def update_hotel(
 
     await db.commit()
     await db.refresh(hotel)
+    http_cache.bump("hotels")
+    await on_catalogue_changed(db, {old_region_id, hotel.region_id})
 
     return {"message": "Cập nhật thành công"}
 
@@ -112,7 +196,10 @@ async def delete_hotel(
     if not hotel:
         raise HTTPException(status_code=404, detail="Không tìm thấy khách sạn")
 
+    region_id = hotel.region_id
     await db.delete(hotel)
     await db.commit()
+    http_cache.bump("hotels")
+    await on_catalogue_changed(db, {region_id})
 
     return {"message": "Đã xóa khách sạn"}
@@ -0,0 +1,68 @@
+import tempfile
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.dependencies import get_current_admin
+from app.services import catalogue_import
+from app.services.catalogue_sync import on_catalogue_changed
+from app.utils import http_cache
+
+router = APIRouter()
+
+# Phần body giữ trong RAM trước khi tràn ra file tạm
+_SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+
+
+@router.post("/import/refresh")
+async def refresh_after_import(
+    kinds: List[Literal["hotels", "restaurants", "places"]] = Query(...),
+    region_ids: List[int] = Query(...),
+    db: AsyncSession = Depends(get_db),
+    admin=Depends(get_current_admin)
+):
+    """
+    Làm mới cache HTTP và dữ liệu dẫn xuất (chỉ mục tìm kiếm AI, context AI, cache lịch trình)
+    sau khi dữ liệu được nhập ngoài server, vd bằng scripts/import_catalogue.py.
+    Cache nằm trong bộ nhớ của worker nhận request; worker khác tự làm mới theo HTTP_CACHE_TTL_SECONDS.
+    """
+    http_cache.bump(*kinds)
+    await on_catalogue_changed(db, set(region_ids))
+    return {"message": "Đã làm mới", "kinds": kinds, "region_ids": sorted(set(region_ids))}
+
+
+@router.post("/import/{kind}")
+async def import_catalogue(
+    kind: Literal["hotels", "restaurants", "places"],
+    request: Request,
+    format: Optional[Literal["csv", "jsonl", "xlsx"]] = Query(None, description="Bỏ trống để đoán từ Content-Type"),
+    db: AsyncSession = Depends(get_db),
+    admin=Depends(get_current_admin)
+):
+    """
+    Nhập hàng loạt: body là nội dung file CSV / JSONL / XLSX (không dùng multipart).
+    Ví dụ: curl -X POST --data-binary @hotels.csv -H "Content-Type: text/csv" .../api/import/hotels
+    Trả về số dòng đã nhập và danh sách lỗi theo từng dòng.
+    """
+    fmt = format or catalogue_import.detect_format(request.headers.get("content-type"))
+    if fmt is None:
+        raise HTTPException(status_code=400, detail="Không xác định được định dạng, hãy truyền ?format=csv|jsonl|xlsx")
+
+    with tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_MEMORY) as spool:
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > settings.IMPORT_MAX_BYTES:
+                raise HTTPException(status_code=413, detail="File nhập quá lớn")
+            spool.write(chunk)
+        spool.seek(0)
+
+        report = await catalogue_import.import_records(db, kind, catalogue_import.iter_records(spool, fmt))
+
+    if report["inserted"]:
+        http_cache.bump(kind)
+        await on_catalogue_changed(db, report["region_ids"])
+    return report
@@ -0,0 +1,42 @@
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.services.geo_service import GEO_KINDS, find_nearby, get_coordinates
+
+router = APIRouter()
+
+
+@router.get("/nearby")
+async def get_nearby(
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lng: Optional[float] = Query(None, ge=-180, le=180),
+    from_kind: Optional[Literal["hotel", "restaurant", "place"]] = Query(None, description="Tìm quanh một mục có sẵn thay cho lat/lng"),
+    from_id: Optional[int] = None,
+    types: Optional[List[Literal["hotel", "restaurant", "place"]]] = Query(None, description="Mặc định: cả 3 loại"),
+    radius_m: Optional[float] = Query(None, gt=0, le=50000, description="Bán kính (mét); bỏ trống = k mục gần nhất"),
+    k: int = Query(20, ge=1, le=100),
+    region_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Hotel / restaurant / place gần một điểm, sắp theo khoảng cách.
+    VD: nhà hàng trong bán kính 1 km quanh khách sạn 5:
+    /api/nearby?from_kind=hotel&from_id=5&types=restaurant&radius_m=1000
+    """
+    exclude = None
+    if from_kind is not None or from_id is not None:
+        if from_kind is None or from_id is None:
+            raise HTTPException(status_code=400, detail="Cần cả from_kind và from_id")
+        coords = await get_coordinates(db, from_kind, from_id)
+        if coords is None:
+            raise HTTPException(status_code=404, detail="Không tìm thấy mục hoặc mục chưa có toạ độ")
+        lat, lng = coords
+        exclude = (from_kind, from_id)
+    elif lat is None or lng is None:
+        raise HTTPException(status_code=400, detail="Cần lat/lng hoặc from_kind/from_id")
+
+    kinds = tuple(dict.fromkeys(types)) if types else GEO_KINDS
+    return await find_nearby(db, lat, lng, kinds, radius_m=radius_m, k=k, region_id=region_id, exclude=exclude)
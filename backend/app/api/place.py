@@ -6,6 +6,8 @@ from sqlalchemy import select
 from app.core.database import get_db
 from app.models.place import Place
 from app.schemas.place import PlaceCreate, PlaceUpdate, PlaceResponse
+from app.services.catalogue_sync import on_catalogue_changed
+from app.utils import http_cache
 
 router = APIRouter(prefix="/places", tags=["Places"])
 
@@ -16,8 +18,12 @@ router = APIRouter(prefix="/places", tags=["Places"])
 async def get_places(
     region_id: int | None = None,
     place_type: str | None = None,
+    cache: http_cache.CachedResponse = Depends(http_cache.cached("places")),
     db: AsyncSession = Depends(get_db)
 ):
+    if (hit := cache.cached()) is not None:
+        return hit
+
     query = select(Place)
 
     if region_id:
@@ -26,18 +32,24 @@ async def get_places(
         query = query.where(Place.place_type == place_type)
 
     result = await db.execute(query.order_by(Place.id.desc()))
-    return result.scalars().all()
+    return cache.respond(result.scalars().all(), model=list[PlaceResponse])
 
 # =========================
 # GET DETAIL
 # =========================
 @router.get("/{id}", response_model=PlaceResponse)
-async def get_place(id: int, db: AsyncSession = Depends(get_db)):
+async def get_place(
+    id: int,
+    cache: http_cache.CachedResponse = Depends(http_cache.cached("places")),
+    db: AsyncSession = Depends(get_db)
+):
+    if (hit := cache.cached()) is not None:
+        return hit
     result = await db.execute(select(Place).where(Place.id == id))
     place = result.scalar_one_or_none()
     if not place:
         raise HTTPException(404, "Place not found")
-    return place
+    return cache.respond(place, model=PlaceResponse)
 
 # =========================
 # CREATE
@@ -48,6 +60,8 @@ async def create_place(item: PlaceCreate, db: AsyncSession = Depends(get_db)):
     db.add(place)
     await db.commit()
     await db.refresh(place)
+    http_cache.bump("places")
+    await on_catalogue_changed(db, {place.region_id})
     return place
 
 # =========================
@@ -60,11 +74,14 @@ async def update_place(id: int, item: PlaceUpdate, db: AsyncSession = Depends(ge
     if not place:
         raise HTTPException(404, "Place not found")
 
+    old_region_id = place.region_id
     for k, v in item.model_dump().items():
         setattr(place, k, v)
 
     await db.commit()
     await db.refresh(place)
+    http_cache.bump("places")
+    await on_catalogue_changed(db, {old_region_id, place.region_id})
     return place
 
 # =========================
@@ -77,6 +94,9 @@ async def delete_place(id: int, db: AsyncSession = Depends(get_db)):
     if not place:
         raise HTTPException(404, "Place not found")
 
+    region_id = place.region_id
     await db.delete(place)
     await db.commit()
+    http_cache.bump("places")
+    await on_catalogue_changed(db, {region_id})
     return {"message": "Deleted"}
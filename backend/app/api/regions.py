@@ -4,13 +4,20 @@ from sqlalchemy import select
 from app.core.database import get_db
 from app.models.region import Region
 from app.schemas.region import RegionCreate, RegionUpdate, RegionResponse
+from app.services.catalogue_sync import on_regions_changed
+from app.utils import http_cache
 
 router = APIRouter()
 
 @router.get("/regions", response_model=list[RegionResponse]) # Thêm response_model
-async def get_regions(db: AsyncSession = Depends(get_db)):
+async def get_regions(
+    cache: http_cache.CachedResponse = Depends(http_cache.cached("regions")),
+    db: AsyncSession = Depends(get_db)
+):
+    if (hit := cache.cached()) is not None:
+        return hit
     result = await db.execute(select(Region).order_by(Region.id.asc())) # asc để hiện đúng thứ tự
-    return result.scalars().all()
+    return cache.respond(result.scalars().all(), model=list[RegionResponse])
 
 @router.post("/regions")
 async def create_region(data: RegionCreate, db: AsyncSession = Depends(get_db)):
@@ -18,6 +25,8 @@ async def create_region(data: RegionCreate, db: AsyncSession = Depends(get_db)):
     db.add(region)
     await db.commit()
     await db.refresh(region)
+    http_cache.bump("regions")
+    await on_regions_changed(db, {region.id})
     return region
 
 @router.put("/regions/{region_id}")
@@ -32,6 +41,8 @@ async def update_region(region_id: int, data: RegionUpdate, db: AsyncSession = D
         setattr(region, field, value)
 
     await db.commit()
+    http_cache.bump("regions")
+    await on_regions_changed(db, {region_id})
     return {"message": "Cập nhật thành công"}
 
 @router.delete("/regions/{region_id}")
@@ -44,10 +55,20 @@ async def delete_region(region_id: int, db: AsyncSession = Depends(get_db)):
 
     await db.delete(region)
     await db.commit()
+    # Xoá vùng kéo theo (CASCADE) hotel / restaurant / place của vùng đó
+    http_cache.bump("regions", "hotels", "restaurants", "places")
+    await on_regions_changed(db, {region_id})
     return {"message": "Xóa vùng thành công"}
 
 @router.get("/regions/{region_id}", response_model=RegionResponse)
-async def get_region_detail(region_id: int, db: AsyncSession = Depends(get_db)):
+async def get_region_detail(
+    region_id: int,
+    cache: http_cache.CachedResponse = Depends(http_cache.cached("regions")),
+    db: AsyncSession = Depends(get_db)
+):
+    if (hit := cache.cached()) is not None:
+        return hit
+
     # 1. Thực hiện truy vấn lấy thông tin chi tiết vùng theo ID
     result = await db.execute(
         select(Region).where(Region.id == region_id)
@@ -62,4 +83,4 @@ async def get_region_detail(region_id: int, db: AsyncSession = Depends(get_db)):
         )
 
     # 3. Trả về thông tin vùng (bao gồm name, image_url,...)
-    return region
\ No newline at end of file
+    return cache.respond(region, model=RegionResponse)
\ No newline at end of file
@@ -1,69 +1,52 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from sqlalchemy.orm import selectinload
 
 from app.core.database import get_db
-from app.models.restaurant import Restaurant, RestaurantCuisine, Cuisine
-from app.models.region import Region
+from app.models.restaurant import Restaurant
 from app.schemas.restaurant import RestaurantCreate, RestaurantUpdate
+from app.services.catalogue_sync import on_catalogue_changed
+from app.services import restaurant_listing
+from app.services.restaurant_cuisines import sync_cuisines
+from app.utils import http_cache
+from app.utils.pagination import encode_keyset, decode_keyset
 
 router = APIRouter()
 
-# --- HELPER: Lấy danh sách Loại ẩm thực (để hiện Dropdown) ---
-@router.get("/cuisines")
-async def get_all_cuisines(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Cuisine))
-    return result.scalars().all()
-
 # --- GET ALL RESTAURANTS ---
 @router.get("/restaurants")
-async def get_restaurants(db: AsyncSession = Depends(get_db)):
-    # Query nhà hàng + tên vùng + load relationship cuisines
-    query = (
-        select(Restaurant, Region.name.label("region_name"))
-        .join(Region, Restaurant.region_id == Region.id)
-        .options(
-            selectinload(Restaurant.cuisines_data).selectinload(RestaurantCuisine.cuisine)
-        )
-        .order_by(Restaurant.id.desc())
-    )
-    result = await db.execute(query)
-    rows = result.all()
+async def get_restaurants(
+    region_id: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=200, description="Số nhà hàng mỗi trang; bỏ trống để lấy tất cả"),
+    cursor: Optional[str] = Query(None, description="Giá trị header X-Next-Cursor của trang trước"),
+    cache: http_cache.CachedResponse = Depends(http_cache.cached("restaurants", "cuisines", "regions")),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Danh sách nhà hàng (kèm tên vùng và các món), mới nhất trước.
+    Có ETag / Last-Modified: client đã có bản hiện tại -> 304 mà không truy vấn DB;
+    bytes response theo từng (region_id, limit, cursor) được giữ sẵn tới khi catalogue thay đổi.
+    """
+    if (hit := cache.cached()) is not None:
+        return hit
+
+    after_id = None
+    if cursor:
+        try:
+            tag, after_id = decode_keyset(cursor)
+            after_id = int(after_id)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Cursor không hợp lệ")
+        if tag != "restaurants":
+            raise HTTPException(status_code=400, detail="Cursor không hợp lệ")
+
+    data, next_id = await restaurant_listing.fetch_listing(db, region_id, limit, after_id)
 
-    # Map data sang format Response
-    data = []
-    for r, region_name in rows:
-        r_dict = {
-    "id": r.id,
-    "region_id": r.region_id,
-    "name": r.name,
-    "description": r.description,
-    "address": r.address,
-    "map_url": r.map_url,
-    "rating": r.rating,
-    "image_urls": r.image_urls or [],
-    "tags": r.tags or [],
-    "is_active": r.is_active,
-    "created_at": r.created_at,
-}
-        r_dict["region_name"] = region_name
-        # Map cuisines_data để lấy tên cuisine
-        mapped_cuisines = []
-        for rc in r.cuisines_data:
-            mapped_cuisines.append({
-                "id": rc.id,
-                "cuisine_id": rc.cuisine_id,
-                "cuisine_name": rc.cuisine.name if rc.cuisine else "Unknown",
-                "description": rc.description,
-                "average_price": rc.average_price,
-                "price_range": rc.price_range,
-                "is_available": rc.is_available,
-                "image_url": rc.image_url,
-            })
-        r_dict["cuisines_data"] = mapped_cuisines
-        data.append(r_dict)
-    return data
+    headers = {}
+    if next_id is not None:
+        headers["X-Next-Cursor"] = encode_keyset("restaurants", next_id)
+    return cache.respond(data, headers=headers)
 
 # --- CREATE ---
 @router.post("/restaurants")
@@ -75,48 +58,39 @@ async def create_restaurant(item_in: RestaurantCreate, db: AsyncSession = Depend
     db.add(restaurant)
     await db.flush() # Để lấy ID restaurant vừa tạo
 
-    # 2. Tạo các RestaurantCuisine
-    for c_in in item_in.cuisines:
-        rc = RestaurantCuisine(
-            restaurant_id=restaurant.id,
-            **c_in.model_dump()
-        )
-        db.add(rc)
+    # 2. Tạo các RestaurantCuisine (một câu INSERT nhiều dòng)
+    await sync_cuisines(db, restaurant.id, item_in.cuisines)
 
     await db.commit()
+    http_cache.bump("restaurants")
+    await on_catalogue_changed(db, {restaurant.region_id})
     return {"message": "Created", "id": restaurant.id}
 
 # --- UPDATE ---
 @router.put("/restaurants/{id}")
 async def update_restaurant(id: int, item_in: RestaurantUpdate, db: AsyncSession = Depends(get_db)):
     # 1. Get Old Data
-    query = select(Restaurant).where(Restaurant.id == id).options(selectinload(Restaurant.cuisines_data))
-    result = await db.execute(query)
+    result = await db.execute(select(Restaurant).where(Restaurant.id == id))
     restaurant = result.scalar_one_or_none()
     
     if not restaurant:
         raise HTTPException(404, "Restaurant not found")
 
+    old_region_id = restaurant.region_id
+
     # 2. Update Basic Info
     update_data = item_in.model_dump(exclude={"cuisines"})
     for k, v in update_data.items():
         setattr(restaurant, k, v)
 
-    # 3. Update Cuisines (Chiến thuật: Xóa hết cũ, tạo mới)
-    # Xóa các liên kết cũ
-    for old_rc in restaurant.cuisines_data:
-        await db.delete(old_rc)
-    
-    # Thêm mới từ request
-    for c_in in item_in.cuisines:
-        new_rc = RestaurantCuisine(
-            restaurant_id=restaurant.id,
-            **c_in.model_dump()
-        )
-        db.add(new_rc)
+    # 3. Update Cuisines: upsert theo (restaurant_id, cuisine_id) + xoá các cuisine bị bỏ,
+    # dòng không đổi thì không bị ghi lại
+    cuisine_changes = await sync_cuisines(db, restaurant.id, item_in.cuisines)
 
     await db.commit()
-    return {"message": "Updated"}
+    http_cache.bump("restaurants")
+    await on_catalogue_changed(db, {old_region_id, restaurant.region_id})
+    return {"message": "Updated", "cuisines": cuisine_changes}
 
 # --- DELETE ---
 @router.delete("/restaurants/{id}")
@@ -126,6 +100,9 @@ async def delete_restaurant(id: int, db: AsyncSession = Depends(get_db)):
     if not restaurant:
         raise HTTPException(404, "Not found")
     
+    region_id = restaurant.region_id
     await db.delete(restaurant)
     await db.commit()
+    http_cache.bump("restaurants")
+    await on_catalogue_changed(db, {region_id})
     return {"message": "Deleted"}
\ No newline at end of file
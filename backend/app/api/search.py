@@ -0,0 +1,49 @@
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.services.search_service import SEARCH_KINDS, search_catalogue
+from app.utils.pagination import encode_keyset, decode_keyset
+
+router = APIRouter()
+
+# Giới hạn độ sâu phân trang của kết quả xếp hạng
+MAX_SEARCH_OFFSET = 1000
+
+
+@router.get("/search")
+async def search(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    types: Optional[List[Literal["hotel", "restaurant", "place"]]] = Query(None, description="Mặc định: cả 3 loại"),
+    region_id: Optional[int] = None,
+    prefix: bool = Query(False, description="Typeahead: khớp tiền tố từ cuối cùng"),
+    limit: int = Query(20, ge=1, le=50),
+    cursor: Optional[str] = Query(None, description="Giá trị header X-Next-Cursor của trang trước"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Tìm kiếm hotel / restaurant / place (tên, mô tả, địa chỉ, tags), bỏ dấu, chịu lỗi gõ.
+    Kết quả xếp theo độ liên quan; nếu còn trang sau, cursor nằm trong header X-Next-Cursor.
+    """
+    offset = 0
+    if cursor:
+        try:
+            tag, offset = decode_keyset(cursor)
+            offset = int(offset)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Cursor không hợp lệ")
+        if tag != "search" or not 0 <= offset <= MAX_SEARCH_OFFSET:
+            raise HTTPException(status_code=400, detail="Cursor không hợp lệ")
+
+    kinds = tuple(dict.fromkeys(types)) if types else SEARCH_KINDS
+    # Lấy dư một dòng để biết còn trang sau hay không
+    results = await search_catalogue(db, q, kinds, region_id, prefix, limit=limit + 1, offset=offset)
+
+    if len(results) > limit:
+        results = results[:limit]
+        if offset + limit <= MAX_SEARCH_OFFSET:
+            response.headers["X-Next-Cursor"] = encode_keyset("search", offset + limit)
+    return results
@@ -1,11 +1,24 @@
 import json
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.schemas.trip import TripRequest, TripResponse, SaveTripSchema, TripUpdateSchema
-from app.services.ai_service import generate_trip_plan
+from app.services.ai_service import generate_trip_plan, start_trip_stream, generation_flights
+from app.services import trip_cache, trip_doc_cache
+from app.services.live_catalogue import attach_live_data
+from app.services.trip_service import (
+    save_trip, fetch_user_trip_page, fetch_trip, trips_etag, build_trip_documents,
+    list_admin_trips, stream_admin_trips,
+)
+from app.services.trip_service import update_trip as update_trip_items
 from sqlalchemy import text
 from app.dependencies import get_current_user, get_current_admin
+from app.utils.sse import format_sse
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.etag import etag_matches
 
 router = APIRouter()
 
@@ -20,6 +33,39 @@ async def generate_trip(request: TripRequest, db: AsyncSession = Depends(get_db)
     trip_plan = await generate_trip_plan(request.prompt, db)
     return trip_plan
 
+@router.post("/generate/stream")
+async def generate_trip_stream(request: TripRequest, db: AsyncSession = Depends(get_db)):
+    """
+    Giống /generate nhưng trả về Server-Sent Events:
+    mỗi ngày (DayPlan) được gửi ngay khi AI viết xong, cuối cùng là event "done".
+    """
+    if not request.prompt:
+        raise HTTPException(status_code=400, detail="Prompt is required")
+
+    events = await start_trip_stream(request.prompt, db)
+
+    async def event_stream():
+        async for event, data in events:
+            yield format_sse(event, data)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/generate/stats")
+async def get_generate_stats(admin=Depends(get_current_admin)):
+    """
+    Thống kê /generate: cache (hit/miss, token và thời gian LLM đã tiết kiệm)
+    và số request được gộp chung một lời gọi LLM đang chạy.
+    """
+    return {
+        "cache": trip_cache.get_stats(),
+        "coalescing": generation_flights.get_stats(),
+        "trip_documents": trip_doc_cache.get_stats(),
+    }
+
 @router.post("/save")
 async def save_user_trip(
     data: SaveTripSchema, 
@@ -27,79 +73,7 @@ async def save_user_trip(
     current_user = Depends(get_current_user)
 ):
     try:
-        # --- BƯỚC 1: LƯU VÀO BẢNG TRIPS (Bạn đã viết xong) ---
-        query_trip = text("""
-            INSERT INTO trips (
-                user_id, region_id, title, total_days, total_budget, 
-                members, budget_per_person, ai_result,
-                guest_name, guest_phone, guest_email, transport, special_request
-            )
-            VALUES (
-                :u_id, :r_id, :title, :days, :budget, 
-                :mems, :b_per_p, :result,
-                :g_name, :g_phone, :g_email, :trans, :spec
-            )
-            RETURNING id
-        """)
-        
-        result = await db.execute(query_trip, {
-            "u_id": current_user.id,
-            "r_id": data.region_id,
-            "title": data.title,
-            "days": data.total_days,
-            "budget": data.total_budget,
-            "mems": data.members,
-            "b_per_p": data.budget_per_person,
-            "result": json.dumps(data.ai_result),
-            "g_name": data.guest_name,
-            "g_phone": data.guest_phone,
-            "g_email": data.guest_email,
-            "trans": data.transport,
-            "spec": data.special_request
-        })
-        trip_id = result.scalar()
-
-        # --- BƯỚC 2: LƯU VÀO BẢNG TRIP_ITEMS ---
-        # Lấy itinerary từ ai_result gửi lên
-        itinerary = data.ai_result.get("itinerary", [])
-        
-        for day_data in itinerary:
-            day_number = day_data.get("day")
-            items = day_data.get("items", [])
-            
-            for item in items:
-                # Trích xuất item_id từ AI để lưu vào reference_id
-                # Nếu AI trả về null hoặc 0, ta lưu None
-                ref_id = item.get("item_id")
-                if not ref_id or ref_id == 0:
-                    ref_id = None
-
-                query_item = text("""
-                    INSERT INTO trip_items (
-                        trip_id, day_number, time_slot, activity, 
-                        location, item_type, price, image_url, details, 
-                        map_url, reference_id
-                    )
-                    VALUES (
-                        :t_id, :day, :time, :act, 
-                        :loc, :type, :price, :img, :det, 
-                        :m_url, :ref_id
-                    )
-                """)
-                
-                await db.execute(query_item, {
-                    "t_id": trip_id,
-                    "day": day_number,
-                    "time": item.get("time"),
-                    "act": item.get("activity"),
-                    "loc": item.get("location"),
-                    "type": item.get("type"),
-                    "price": item.get("price", 0),
-                    "img": item.get("image_url", ""),
-                    "det": item.get("details", ""),
-                    "m_url": item.get("map_url"),
-                    "ref_id": ref_id  # Lưu ID khách sạn/nhà hàng thật vào đây
-                })
+        trip_id = await save_trip(db, current_user.id, data)
         
         await db.commit()
         return {
@@ -115,76 +89,88 @@ async def save_user_trip(
 
 @router.get("/my-trips")
 async def get_my_trips(
+    response: Response,
+    limit: int = Query(20, ge=1, le=100, description="Số trip mỗi trang"),
+    all_items: bool = Query(False, alias="all", description="true: bỏ phân trang, trả về mọi trip"),
+    cursor: Optional[str] = Query(None, description="Giá trị header X-Next-Cursor của trang trước"),
+    mode: Literal["full", "summary"] = "full",
+    assemble: Literal["python", "db"] = Query("python", description="db = Postgres dựng itinerary bằng json_agg"),
+    resolve_live: bool = Query(False, description="Gắn giá / rating / ảnh / trạng thái hiện tại của mục được tham chiếu"),
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
+    """
+    Lịch trình của user hiện tại, mới nhất trước.
+    Phân trang keyset: nếu còn trang sau, cursor của trang đó nằm trong header X-Next-Cursor.
+    mode=summary chỉ trả thông tin trip, không kèm items.
+    resolve_live=true thêm khoá "live" vào mỗi item có item_id (một truy vấn IN mỗi loại mục).
+    Có ETag: gửi If-None-Match để nhận 304 khi danh sách không đổi.
+    """
+    if all_items:
+        limit = None
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
     try:
-        # Lấy toàn bộ thông tin từ bảng trips của user hiện tại
-        query_trips = text("""
-            SELECT id, region_id, title, total_days, budget_per_person 
-            FROM trips 
-            WHERE user_id = :u_id 
-            ORDER BY created_at DESC
-        """)
-        
-        result_trips = await db.execute(query_trips, {"u_id": current_user.id})
-        trips_rows = result_trips.fetchall()
-        
-        final_data = []
-        for trip in trips_rows:
-            # Truy vấn lấy các điểm đến trong hành trình
-            query_items = text("""
-                SELECT time_slot, activity, location, item_type, price, 
-                       image_url, map_url, reference_id, day_number, details
-                FROM trip_items 
-                WHERE trip_id = :t_id 
-                ORDER BY day_number ASC, time_slot ASC
-            """)
-            result_items = await db.execute(query_items, {"t_id": trip.id})
-            items_rows = result_items.fetchall()
+        rows, next_after = await fetch_user_trip_page(db, current_user.id, limit=limit, after=after)
+        live = resolve_live and mode == "full"
+
+        headers = {"ETag": trips_etag(rows, mode), "Cache-Control": "private, no-cache"}
+        if next_after is not None:
+            headers["X-Next-Cursor"] = encode_cursor(*next_after)
+        if not live and etag_matches(if_none_match, headers["ETag"]):
+            raise HTTPException(status_code=304, headers=headers)
 
-            itinerary_from_db = {}
-            for item in items_rows:
-                day_num = item.day_number
-                if day_num not in itinerary_from_db:
-                    itinerary_from_db[day_num] = {"day": day_num, "items": []}
-                
-                itinerary_from_db[day_num]["items"].append({
-                    "time": item.time_slot,
-                    "activity": item.activity,
-                    "location": item.location,
-                    "type": item.item_type,
-                    "price": item.price,
-                    "image_url": item.image_url,
-                    "map_url": item.map_url,
-                    "details": item.details,
-                    "item_id": item.reference_id # Trả về ID gốc (Hotel/Rest) để làm Link
-                })
+        final_data = await build_trip_documents(db, rows, mode=mode, assemble=assemble)
+        if live:
+            # ETag phụ thuộc cả dữ liệu catalogue hiện tại
+            found = await attach_live_data(db, [trip["ai_result"]["itinerary"] for trip in final_data])
+            headers["ETag"] = trips_etag(rows, mode, "live", sorted(found.items()))
+            if etag_matches(if_none_match, headers["ETag"]):
+                raise HTTPException(status_code=304, headers=headers)
 
-            # Đóng gói dữ liệu tương thích với cấu trúc AI Trip Planner
-            final_data.append({
-                "id": trip.id, 
-                "region_id": trip.region_id, # Thêm ở cấp cao nhất để FE lấy cho Link gốc
-                "title": trip.title, 
-                "total_days": trip.total_days,
-                "budget_per_person": trip.budget_per_person,
-                "ai_result": {
-                    "title": trip.title,
-                    "region_id": trip.region_id, # Thêm vào trong ai_result để đồng bộ
-                    "itinerary": list(itinerary_from_db.values()),
-                    "budget_summary": {
-                        "total_per_person": trip.budget_per_person, 
-                        "note": "Dữ liệu được tải từ lịch sử cá nhân"
-                    }
-                }
-            })
-            
+        response.headers.update(headers)
         return final_data
 
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error fetching trips: {str(e)}")
         raise HTTPException(status_code=500, detail="Không thể tải danh sách lịch trình cá nhân")
 
+@router.get("/trips/{trip_id}")
+async def get_trip(
+    trip_id: int,
+    response: Response,
+    resolve_live: bool = Query(False, description="Gắn giá / rating / ảnh / trạng thái hiện tại của mục được tham chiếu"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """Một lịch trình đã lưu của user hiện tại (cùng cấu trúc với /my-trips), có ETag / 304."""
+    trip = await fetch_trip(db, trip_id)
+    if trip is None or trip.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Không tìm thấy chuyến đi")
+
+    headers = {"ETag": trips_etag([trip], "trip"), "Cache-Control": "private, no-cache"}
+    if not resolve_live and etag_matches(if_none_match, headers["ETag"]):
+        raise HTTPException(status_code=304, headers=headers)
+
+    documents = await build_trip_documents(db, [trip])
+    if resolve_live:
+        found = await attach_live_data(db, [documents[0]["ai_result"]["itinerary"]])
+        headers["ETag"] = trips_etag([trip], "trip", "live", sorted(found.items()))
+        if etag_matches(if_none_match, headers["ETag"]):
+            raise HTTPException(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return documents[0]
+
 @router.delete("/admin/trips/{trip_id}")
 async def delete_trip(trip_id: int, db: AsyncSession = Depends(get_db)):
     try:
@@ -201,6 +187,7 @@ async def delete_trip(trip_id: int, db: AsyncSession = Depends(get_db)):
         )
 
         await db.commit()
+        trip_doc_cache.invalidate(trip_id)
 
         return {"message": "Đã xóa chuyến đi thành công"}
 
@@ -210,79 +197,21 @@ async def delete_trip(trip_id: int, db: AsyncSession = Depends(get_db)):
     
 @router.put("/trips/{trip_id}")
 async def update_trip(trip_id: int, data: TripUpdateSchema, db: AsyncSession = Depends(get_db)):
+    """
+    Cập nhật chuyến đi: chỉ INSERT / UPDATE / DELETE các item thay đổi (ghép theo "id" của item).
+    Gửi kèm "version" đã đọc để tránh ghi đè chỉnh sửa đồng thời (409 nếu đã cũ).
+    """
     try:
-        # 🔹 1. Cập nhật bảng trips (Bảng cha)
-        # Lưu toàn bộ cấu trúc mới vào trường JSON ai_result để đồng bộ
-        await db.execute(text("""
-            UPDATE trips
-            SET title = :title, 
-                region_id = :region_id, 
-                total_days = :days,
-                total_budget = :budget, 
-                members = :mems, 
-                budget_per_person = :b_per_p,
-                ai_result = :result
-            WHERE id = :t_id
-        """), {
-            "title": data.title,
-            "region_id": data.region_id,
-            "days": data.total_days,
-            "budget": data.total_budget,
-            "mems": data.members,
-            "b_per_p": data.budget_per_person,
-            "result": json.dumps({
-                "title": data.title, 
-                "itinerary": data.itinerary,
-                "budget_summary": {
-                    "total_per_person": data.budget_per_person,
-                    "note": "Đã cập nhật từ người dùng"
-                }
-            }),
-            "t_id": trip_id
-        })
-
-        # 🔹 2. Xóa toàn bộ các mục cũ trong trip_items của chuyến đi này
-        await db.execute(text("DELETE FROM trip_items WHERE trip_id = :t_id"), {"t_id": trip_id})
-
-        # 🔹 3. Chèn lại các mục mới từ dữ liệu chỉnh sửa (Sử dụng map_url thay cho lat/lng)
-        for day_data in data.itinerary:
-            day_number = day_data.get("day")
-            items = day_data.get("items", [])
-            
-            for item in items:
-                await db.execute(text("""
-                    INSERT INTO trip_items (
-                        trip_id, 
-                        day_number, 
-                        time_slot, 
-                        activity,
-                        location, 
-                        item_type, 
-                        price, 
-                        image_url, 
-                        details,
-                        map_url
-                    )
-                    VALUES (
-                        :t_id, :day, :time, :act, :loc, :type, :price, :img, :det, :m_url
-                    )
-                """), {
-                    "t_id": trip_id, 
-                    "day": day_number, 
-                    "time": item.get("time"),
-                    "act": item.get("activity"), 
-                    "loc": item.get("location"),
-                    "type": item.get("type"), 
-                    "price": item.get("price", 0),
-                    "img": item.get("image_url"), 
-                    "det": item.get("details"),
-                    "m_url": item.get("map_url")  # Lưu đường dẫn bản đồ
-                })
+        result = await update_trip_items(db, trip_id, data)
 
         # Lưu thay đổi vào Database
         await db.commit()
-        return {"message": "Cập nhật chuyến đi thành công"}
+        trip_doc_cache.invalidate(trip_id)
+        return {"message": "Cập nhật chuyến đi thành công", **result}
 
+    except HTTPException:
+        await db.rollback()
+        raise
     except Exception as e:
         # Nếu có lỗi, hoàn tác các thay đổi đã thực hiện trong phiên này
         await db.rollback()
@@ -291,54 +220,59 @@ async def update_trip(trip_id: int, data: TripUpdateSchema, db: AsyncSession = D
     
 
 @router.get("/admin/trips/all")
-async def get_all_trips_admin(db: AsyncSession = Depends(get_db), admin=Depends(get_current_admin)):
-    try:
-        # SQL JOIN để lấy thông tin user
-        sql = text("""
-            SELECT t.*, u.full_name as user_name, u.phone as user_phone, 
-                   u.email as user_email, u.avatar_url as user_avatar 
-            FROM trips t
-            LEFT JOIN users u ON t.user_id = u.id
-            ORDER BY t.created_at DESC
-        """)
-        result = await db.execute(sql)
-        trips_rows = result.fetchall()
-        
-        final_data = []
-        for trip in trips_rows:
-            # Lấy các item thuộc trip này
-            query_items = text("SELECT * FROM trip_items WHERE trip_id = :t_id ORDER BY day_number ASC, time_slot ASC")
-            result_items = await db.execute(query_items, {"t_id": trip.id})
-            items_rows = result_items.fetchall()
+async def get_all_trips_admin(
+    response: Response,
+    limit: int = Query(100, ge=1, le=500, description="Số trip mỗi trang"),
+    all_items: bool = Query(False, alias="all", description="true: bỏ phân trang, trả về (hoặc stream) mọi trip"),
+    cursor: Optional[str] = Query(None, description="Giá trị header X-Next-Cursor của trang trước"),
+    region_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    created_from: Optional[date] = None,
+    created_to: Optional[date] = None,
+    min_budget: Optional[int] = Query(None, ge=0, description="Ngân sách / người tối thiểu"),
+    max_budget: Optional[int] = Query(None, ge=0, description="Ngân sách / người tối đa"),
+    format: Literal["json", "ndjson"] = Query("json", description="ndjson = stream mỗi dòng một trip"),
+    resolve_live: bool = Query(False, description="Gắn dữ liệu catalogue hiện tại (chỉ với format=json)"),
+    db: AsyncSession = Depends(get_db),
+    admin=Depends(get_current_admin)
+):
+    """
+    Danh sách lịch trình (kèm thông tin user) cho admin, mới nhất trước.
+    Phân trang keyset: nếu còn trang sau, cursor nằm trong header X-Next-Cursor (chỉ với format=json).
+    format=ndjson stream kết quả từ server-side cursor, bộ nhớ không tăng theo số trip
+    (dùng cùng ?all=true để xuất toàn bộ).
+    """
+    if all_items:
+        limit = None
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    filters = {
+        "region_id": region_id,
+        "user_id": user_id,
+        "created_from": created_from,
+        "created_to": created_to,
+        "min_budget": min_budget,
+        "max_budget": max_budget,
+    }
 
-            itinerary_from_db = {}
-            for item in items_rows:
-                day_num = item.day_number
-                if day_num not in itinerary_from_db:
-                    itinerary_from_db[day_num] = {"day": day_num, "items": []}
-                
-                itinerary_from_db[day_num]["items"].append({
-                    "time": item.time_slot,
-                    "activity": item.activity,
-                    "location": item.location,
-                    "type": item.item_type,
-                    "price": item.price
-                })
+    if format == "ndjson":
+        async def ndjson_stream():
+            async for trip in stream_admin_trips(filters, limit=limit, after=after):
+                yield json.dumps(trip, ensure_ascii=False, default=str) + "\n"
 
-            final_data.append({
-                "id": trip.id,
-                "title": trip.title,
-                "total_days": trip.total_days,
-                "budget_per_person": trip.budget_per_person,
-                "created_at": trip.created_at,
-                "user_info": {
-                    "name": trip.user_name,
-                    "phone": trip.user_phone,
-                    "email": trip.user_email,
-                    "avatar": trip.user_avatar
-                },
-                "itinerary": list(itinerary_from_db.values())
-            })
+        return StreamingResponse(ndjson_stream(), media_type="application/x-ndjson")
+
+    try:
+        final_data, next_after = await list_admin_trips(db, filters, limit=limit, after=after)
+        if resolve_live:
+            await attach_live_data(db, [trip["itinerary"] for trip in final_data])
+        if next_after is not None:
+            response.headers["X-Next-Cursor"] = encode_cursor(*next_after)
         return final_data
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
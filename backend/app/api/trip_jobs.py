@@ -0,0 +1,158 @@
+# app/api/trip_jobs.py
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.dependencies import get_current_user
+from app.schemas.trip import TripJobCreate, TripJobSaveSchema, SaveTripSchema
+from app.services import trip_jobs
+from app.services.trip_service import save_trip
+from app.utils.sse import format_sse
+
+router = APIRouter()
+
+
+def _get_owned_job(job_id: str, current_user):
+    job = trip_jobs.get_job(job_id)
+    if not job or (job.user_id != current_user.id and current_user.role != "admin"):
+        raise HTTPException(status_code=404, detail="Không tìm thấy job")
+    return job
+
+
+# =========================
+# SUBMIT
+# =========================
+@router.post("/trip-jobs")
+async def create_trip_job(data: TripJobCreate, current_user=Depends(get_current_user)):
+    prompts = [p.strip() for p in data.prompts if p and p.strip()]
+    if not prompts:
+        raise HTTPException(status_code=400, detail="Danh sách prompt trống")
+    if len(prompts) > settings.TRIP_JOB_MAX_PROMPTS:
+        raise HTTPException(status_code=400, detail=f"Tối đa {settings.TRIP_JOB_MAX_PROMPTS} prompt mỗi job")
+    if trip_jobs.active_job_count(current_user.id) >= settings.TRIP_JOB_MAX_ACTIVE_PER_USER:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Tối đa {settings.TRIP_JOB_MAX_ACTIVE_PER_USER} job chưa xong mỗi người dùng, vui lòng chờ job trước xong"
+        )
+
+    job = trip_jobs.submit_job(current_user.id, prompts, data.concurrency)
+    return job.summary()
+
+
+# =========================
+# POLL
+# =========================
+@router.get("/trip-jobs/{job_id}")
+async def get_trip_job(job_id: str, include_results: bool = True, current_user=Depends(get_current_user)):
+    return _get_owned_job(job_id, current_user).summary(include_results=include_results)
+
+
+# =========================
+# STREAM (SSE)
+# =========================
+@router.get("/trip-jobs/{job_id}/events")
+async def stream_trip_job(job_id: str, current_user=Depends(get_current_user)):
+    """
+    Gửi trạng thái hiện tại, sau đó mỗi item xong là một event "item" + "progress",
+    kết thúc bằng event "done".
+    """
+    job = _get_owned_job(job_id, current_user)
+
+    async def event_stream():
+        # Chụp trạng thái và đăng ký nhận event trong cùng một bước (không có await ở giữa):
+        # item xong trước thời điểm này nằm trong ảnh chụp, item xong sau chỉ đến qua hàng đợi
+        progress = job.progress
+        done_items = [dict(item) for item in job.items if item["status"] in ("succeeded", "failed")]
+        summary = job.summary() if job.finished else None
+        queue = job.subscribe() if summary is None else None
+
+        try:
+            yield format_sse("progress", progress)
+            for item in done_items:
+                yield format_sse("item", item)
+
+            if summary is not None:
+                yield format_sse("done", summary)
+                return
+
+            while True:
+                event, data = await queue.get()
+                yield format_sse(event, data)
+                if event == "done":
+                    return
+        finally:
+            if queue is not None:
+                job.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# =========================
+# CANCEL
+# =========================
+@router.delete("/trip-jobs/{job_id}")
+async def cancel_trip_job(job_id: str, current_user=Depends(get_current_user)):
+    job = _get_owned_job(job_id, current_user)
+    trip_jobs.cancel_job(job)
+    return {"message": "Đã huỷ job", "job_id": job.id}
+
+
+# =========================
+# SAVE RESULTS -> trips / trip_items
+# =========================
+@router.post("/trip-jobs/{job_id}/save")
+async def save_trip_job_results(
+    job_id: str,
+    data: TripJobSaveSchema,
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_user)
+):
+    job = _get_owned_job(job_id, current_user)
+
+    wanted = set(data.indices) if data.indices is not None else None
+    items = [
+        item for item in job.items
+        if item["status"] == "succeeded" and (wanted is None or item["index"] in wanted)
+    ]
+    if not items:
+        raise HTTPException(status_code=400, detail="Không có lịch trình nào để lưu")
+
+    try:
+        saved = []
+        for item in items:
+            result = item["result"]
+            budget_per_person = (result.get("budget_summary") or {}).get("total_per_person") or 0
+
+            trip_id = await save_trip(db, current_user.id, SaveTripSchema(
+                region_id=result.get("region_id"),
+                title=result.get("title") or item["prompt"],
+                total_days=len(result.get("itinerary", [])),
+                members=data.members,
+                total_budget=budget_per_person * data.members,
+                budget_per_person=budget_per_person,
+                guest_name=data.guest_name,
+                guest_phone=data.guest_phone,
+                guest_email=data.guest_email,
+                transport=data.transport,
+                special_request=data.special_request,
+                ai_result=result,
+            ))
+            saved.append({"index": item["index"], "trip_id": trip_id})
+
+        await db.commit()
+        return {"status": "success", "saved": saved}
+
+    except ValidationError as e:
+        await db.rollback()
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+    except Exception as e:
+        await db.rollback()
+        print(f"Error at /trip-jobs/save: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Lỗi khi lưu dữ liệu: {str(e)}")
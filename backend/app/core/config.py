@@ -17,5 +17,56 @@ class Settings:
     # Google AI
     GOOGLE_API_KEY: str = os.getenv("GEMINI_API_KEY")
     GROQ_API_KEY: str = os.getenv("GROQ_API_KEY")
+    GROQ_MODEL: str = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
+
+    # Nhà cung cấp LLM: "groq" hoặc "fake" (giả lập cục bộ cho load-test)
+    LLM_PROVIDER: str = os.getenv("LLM_PROVIDER", "groq")
+    FAKE_LLM_LATENCY_MS: int = int(os.getenv("FAKE_LLM_LATENCY_MS", 800))
+
+    # Giới hạn gọi LLM: số request đồng thời tối đa và timeout (giây) cho mỗi lần gọi
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", 4))
+    LLM_TIMEOUT_SECONDS: float = float(os.getenv("LLM_TIMEOUT_SECONDS", 60))
+
+    # Cache kết quả /generate
+    TRIP_CACHE_MAX_ENTRIES: int = int(os.getenv("TRIP_CACHE_MAX_ENTRIES", 512))
+    TRIP_CACHE_TTL_SECONDS: float = float(os.getenv("TRIP_CACHE_TTL_SECONDS", 3600))
+
+    # Cache itinerary đã dựng của lịch trình đã lưu (/my-trips, /trips/{id})
+    TRIP_DOC_CACHE_MAX_ENTRIES: int = int(os.getenv("TRIP_DOC_CACHE_MAX_ENTRIES", 2048))
+    TRIP_DOC_CACHE_TTL_SECONDS: float = float(os.getenv("TRIP_DOC_CACHE_TTL_SECONDS", 24 * 3600))
+
+    # Cache HTTP cho các API đọc catalogue (app/utils/http_cache.py):
+    # số response lưu sẵn, max-age cho trình duyệt và s-maxage cho CDN / proxy (giây)
+    HTTP_CACHE_MAX_ENTRIES: int = int(os.getenv("HTTP_CACHE_MAX_ENTRIES", 512))
+    HTTP_CACHE_MAX_AGE: int = int(os.getenv("HTTP_CACHE_MAX_AGE", 0))
+    HTTP_CACHE_S_MAXAGE: int = int(os.getenv("HTTP_CACHE_S_MAXAGE", 60))
+    # Bộ đếm phiên bản nằm riêng từng worker: sau tối đa chừng này giây mọi worker xác thực lại với DB (0 = không giới hạn)
+    HTTP_CACHE_TTL_SECONDS: int = int(os.getenv("HTTP_CACHE_TTL_SECONDS", 300))
+
+    # Trang điểm đến: số vùng giữ snapshot (tóm tắt + top-N) trong bộ nhớ, số mục top mỗi phần
+    DESTINATION_SNAPSHOT_MAX_ENTRIES: int = int(os.getenv("DESTINATION_SNAPSHOT_MAX_ENTRIES", 128))
+    DESTINATION_TOP_N: int = int(os.getenv("DESTINATION_TOP_N", 6))
+
+    # Nhập hàng loạt catalogue (POST /api/import/{kind}, scripts/import_catalogue.py)
+    IMPORT_BATCH_SIZE: int = int(os.getenv("IMPORT_BATCH_SIZE", 1000))
+    IMPORT_MAX_ERRORS: int = int(os.getenv("IMPORT_MAX_ERRORS", 500))  # Số dòng lỗi tối đa trong báo cáo
+    IMPORT_MAX_BYTES: int = int(os.getenv("IMPORT_MAX_BYTES", 200 * 1024 * 1024))
+
+    # Facet cho bộ lọc (GET /api/facets/{kind}): số tag tối đa trả về (cache qua http_cache)
+    FACET_MAX_TAGS: int = int(os.getenv("FACET_MAX_TAGS", 50))
+
+    # Context gửi cho AI: ngân sách token (ước lượng) và số mục tối đa lấy từ catalogue
+    AI_CONTEXT_TOKEN_BUDGET: int = int(os.getenv("AI_CONTEXT_TOKEN_BUDGET", 600))
+    AI_CONTEXT_MAX_ITEMS: int = int(os.getenv("AI_CONTEXT_MAX_ITEMS", 12))
+
+    # Batch job tạo lịch trình
+    TRIP_JOB_WORKERS: int = int(os.getenv("TRIP_JOB_WORKERS", 8))
+    TRIP_JOB_MAX_PROMPTS: int = int(os.getenv("TRIP_JOB_MAX_PROMPTS", 500))
+    TRIP_JOB_MAX_RETRIES: int = int(os.getenv("TRIP_JOB_MAX_RETRIES", 2))
+    TRIP_JOB_MAX_JOBS: int = int(os.getenv("TRIP_JOB_MAX_JOBS", 200))
+    TRIP_JOB_MAX_ACTIVE_PER_USER: int = int(os.getenv("TRIP_JOB_MAX_ACTIVE_PER_USER", 3))
+
+    # Tên gọi khác của vùng cho việc nhận diện vùng trong prompt (JSON)
+    REGION_ALIASES: str = os.getenv("REGION_ALIASES", "")
 
 settings = Settings()
\ No newline at end of file
@@ -1,6 +1,6 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import users, auth, regions, hotels, restaurants, cuisines, place, trip, destinations, booking, dashboard # Import auth mới
+from app.api import users, auth, regions, hotels, restaurants, cuisines, place, search, nearby, facets, imports, trip, trip_jobs, destinations, booking, dashboard # Import auth mới
 
 app = FastAPI()
 
@@ -11,6 +11,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"], # Cursor trang kế tiếp cho các API phân trang
 )
 
 app.include_router(auth.router, prefix="/api", tags=["Auth"])
@@ -20,7 +21,12 @@ app.include_router(hotels.router, prefix="/api", tags=["Hotels"])
 app.include_router(restaurants.router, prefix="/api", tags=["Restaurants"])
 app.include_router(cuisines.router, prefix="/api", tags=["Cuisines"])
 app.include_router(place.router, prefix="/api", tags=["Places"])
+app.include_router(search.router, prefix="/api", tags=["Search"])
+app.include_router(nearby.router, prefix="/api", tags=["Nearby"])
+app.include_router(facets.router, prefix="/api", tags=["Facets"])
+app.include_router(imports.router, prefix="/api", tags=["Import"])
 app.include_router(trip.router, prefix="/api/v1", tags=["Trips"])
+app.include_router(trip_jobs.router, prefix="/api/v1", tags=["Trip Jobs"])
 app.include_router(destinations.router, prefix="/api/destinations", tags=["destinations"]) 
 app.include_router(booking.router, prefix="/api/bookings", tags=["Bookings"]) 
 app.include_router(dashboard.router, prefix="/api/v1", tags=["Dashboard"]) 
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, Float  
+from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, Float, Index, event
 from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import relationship
 from app.core.database import Base
+from app.utils.map import sync_coordinates
 
 class Hotel(Base):
     __tablename__ = "hotels"
@@ -18,6 +19,9 @@ class Hotel(Base):
     rating = Column(Float)
 
     map_url = Column(Text)
+    # Toạ độ tự tính từ map_url khi ghi (xem app/utils/map.sync_coordinates)
+    latitude = Column(Float)
+    longitude = Column(Float)
 
     # ✅ ARRAY
     image_urls = Column(ARRAY(Text))
@@ -26,3 +30,21 @@ class Hotel(Base):
     is_active = Column(Boolean, default=True)
 
     region = relationship("Region", back_populates="hotels")
+
+    # Index cho GET /hotels: mỗi kiểu sort có index (cột, id) cùng chiều, có / không lọc theo vùng
+    # (xem migrations/004_hotel_listing_indexes.sql)
+    __table_args__ = (
+        Index("ix_hotels_region_id_id", region_id, id),
+        Index("ix_hotels_region_price_id", region_id, price_per_night, id),
+        Index("ix_hotels_region_price_desc_id", region_id, price_per_night.desc().nulls_last(), id.desc()),
+        Index("ix_hotels_region_rating_id", region_id, rating.desc().nulls_last(), id.desc()),
+        Index("ix_hotels_region_name_id", region_id, name, id),
+        Index("ix_hotels_price_id", price_per_night, id),
+        Index("ix_hotels_price_desc_id", price_per_night.desc().nulls_last(), id.desc()),
+        Index("ix_hotels_rating_id", rating.desc().nulls_last(), id.desc()),
+        Index("ix_hotels_name_id", name, id),
+        Index("ix_hotels_tags_gin", tags, postgresql_using="gin"),
+    )
+
+event.listen(Hotel, "before_insert", sync_coordinates)
+event.listen(Hotel, "before_update", sync_coordinates)
@@ -1,8 +1,9 @@
 # app/models/place.py
-from sqlalchemy import Column, Integer, String, Text, Boolean, Float, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, Boolean, Float, ForeignKey, DateTime, Index, event
 from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.sql import func
 from app.core.database import Base
+from app.utils.map import sync_coordinates
 from sqlalchemy.orm import relationship
 
 class Place(Base):
@@ -17,6 +18,9 @@ class Place(Base):
     description = Column(Text)
     address = Column(Text)
     map_url = Column(Text)
+    # Toạ độ tự tính từ map_url khi ghi (xem app/utils/map.sync_coordinates)
+    latitude = Column(Float)
+    longitude = Column(Float)
 
     average_price = Column(Integer)
     price_range = Column(String(50))
@@ -27,4 +31,14 @@ class Place(Base):
 
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, server_default=func.now())
-    region = relationship("Region", back_populates="spots")
\ No newline at end of file
+    region = relationship("Region", back_populates="spots")
+
+    # Top-N / phân trang theo rating của trang điểm đến (GET /destinations/{region_id})
+    __table_args__ = (
+        Index("ix_places_region_rating_id", region_id, rating.desc().nulls_last(), id.desc()),
+        # Lọc theo tags (tags @> ...) của GET /facets
+        Index("ix_places_tags_gin", tags, postgresql_using="gin"),
+    )
+
+event.listen(Place, "before_insert", sync_coordinates)
+event.listen(Place, "before_update", sync_coordinates)
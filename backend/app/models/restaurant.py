@@ -1,8 +1,9 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, Float, DateTime
+from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, Float, DateTime, Index, UniqueConstraint, event
 from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
+from app.utils.map import sync_coordinates
 
 # Bảng danh mục các loại ẩm thực (VD: Nhật, Hàn, Việt...)
 class Cuisine(Base):
@@ -24,6 +25,11 @@ class RestaurantCuisine(Base):
     image_url = Column(Text)
     is_available = Column(Boolean, default=True)
 
+    # Mỗi nhà hàng có tối đa một dòng cho mỗi cuisine: khoá upsert của sync_cuisines
+    __table_args__ = (
+        UniqueConstraint("restaurant_id", "cuisine_id", name="uq_restaurant_cuisines_restaurant_cuisine"),
+    )
+
     # Relationships
     cuisine = relationship("Cuisine") 
     restaurant = relationship("Restaurant", back_populates="cuisines_data")
@@ -43,6 +49,9 @@ class Restaurant(Base):
     description = Column(Text)
     address = Column(Text)
     map_url = Column(Text)
+    # Toạ độ tự tính từ map_url khi ghi (xem app/utils/map.sync_coordinates)
+    latitude = Column(Float)
+    longitude = Column(Float)
     
     rating = Column(Float)
     
@@ -52,8 +61,19 @@ class Restaurant(Base):
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, server_default=func.now())
 
+    # Top-N / phân trang theo rating của trang điểm đến (GET /destinations/{region_id})
+    __table_args__ = (
+        Index("ix_restaurants_region_rating_id", region_id, rating.desc().nulls_last(), id.desc()),
+        # Lọc theo tags (tags @> ...) của GET /facets
+        Index("ix_restaurants_tags_gin", tags, postgresql_using="gin"),
+    )
+
     # Relationships
     region = relationship("Region")
     # Link tới bảng trung gian
-    cuisines_data = relationship("RestaurantCuisine", back_populates="restaurant", cascade="all, delete-orphan")
-    region = relationship("Region", back_populates="restaurants")
\ No newline at end of file
+    # passive_deletes: xoá nhà hàng để DB tự xoá (ON DELETE CASCADE), không nạp rồi xoá từng dòng
+    cuisines_data = relationship("RestaurantCuisine", back_populates="restaurant", cascade="all, delete-orphan", passive_deletes=True)
+    region = relationship("Region", back_populates="restaurants")
+
+event.listen(Restaurant, "before_insert", sync_coordinates)
+event.listen(Restaurant, "before_update", sync_coordinates)
@@ -5,6 +5,11 @@ from .hotel import HotelResponse
 from .restaurant import RestaurantResponse
 from .place import PlaceResponse
 
+class DestinationCounts(BaseModel):
+    hotels: int = 0
+    restaurants: int = 0
+    spots: int = 0
+
 class DestinationDetail(BaseModel):
     id: int
     name: str
@@ -18,5 +23,8 @@ class DestinationDetail(BaseModel):
     restaurants: List[RestaurantResponse] = []
     spots: List[PlaceResponse] = [] # Trong model Region bạn đặt tên là 'spots'
 
+    # Tổng số mục mỗi phần; ở mode=summary các danh sách trên chỉ gồm top-N
+    counts: Optional[DestinationCounts] = None
+
     class Config:
         from_attributes = True
\ No newline at end of file
@@ -30,6 +30,8 @@ class PlaceUpdate(PlaceBase):
 class PlaceResponse(PlaceBase):
     id: int
     created_at: datetime
+    latitude: Optional[float] = None # Tính từ map_url
+    longitude: Optional[float] = None
 
     class Config:
         from_attributes = True
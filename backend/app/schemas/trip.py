@@ -1,7 +1,32 @@
 # app/schemas/trip.py
-from pydantic import BaseModel, EmailStr
+import re
+from pydantic import BaseModel, EmailStr, field_validator
 from typing import List, Any, Optional
 
+_INT_STRING = re.compile(r"\s*-?\d+\s*")
+
+
+def check_item_prices(itinerary):
+    """
+    Giá của item phải là số nguyên (hoặc chuỗi chỉ gồm chữ số); bỏ trống = 0.
+    Giá như "1500 yen" / "1,500" bị từ chối (422) thay vì lưu thành 0.
+    """
+    for day_data in itinerary or []:
+        if not isinstance(day_data, dict) or not isinstance(day_data.get("items", []), list):
+            raise ValueError("Itinerary phải là danh sách {\"day\", \"items\": [...]}")
+        for position, item in enumerate(day_data.get("items", []), start=1):
+            if not isinstance(item, dict):
+                raise ValueError(f"Mục {position} của ngày {day_data.get('day')} phải là object")
+            price = item.get("price")
+            if price is None or (isinstance(price, int) and not isinstance(price, bool)):
+                continue
+            if isinstance(price, float) and price.is_integer():
+                continue
+            if isinstance(price, str) and _INT_STRING.fullmatch(price):
+                continue
+            raise ValueError(f"Giá không hợp lệ ở ngày {day_data.get('day')}, mục {position}: {price!r}")
+    return itinerary
+
 class TripRequest(BaseModel):
     prompt: str
 
@@ -30,6 +55,7 @@ class TripResponse(BaseModel):
     region_id: Optional[int] = None
     budget_summary: BudgetSummary # THÊM MỚI    
     itinerary: List[DayPlan]
+    context_version: Optional[int] = None # Phiên bản snapshot context AI đã dùng (debug)
 
 class SaveTripSchema(BaseModel):
     region_id: Optional[int] = None
@@ -48,6 +74,12 @@ class SaveTripSchema(BaseModel):
     
     ai_result: dict # Chứa itinerary và budget_summary
 
+    @field_validator("ai_result")
+    @classmethod
+    def validate_item_prices(cls, v):
+        check_item_prices(v.get("itinerary"))
+        return v
+
 class TripItemUpdate(BaseModel):
     day: int
     time: Optional[str]
@@ -65,4 +97,25 @@ class TripUpdateSchema(BaseModel):
     total_budget: int
     members: int
     budget_per_person: int
-    itinerary: List[dict]
\ No newline at end of file
+    itinerary: List[dict]
+    version: Optional[int] = None # Version đã đọc; khác version hiện tại -> 409 (bỏ trống để ghi đè)
+
+    @field_validator("itinerary")
+    @classmethod
+    def validate_item_prices(cls, v):
+        return check_item_prices(v)
+
+class TripJobCreate(BaseModel):
+    prompts: List[str]
+    concurrency: int = 4 # Số lịch trình của job này được tạo song song
+
+class TripJobSaveSchema(BaseModel):
+    # Thông tin người tạo dùng chung cho mọi lịch trình được lưu
+    guest_name: str
+    guest_phone: str
+    guest_email: EmailStr
+    members: int = 1
+    transport: Optional[str] = "Tự túc"
+    special_request: Optional[str] = None
+
+    indices: Optional[List[int]] = None # None = lưu mọi lịch trình đã tạo thành công
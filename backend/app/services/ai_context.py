@@ -0,0 +1,130 @@
+# app/services/ai_context.py
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+HOTELS_PER_CONTEXT = 3
+RESTAURANTS_PER_CONTEXT = 5
+
+# Snapshot context cho AI theo vùng; key None = context toàn cục (không nhận diện được vùng)
+_snapshots: dict = {}
+_version = 0
+_loaded = False
+_lock = asyncio.Lock()
+
+_RANKED_HOTELS_SQL = """
+    SELECT id, region_id, name, price_per_night, rating, map_url FROM (
+        SELECT id, region_id, name, price_per_night, rating, map_url,
+               ROW_NUMBER() OVER (PARTITION BY region_id ORDER BY rating DESC NULLS LAST, id) AS rn
+        FROM hotels
+        WHERE is_active = True {region_filter}
+    ) ranked
+    WHERE rn <= :limit
+"""
+
+_RANKED_RESTAURANTS_SQL = """
+    SELECT id, region_id, name, rating, map_url FROM (
+        SELECT id, region_id, name, rating, map_url,
+               ROW_NUMBER() OVER (PARTITION BY region_id ORDER BY rating DESC NULLS LAST, id) AS rn
+        FROM restaurants
+        WHERE is_active = True {region_filter}
+    ) ranked
+    WHERE rn <= :limit
+"""
+
+
+def next_version() -> int:
+    """Số phiên bản tăng dần dùng chung cho mọi context AI (snapshot, chỉ mục tìm kiếm)."""
+    global _version
+    _version += 1
+    return _version
+
+
+def _make_snapshot(hotels, restaurants) -> dict:
+    hotels = sorted(hotels, key=lambda h: (h.rating is None, -(h.rating or 0), h.id))
+    restaurants = sorted(restaurants, key=lambda r: (r.rating is None, -(r.rating or 0), r.id))
+
+    # Định dạng: ID:x | Tên... để AI dễ nhận biết
+    return {
+        "version": next_version(),
+        "hotel_count": len(hotels),
+        "restaurant_count": len(restaurants),
+        "h_ctx": "\n".join([f"ID:{h.id} | Tên:{h.name} | Giá:{h.price_per_night}đ | Map:{h.map_url}" for h in hotels]),
+        "r_ctx": "\n".join([f"ID:{r.id} | Tên:{r.name} | Map:{r.map_url}" for r in restaurants]),
+    }
+
+
+async def _fetch_ranked(db: AsyncSession, sql: str, limit: int, region_ids=None):
+    region_filter = "AND region_id = ANY(:region_ids)" if region_ids is not None else ""
+    params = {"limit": limit}
+    if region_ids is not None:
+        params["region_ids"] = list(region_ids)
+
+    result = await db.execute(text(sql.format(region_filter=region_filter)), params)
+    grouped = {}
+    for row in result.fetchall():
+        grouped.setdefault(row.region_id, []).append(row)
+    return grouped
+
+
+async def _build_global(db: AsyncSession) -> dict:
+    hotels_res = await db.execute(text(
+        "SELECT id, name, price_per_night, rating, map_url FROM hotels WHERE is_active = True "
+        "ORDER BY rating DESC NULLS LAST, id LIMIT :limit"
+    ), {"limit": HOTELS_PER_CONTEXT})
+    rest_res = await db.execute(text(
+        "SELECT id, name, rating, map_url FROM restaurants WHERE is_active = True "
+        "ORDER BY rating DESC NULLS LAST, id LIMIT :limit"
+    ), {"limit": RESTAURANTS_PER_CONTEXT})
+    return _make_snapshot(hotels_res.fetchall(), rest_res.fetchall())
+
+
+async def _load_all(db: AsyncSession):
+    global _loaded
+    hotels = await _fetch_ranked(db, _RANKED_HOTELS_SQL, HOTELS_PER_CONTEXT)
+    restaurants = await _fetch_ranked(db, _RANKED_RESTAURANTS_SQL, RESTAURANTS_PER_CONTEXT)
+
+    snapshots = {
+        region_id: _make_snapshot(hotels.get(region_id, []), restaurants.get(region_id, []))
+        for region_id in set(hotels) | set(restaurants)
+        if region_id is not None
+    }
+    snapshots[None] = await _build_global(db)
+
+    _snapshots.clear()
+    _snapshots.update(snapshots)
+    _loaded = True
+
+
+async def refresh_regions(db: AsyncSession, region_ids):
+    """
+    Dựng lại snapshot của các vùng có hotel/restaurant thay đổi và snapshot toàn cục.
+    Nếu chưa từng nạp thì bỏ qua: lần generate đầu tiên sẽ nạp toàn bộ.
+    """
+    if not _loaded:
+        return
+
+    region_ids = [r for r in region_ids if r is not None]
+    async with _lock:
+        if region_ids:
+            hotels = await _fetch_ranked(db, _RANKED_HOTELS_SQL, HOTELS_PER_CONTEXT, region_ids)
+            restaurants = await _fetch_ranked(db, _RANKED_RESTAURANTS_SQL, RESTAURANTS_PER_CONTEXT, region_ids)
+            for region_id in region_ids:
+                _snapshots[region_id] = _make_snapshot(hotels.get(region_id, []), restaurants.get(region_id, []))
+
+        _snapshots[None] = await _build_global(db)
+
+
+async def get_snapshot(db: AsyncSession, region_id) -> dict:
+    """Lấy snapshot context của vùng; chỉ truy vấn DB ở lần gọi đầu tiên."""
+    if not _loaded:
+        async with _lock:
+            if not _loaded:
+                await _load_all(db)
+
+    snapshot = _snapshots.get(region_id)
+    if snapshot is None:
+        # Vùng chưa có hotel/restaurant nào đang hoạt động
+        snapshot = _snapshots[region_id] = _make_snapshot([], [])
+    return snapshot
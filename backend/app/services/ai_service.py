@@ -1,49 +1,52 @@
+import asyncio
 import json
-from groq import Groq
+import time
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text
+from app.schemas.trip import DayPlan, TripResponse
+from app.services.llm_client import complete_json, stream_json
 from app.core.config import settings
+from app.services import trip_cache, region_matcher, ai_context, catalogue_index
+from app.services.itinerary_enrichment import enrich_day
+from app.utils.json_stream import JsonArrayStreamer
+from app.utils.single_flight import SingleFlight
 
-client = Groq(api_key=settings.GROQ_API_KEY)
+# Gộp các request /generate giống nhau (cùng prompt chuẩn hoá + vùng) đang chạy đồng thời
+generation_flights = SingleFlight()
 
-async def generate_trip_plan(prompt: str, db: AsyncSession):
-    try:
-        # --- BƯỚC 1: NHẬN DIỆN VÙNG ---
-        regions_res = await db.execute(text("SELECT id, name FROM regions"))
-        regions = regions_res.fetchall()
-        target_region_id = None
-        for r in regions:
-            if r.name.lower() in prompt.lower():
-                target_region_id = r.id
-                break
-
-        # --- BƯỚC 2: TRÍCH XUẤT DỮ LIỆU (Thêm ID vào truy vấn) ---
-        hotel_sql = "SELECT id, name, price_per_night, rating, map_url FROM hotels WHERE is_active = True"
-        if target_region_id:
-            hotel_sql += f" AND region_id = {target_region_id}"
-        hotels_res = await db.execute(text(hotel_sql + " ORDER BY rating DESC LIMIT 3"))
-        list_hotels = hotels_res.fetchall()
-
-        rest_sql = "SELECT id, name, rating, map_url FROM restaurants WHERE is_active = True"
-        if target_region_id:
-            rest_sql += f" AND region_id = {target_region_id}"
-        rest_res = await db.execute(text(rest_sql + " ORDER BY rating DESC LIMIT 5"))
-        list_restaurants = rest_res.fetchall()
-
-        # --- BƯỚC 3: CONTEXT TINH GỌN (Đưa ID vào Context) ---
-        # Chúng ta định dạng: [ID: x] Tên... để AI dễ nhận biết
-        # Trong Bước 3:
-        h_ctx = "\n".join([f"ID:{h.id} | Tên:{h.name} | Giá:{h.price_per_night}đ | Map:{h.map_url}" for h in list_hotels])
-        r_ctx = "\n".join([f"ID:{r.id} | Tên:{r.name} | Map:{r.map_url}" for r in list_restaurants])
-
-        # --- BƯỚC 4: PROMPT NÂNG CẤP (Yêu cầu AI trả về item_id) ---
-# --- BƯỚC 4: PROMPT NÂNG CẤP (Ép AI dùng ID từ Database) ---
-     # Trong Bước 4:
-        full_prompt = f"""
+
+async def _detect_region(prompt: str, db: AsyncSession):
+    # --- BƯỚC 1: NHẬN DIỆN VÙNG (matcher dựng sẵn trong bộ nhớ, hỗ trợ alias + bỏ dấu) ---
+    return await region_matcher.detect_region(prompt, db)
+
+
+async def _select_context(prompt: str, target_region_id, db: AsyncSession) -> dict:
+    # --- BƯỚC 2: CHỌN DỮ LIỆU ---
+    # Ưu tiên các hotel/restaurant/place liên quan tới prompt (chỉ mục BM25 trong bộ nhớ),
+    # nếu không có mục nào liên quan thì dùng snapshot top-rated của vùng
+    context = await catalogue_index.select_context(
+        db, prompt, target_region_id,
+        token_budget=settings.AI_CONTEXT_TOKEN_BUDGET,
+        max_items=settings.AI_CONTEXT_MAX_ITEMS,
+    )
+    if context is None:
+        context = await ai_context.get_snapshot(db, target_region_id)
+    return context
+
+
+def _build_prompt(prompt: str, target_region_id, context: dict) -> str:
+    # --- BƯỚC 3: CONTEXT TINH GỌN (Đưa ID vào Context) ---
+    h_ctx = context["h_ctx"]
+    r_ctx = context["r_ctx"]
+    p_ctx = context.get("p_ctx", "")
+
+    # --- BƯỚC 4: PROMPT NÂNG CẤP (Ép AI dùng ID từ Database) ---
+    return f"""
 Bạn là AI chuyên gia du lịch.
 DỮ LIỆU CÓ SẴN (BẮT BUỘC DÙNG ID NẾU CHỌN):
 {h_ctx}
 {r_ctx}
+{p_ctx}
 
 YÊU CẦU: "{prompt}"
 
@@ -51,7 +54,7 @@ QUY TẮC:
 - Nếu bạn chọn địa điểm có trong DỮ LIỆU CÓ SẴN, bạn PHẢI điền chính xác số ID vào 'item_id'.
 - Nếu địa điểm bạn tự nghĩ ra, 'item_id' PHẢI là null.
 
-VÍ DỤ: 
+VÍ DỤ:
 Nếu chọn 'Fusion Treats' từ dữ liệu có ID:5, thì JSON phải là: "location": "Fusion Treats", "item_id": 5.
 
 CẤU TRÚC JSON:
@@ -69,39 +72,138 @@ CẤU TRÚC JSON:
   ]
 }}
 """
-        chat_completion = client.chat.completions.create(
-            messages=[{"role": "user", "content": full_prompt}],
-            model="llama-3.3-70b-versatile",
-            response_format={"type": "json_object"},
-            temperature=0.2 # Giảm xuống để AI tuân thủ cấu trúc tốt hơn
-        )
-        
-        ai_content = chat_completion.choices[0].message.content
-        ai_data = json.loads(ai_content)
-        
-        
-        # HẬU XỬ LÝ: Nếu AI quên không thêm region_id hoặc item_id, ta gán thủ công
-        ai_data["region_id"] = target_region_id
-        
-        # Đảm bảo mọi item đều có item_id để không bị lỗi Frontend
-        for day in ai_data.get("itinerary", []):
-            for item in day.get("items", []):
-                if "item_id" not in item:
-                    item["item_id"] = None
-
-        print(f"--- Target Region ID: {target_region_id}")
-        print(f"--- AI Response: {ai_content}") # Xem AI có thực sự trả về item_id không hay do code logic phía sau
-        print(f"--- Hotels Context: {len(list_hotels)} items found")
-        
+
+
+def _postprocess_day(day: dict, target_region_id) -> dict:
+    # Đảm bảo mọi item đều có item_id để không bị lỗi Frontend
+    for item in day.get("items", []):
+        if "item_id" not in item:
+            item["item_id"] = None
+    # Đối chiếu item_id với catalogue: bỏ ID bịa, điền giá / map / ảnh thật
+    return enrich_day(day, target_region_id)
+
+
+def _postprocess(ai_data: dict, target_region_id, context_version=None) -> dict:
+    # HẬU XỬ LÝ: Nếu AI quên không thêm region_id hoặc item_id, ta gán thủ công
+    ai_data["region_id"] = target_region_id
+    ai_data["context_version"] = context_version
+    for day in ai_data.get("itinerary", []):
+        _postprocess_day(day, target_region_id)
+    return ai_data
+
+
+def _error_result(note: str) -> dict:
+    return {
+        "title": "Lỗi tạo lịch trình",
+        "region_id": None,
+        "budget_summary": {"total_per_person": 0, "note": note},
+        "itinerary": []
+    }
+
+
+async def run_trip_generation(prompt: str, db: AsyncSession) -> dict:
+    """
+    Tạo lịch trình; khác generate_trip_plan ở chỗ ném exception khi lỗi
+    (timeout, JSON hỏng, sai cấu trúc) để bên gọi có thể thử lại.
+    """
+    target_region_id = await _detect_region(prompt, db)
+
+    # Trả kết quả từ cache nếu cùng prompt + vùng + phiên bản catalogue
+    cache_key = trip_cache.make_key(prompt, target_region_id)
+    cached = trip_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    context = await _select_context(prompt, target_region_id, db)
+    full_prompt = _build_prompt(prompt, target_region_id, context)
+
+    async def call_llm():
+        # Gọi LLM bất đồng bộ (có giới hạn đồng thời + timeout), không chặn event loop
+        started = time.perf_counter()
+        ai_content, used_tokens = await complete_json(full_prompt, temperature=0.2) # Giảm xuống để AI tuân thủ cấu trúc tốt hơn
+        llm_latency = time.perf_counter() - started
+        ai_data = _postprocess(json.loads(ai_content), target_region_id, context["version"])
+
+        # Chỉ cache kết quả đúng cấu trúc TripResponse
+        TripResponse.model_validate(ai_data)
+        trip_cache.put(cache_key, ai_data, tokens=used_tokens, latency=llm_latency)
         return ai_data
-    
-    
-        
+
+    return await generation_flights.do(cache_key, call_llm)
+
+
+async def generate_trip_plan(prompt: str, db: AsyncSession):
+    try:
+        return await run_trip_generation(prompt, db)
+    except asyncio.TimeoutError:
+        print("Lỗi generate_trip_plan: LLM timeout")
+        return _error_result("AI phản hồi quá lâu, vui lòng thử lại")
     except Exception as e:
         print(f"Lỗi generate_trip_plan: {e}")
-        return {
-            "title": "Lỗi tạo lịch trình", 
-            "region_id": None,
-            "budget_summary": {"total_per_person": 0, "note": str(e)}, 
-            "itinerary": []
-        }
\ No newline at end of file
+        return _error_result(str(e))
+
+
+async def start_trip_stream(prompt: str, db: AsyncSession):
+    """
+    Phiên bản streaming của generate_trip_plan.
+    Phần truy vấn DB chạy ngay tại đây (session của request sẽ đóng trước khi stream),
+    sau đó trả về async generator sinh ra các cặp (event, data):
+      - "meta":  {"region_id", "cached"}
+      - "day":   từng DayPlan ngay khi LLM viết xong ngày đó
+      - "done":  toàn bộ kết quả (giống response của /generate)
+      - "error": {"detail", ...}
+    """
+    target_region_id = await _detect_region(prompt, db)
+    cache_key = trip_cache.make_key(prompt, target_region_id)
+    cached = trip_cache.get(cache_key)
+    if cached is not None:
+        async def replay():
+            yield "meta", {
+                "region_id": target_region_id,
+                "cached": True,
+                "context_version": cached.get("context_version"),
+            }
+            for day in cached.get("itinerary", []):
+                yield "day", day
+            yield "done", cached
+
+        return replay()
+
+    # Chỉ dựng context (BM25 + truy vấn DB) khi cache trượt
+    context = await _select_context(prompt, target_region_id, db)
+    full_prompt = _build_prompt(prompt, target_region_id, context)
+
+    async def events():
+        yield "meta", {
+            "region_id": target_region_id,
+            "cached": False,
+            "context_version": context["version"],
+        }
+
+        streamer = JsonArrayStreamer("itinerary")
+        chunks = []
+        started = time.perf_counter()
+        try:
+            async for delta in stream_json(full_prompt, temperature=0.2):
+                chunks.append(delta)
+                for day in streamer.feed(delta):
+                    try:
+                        yield "day", DayPlan.model_validate(_postprocess_day(day, target_region_id)).model_dump()
+                    except ValidationError as e:
+                        yield "error", {"detail": "Ngày không hợp lệ", "day": day.get("day"), "errors": e.errors()}
+
+            ai_content = "".join(chunks)
+            ai_data = _postprocess(json.loads(ai_content), target_region_id, context["version"])
+            TripResponse.model_validate(ai_data)
+        except asyncio.TimeoutError:
+            yield "error", {"detail": "AI phản hồi quá lâu, vui lòng thử lại"}
+            return
+        except Exception as e:
+            print(f"Lỗi start_trip_stream: {e}")
+            yield "error", {"detail": str(e)}
+            return
+
+        trip_cache.put(cache_key, ai_data, latency=time.perf_counter() - started)
+        yield "done", ai_data
+
+    return events()
@@ -0,0 +1,280 @@
+# app/services/catalogue_import.py
+"""
+Nhập hàng loạt hotels / restaurants / places từ CSV, JSONL hoặc XLSX.
+
+- Dòng đầu của CSV / XLSX là tên cột (giống trường của HotelCreate / RestaurantCreate / PlaceCreate).
+  Ô trống = dùng giá trị mặc định. Cột image_urls / tags: JSON array hoặc "a|b|c";
+  cột cuisines (restaurants): JSON array các RestaurantCuisineDTO.
+- Mỗi dòng được kiểm tra bằng schema tạo mới + region_id / cuisine_id phải tồn tại;
+  dòng lỗi bị bỏ qua và được ghi vào báo cáo, các dòng còn lại vẫn được nhập.
+- Dòng hợp lệ được chèn theo lô (INSERT nhiều dòng, restaurants kèm restaurant_cuisines),
+  mỗi lô một transaction.
+"""
+import asyncio
+import csv
+import io
+import json
+
+from openpyxl import load_workbook
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.hotel import Hotel
+from app.models.place import Place
+from app.models.region import Region
+from app.models.restaurant import Cuisine, Restaurant, RestaurantCuisine
+from app.schemas.hotel import HotelCreate
+from app.schemas.place import PlaceCreate
+from app.schemas.restaurant import RestaurantCreate
+from app.utils.map import extract_lat_lng
+
+# Loại dữ liệu -> (model, schema kiểm tra dòng)
+KINDS = {
+    "hotels": (Hotel, HotelCreate),
+    "restaurants": (Restaurant, RestaurantCreate),
+    "places": (Place, PlaceCreate),
+}
+
+FORMATS = ("csv", "jsonl", "xlsx")
+
+_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/x-ndjson": "jsonl",
+    "application/jsonl": "jsonl",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": "xlsx",
+}
+
+_LIST_FIELDS = {"image_urls", "tags", "cuisines"}
+
+
+def detect_format(content_type: str | None = None, filename: str | None = None):
+    """Đoán định dạng từ Content-Type hoặc đuôi file; None nếu không đoán được."""
+    if content_type:
+        fmt = _CONTENT_TYPES.get(content_type.split(";")[0].strip().lower())
+        if fmt:
+            return fmt
+    if filename:
+        ext = filename.rsplit(".", 1)[-1].lower()
+        if ext in FORMATS:
+            return ext
+        if ext in ("ndjson", "json"):
+            return "jsonl"
+    return None
+
+
+def _clean(record: dict) -> dict:
+    cleaned = {}
+    for key, value in record.items():
+        if key is None:
+            continue  # Ô thừa ngoài header của CSV
+        key = str(key).strip()
+        if isinstance(value, str):
+            value = value.strip()
+            if key in _LIST_FIELDS and value:
+                value = json.loads(value) if value.startswith("[") else [v.strip() for v in value.split("|") if v.strip()]
+        if value is None or value == "":
+            continue
+        cleaned[key] = value
+    return cleaned
+
+
+def _read_csv(fileobj):
+    reader = csv.DictReader(io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline=""))
+    for row_no, record in enumerate(reader, start=1):
+        yield row_no, record
+
+
+def _read_jsonl(fileobj):
+    row_no = 0
+    for line in io.TextIOWrapper(fileobj, encoding="utf-8-sig"):
+        if not line.strip():
+            continue
+        row_no += 1
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield row_no, f"JSON không hợp lệ: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield row_no, "Mỗi dòng phải là một object JSON"
+            continue
+        yield row_no, record
+
+
+def _read_xlsx(fileobj):
+    workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        header = [str(h).strip() if h is not None else None for h in header]
+        row_no = 0
+        for values in rows:
+            if all(v is None for v in values):
+                continue
+            row_no += 1
+            yield row_no, dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+_READERS = {"csv": _read_csv, "jsonl": _read_jsonl, "xlsx": _read_xlsx}
+
+
+def iter_records(fileobj, fmt: str):
+    """
+    Đọc lần lượt từng dòng của file nhị phân (không nạp cả file vào bộ nhớ).
+    Sinh ra (số thứ tự dòng dữ liệu, dict đã làm sạch) hoặc (số thứ tự, chuỗi lỗi) nếu không đọc được.
+    """
+    row_no = 0
+    reader = _READERS[fmt](fileobj)
+    while True:
+        try:
+            row_no, record = next(reader)
+        except StopIteration:
+            return
+        except Exception as e:
+            # File hỏng giữa chừng (XLSX không mở được, CSV sai encoding...): báo lỗi và dừng
+            yield row_no + 1, f"Không đọc được file: {e}"
+            return
+
+        if isinstance(record, str):
+            yield row_no, record
+            continue
+        try:
+            record = _clean(record)
+        except ValueError as e:
+            record = f"Cột danh sách không hợp lệ: {e}"
+        yield row_no, record
+
+
+def _row_values(kind: str, item) -> tuple:
+    """(giá trị cột của dòng chính, danh sách restaurant_cuisines)."""
+    values = item.model_dump(exclude={"cuisines"})
+    values["image_urls"] = values.get("image_urls") or []
+    values["tags"] = values.get("tags") or []
+    # INSERT hàng loạt không chạy listener sync_coordinates của model
+    values["latitude"], values["longitude"] = extract_lat_lng(values.get("map_url"))
+    cuisines = [c.model_dump() for c in item.cuisines] if kind == "restaurants" else []
+    return values, cuisines
+
+
+def _check_refs(kind: str, item, region_ids: set, cuisine_ids: set) -> list:
+    errors = []
+    if item.region_id not in region_ids:
+        errors.append({"loc": ["region_id"], "msg": f"Vùng {item.region_id} không tồn tại"})
+    if kind == "restaurants":
+        seen = set()
+        for i, c in enumerate(item.cuisines):
+            if c.cuisine_id not in cuisine_ids:
+                errors.append({"loc": ["cuisines", i, "cuisine_id"], "msg": f"Cuisine {c.cuisine_id} không tồn tại"})
+            elif c.cuisine_id in seen:
+                errors.append({"loc": ["cuisines", i, "cuisine_id"], "msg": f"Cuisine {c.cuisine_id} bị lặp"})
+            seen.add(c.cuisine_id)
+    return errors
+
+
+def _add_error(report: dict, row_no: int, errors: list):
+    report["failed"] += 1
+    if len(report["errors"]) < settings.IMPORT_MAX_ERRORS:
+        report["errors"].append({"row": row_no, "errors": errors})
+    else:
+        report["errors_truncated"] = True
+
+
+async def _insert_rows(db: AsyncSession, kind: str, batch: list):
+    model, _ = KINDS[kind]
+    result = await db.execute(
+        insert(model).returning(model.id, sort_by_parameter_order=True),
+        [values for _, values, _ in batch],
+    )
+    ids = result.scalars().all()
+
+    links = [
+        {"restaurant_id": row_id, **cuisine}
+        for row_id, (_, _, cuisines) in zip(ids, batch)
+        for cuisine in cuisines
+    ]
+    if links:
+        await db.execute(insert(RestaurantCuisine), links)
+
+
+async def _flush(db: AsyncSession, kind: str, batch: list, report: dict):
+    try:
+        async with db.begin_nested():
+            await _insert_rows(db, kind, batch)
+        report["inserted"] += len(batch)
+    except DBAPIError:
+        # Lô vi phạm ràng buộc của DB (vd: chuỗi quá dài): chèn lại từng dòng để biết dòng nào lỗi
+        for entry in batch:
+            try:
+                async with db.begin_nested():
+                    await _insert_rows(db, kind, [entry])
+                report["inserted"] += 1
+            except DBAPIError as e:
+                _add_error(report, entry[0], [{"loc": [], "msg": str(e.orig)}])
+    await db.commit()
+
+
+def _prepare_batch(kind: str, records, batch_size: int, region_ids: set, cuisine_ids: set, report: dict) -> tuple:
+    """
+    Đọc + kiểm tra tới khi có batch_size dòng hợp lệ hoặc hết file (chạy trong thread: parse CSV / XLSX
+    và validate pydantic tốn CPU). Trả về (các dòng hợp lệ, các vùng liên quan, đã hết file?).
+    """
+    _, schema = KINDS[kind]
+    batch = []
+    touched_regions = set()
+
+    for row_no, record in records:
+        report["total"] += 1
+        if isinstance(record, str):
+            _add_error(report, row_no, [{"loc": [], "msg": record}])
+            continue
+        try:
+            item = schema.model_validate(record)
+        except ValidationError as e:
+            _add_error(report, row_no, e.errors(include_url=False, include_context=False, include_input=False))
+            continue
+
+        ref_errors = _check_refs(kind, item, region_ids, cuisine_ids)
+        if ref_errors:
+            _add_error(report, row_no, ref_errors)
+            continue
+
+        values, cuisines = _row_values(kind, item)
+        batch.append((row_no, values, cuisines))
+        touched_regions.add(item.region_id)
+        if len(batch) >= batch_size:
+            return batch, touched_regions, False
+
+    return batch, touched_regions, True
+
+
+async def import_records(db: AsyncSession, kind: str, records, batch_size: int = None) -> dict:
+    """
+    Kiểm tra và chèn các dòng từ iter_records theo lô batch_size.
+    Đọc / kiểm tra chạy trong thread, chỉ phần ghi DB chạy trên event loop.
+    Trả về báo cáo {"kind", "total", "inserted", "failed", "errors", "errors_truncated", "region_ids"}.
+    """
+    batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+    region_ids = set((await db.execute(select(Region.id))).scalars().all())
+    cuisine_ids = set((await db.execute(select(Cuisine.id))).scalars().all()) if kind == "restaurants" else set()
+
+    report = {"kind": kind, "total": 0, "inserted": 0, "failed": 0, "errors": [], "errors_truncated": False}
+    touched_regions = set()
+
+    done = False
+    while not done:
+        batch, regions, done = await asyncio.to_thread(
+            _prepare_batch, kind, records, batch_size, region_ids, cuisine_ids, report
+        )
+        if batch:
+            await _flush(db, kind, batch, report)
+            touched_regions |= regions
+
+    report["region_ids"] = sorted(touched_regions)
+    return report
@@ -0,0 +1,282 @@
+# app/services/catalogue_index.py
+import asyncio
+import math
+from collections import Counter
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.ai_context import next_version
+from app.utils.text import fold_text
+
+# Tham số BM25
+_K1 = 1.2
+_B = 0.75
+
+# Từ quá phổ biến trong prompt, không giúp phân biệt địa điểm
+_STOPWORDS = {
+    "ngay", "dem", "o", "di", "toi", "cho", "va", "voi", "cua", "mot", "nhung", "cac", "la", "co",
+    "the", "and", "for", "with", "in", "at", "to", "of", "a", "an", "day", "days", "trip", "plan",
+}
+
+_HOTELS_SQL = """
+    SELECT id, region_id, name, description, address, tags, price_per_night, rating, map_url,
+           image_urls[1] AS image_url
+    FROM hotels WHERE is_active = True {region_filter}
+"""
+
+_RESTAURANTS_SQL = """
+    SELECT r.id, r.region_id, r.name, r.description, r.address, r.tags, r.rating, r.map_url,
+           r.image_urls[1] AS image_url, MIN(rc.average_price) AS min_price,
+           COALESCE(array_agg(c.name) FILTER (WHERE c.name IS NOT NULL), '{{}}') AS cuisine_names
+    FROM restaurants r
+    LEFT JOIN restaurant_cuisines rc ON rc.restaurant_id = r.id
+    LEFT JOIN cuisines c ON c.id = rc.cuisine_id
+    WHERE r.is_active = True {region_filter}
+    GROUP BY r.id
+"""
+
+_PLACES_SQL = """
+    SELECT id, region_id, name, place_type, description, address, tags, average_price, rating, map_url,
+           image_urls[1] AS image_url
+    FROM places WHERE is_active = True {region_filter}
+"""
+
+
+def tokenize(value: str) -> list:
+    """Tách từ sau khi bỏ dấu; chữ Nhật (không có khoảng trắng) được tách thành bigram ký tự."""
+    tokens = []
+    for word in fold_text(value).split():
+        if word.isascii():
+            if len(word) > 1 and word not in _STOPWORDS:
+                tokens.append(word)
+        elif len(word) == 1:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def _hotel_doc(h) -> dict:
+    return {
+        "kind": "hotel",
+        "id": h.id,
+        "region_id": h.region_id,
+        "name": h.name,
+        "price": h.price_per_night,
+        "map_url": h.map_url,
+        "image_url": h.image_url,
+        "rating": h.rating or 0,
+        "line": f"ID:{h.id} | Tên:{h.name} | Giá:{h.price_per_night}đ | Map:{h.map_url}",
+        "terms": Counter(tokenize(" ".join([h.name or "", h.description or "", h.address or "", *(h.tags or [])]))),
+    }
+
+
+def _restaurant_doc(r) -> dict:
+    cuisines = list(r.cuisine_names or [])
+    line = f"ID:{r.id} | Tên:{r.name} | Map:{r.map_url}"
+    if cuisines:
+        line += f" | Món:{', '.join(cuisines)}"
+    return {
+        "kind": "restaurant",
+        "id": r.id,
+        "region_id": r.region_id,
+        "name": r.name,
+        "price": r.min_price,
+        "map_url": r.map_url,
+        "image_url": r.image_url,
+        "rating": r.rating or 0,
+        "line": line,
+        "terms": Counter(tokenize(" ".join([r.name or "", r.description or "", r.address or "", *(r.tags or []), *cuisines]))),
+    }
+
+
+def _place_doc(p) -> dict:
+    return {
+        "kind": "place",
+        "id": p.id,
+        "region_id": p.region_id,
+        "name": p.name,
+        "price": p.average_price,
+        "map_url": p.map_url,
+        "image_url": p.image_url,
+        "rating": p.rating or 0,
+        "line": f"ID:{p.id} | Tên:{p.name} | Loại:{p.place_type} | Giá:{p.average_price}đ | Map:{p.map_url}",
+        "terms": Counter(tokenize(" ".join([p.name or "", p.place_type or "", p.description or "", p.address or "", *(p.tags or [])]))),
+    }
+
+
+class CatalogueIndex:
+    """
+    Chỉ mục BM25 trong bộ nhớ trên hotel / restaurant / place.
+    Lưu dạng inverted index bằng mảng NumPy (term -> các doc + trọng số BM25);
+    tài liệu được cập nhật theo vùng, ma trận dựng lại lười ở lần truy vấn kế tiếp.
+    """
+
+    def __init__(self):
+        self.docs: dict = {}  # (kind, id) -> doc
+        self.version = 0
+        self._dirty = True
+        self._doc_list = []
+        self._region_ids = np.zeros(0, dtype=np.int64)
+        self._ratings = np.zeros(0, dtype=np.float32)
+        self._vocab: dict = {}
+        self._term_ptr = np.zeros(1, dtype=np.int64)
+        self._postings_doc = np.zeros(0, dtype=np.int64)
+        self._postings_weight = np.zeros(0, dtype=np.float32)
+
+    def replace_docs(self, docs, region_ids=None):
+        """Thay toàn bộ (region_ids=None) hoặc chỉ các tài liệu thuộc những vùng đã cho."""
+        if region_ids is None:
+            self.docs = {}
+        else:
+            region_ids = set(region_ids)
+            self.docs = {k: d for k, d in self.docs.items() if d["region_id"] not in region_ids}
+
+        for doc in docs:
+            self.docs[(doc["kind"], doc["id"])] = doc
+        self._dirty = True
+        self.version = next_version()
+
+    def _build(self):
+        doc_list = list(self.docs.values())
+        n_docs = len(doc_list)
+        lengths = np.array([sum(d["terms"].values()) for d in doc_list], dtype=np.float32)
+        avg_len = float(lengths.mean()) if n_docs else 0.0
+
+        postings: dict = {}
+        for doc_idx, doc in enumerate(doc_list):
+            for term, tf in doc["terms"].items():
+                postings.setdefault(term, []).append((doc_idx, tf))
+
+        vocab = {}
+        term_ptr = [0]
+        doc_ids = []
+        weights = []
+        for term, entries in postings.items():
+            vocab[term] = len(vocab)
+            idf = math.log(1 + (n_docs - len(entries) + 0.5) / (len(entries) + 0.5))
+            for doc_idx, tf in entries:
+                norm = 1 - _B + _B * (lengths[doc_idx] / avg_len if avg_len else 1)
+                doc_ids.append(doc_idx)
+                weights.append(idf * tf * (_K1 + 1) / (tf + _K1 * norm))
+            term_ptr.append(len(doc_ids))
+
+        self._doc_list = doc_list
+        self._region_ids = np.array([d["region_id"] or 0 for d in doc_list], dtype=np.int64)
+        self._ratings = np.array([d["rating"] for d in doc_list], dtype=np.float32)
+        self._vocab = vocab
+        self._term_ptr = np.array(term_ptr, dtype=np.int64)
+        self._postings_doc = np.array(doc_ids, dtype=np.int64)
+        self._postings_weight = np.array(weights, dtype=np.float32)
+        self._dirty = False
+
+    def search(self, query: str, region_id=None, limit: int = 20) -> list:
+        """Trả về [(doc, điểm)] liên quan nhất, điểm > 0, lọc theo vùng nếu có."""
+        if self._dirty:
+            self._build()
+        if not self._doc_list:
+            return []
+
+        scores = np.zeros(len(self._doc_list), dtype=np.float32)
+        for term, q_tf in Counter(tokenize(query)).items():
+            col = self._vocab.get(term)
+            if col is None:
+                continue
+            start, end = self._term_ptr[col], self._term_ptr[col + 1]
+            np.add.at(scores, self._postings_doc[start:end], self._postings_weight[start:end] * q_tf)
+
+        if region_id is not None:
+            scores[self._region_ids != region_id] = 0
+
+        matched = np.flatnonzero(scores > 0)
+        if matched.size == 0:
+            return []
+
+        # Rating chỉ dùng để phá thế hoà giữa các điểm số bằng nhau
+        ranked = matched[np.lexsort((-self._ratings[matched], -scores[matched]))][:limit]
+        return [(self._doc_list[i], float(scores[i])) for i in ranked]
+
+
+_index = CatalogueIndex()
+_loaded = False
+_lock = asyncio.Lock()
+
+
+async def _fetch_docs(db: AsyncSession, region_ids=None) -> list:
+    region_filter = ""
+    params = {}
+    if region_ids is not None:
+        params["region_ids"] = list(region_ids)
+
+    docs = []
+    for sql, make_doc, column in (
+        (_HOTELS_SQL, _hotel_doc, "region_id"),
+        (_RESTAURANTS_SQL, _restaurant_doc, "r.region_id"),
+        (_PLACES_SQL, _place_doc, "region_id"),
+    ):
+        if region_ids is not None:
+            region_filter = f"AND {column} = ANY(:region_ids)"
+        result = await db.execute(text(sql.format(region_filter=region_filter)), params)
+        docs.extend(make_doc(row) for row in result.fetchall())
+    return docs
+
+
+async def _ensure_loaded(db: AsyncSession):
+    global _loaded
+    if _loaded:
+        return
+    async with _lock:
+        if not _loaded:
+            _index.replace_docs(await _fetch_docs(db))
+            _loaded = True
+
+
+async def refresh_regions(db: AsyncSession, region_ids):
+    """Nạp lại tài liệu của các vùng có hotel/restaurant/place thay đổi."""
+    if not _loaded:
+        return
+    region_ids = [r for r in region_ids if r is not None]
+    if not region_ids:
+        return
+    async with _lock:
+        _index.replace_docs(await _fetch_docs(db, region_ids), region_ids)
+
+
+def lookup(kind: str, item_id: int):
+    """Tra một mục catalogue đang hoạt động trong bộ nhớ (None nếu không tồn tại / đã ẩn)."""
+    return _index.docs.get((kind, item_id))
+
+
+async def select_context(db: AsyncSession, prompt: str, region_id, token_budget: int, max_items: int):
+    """
+    Chọn các mục liên quan nhất tới prompt (trong vùng nếu có) sao cho vừa ngân sách token.
+    Trả về {"h_ctx", "r_ctx", "p_ctx", "count", "version"} hoặc None nếu không có mục nào liên quan.
+    """
+    await _ensure_loaded(db)
+    hits = _index.search(prompt, region_id=region_id, limit=max_items * 2)
+    if not hits:
+        return None
+
+    lines = {"hotel": [], "restaurant": [], "place": []}
+    used_tokens = 0
+    count = 0
+    for doc, _score in hits:
+        # Ước lượng thô: ~4 ký tự / token
+        cost = len(doc["line"]) // 4 + 1
+        if used_tokens + cost > token_budget:
+            continue
+        lines[doc["kind"]].append(doc["line"])
+        used_tokens += cost
+        count += 1
+        if count >= max_items:
+            break
+
+    return {
+        "h_ctx": "\n".join(lines["hotel"]),
+        "r_ctx": "\n".join(lines["restaurant"]),
+        "p_ctx": "\n".join(lines["place"]),
+        "count": count,
+        "version": _index.version,
+    }
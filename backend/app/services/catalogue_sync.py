@@ -0,0 +1,22 @@
+# app/services/catalogue_sync.py
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services import trip_cache, region_matcher, ai_context, catalogue_index, destination_snapshot
+
+
+async def on_catalogue_changed(db: AsyncSession, region_ids):
+    """
+    Gọi sau khi commit thay đổi hotel/restaurant/place để làm mới
+    các dữ liệu dẫn xuất từ catalogue của những vùng bị ảnh hưởng.
+    """
+    region_ids = {r for r in region_ids if r is not None}
+    trip_cache.invalidate_regions(region_ids)
+    destination_snapshot.invalidate_regions(region_ids)
+    await ai_context.refresh_regions(db, region_ids)
+    await catalogue_index.refresh_regions(db, region_ids)
+
+
+async def on_regions_changed(db: AsyncSession, region_ids):
+    """Gọi sau khi commit thay đổi ở bảng regions."""
+    await region_matcher.rebuild(db)
+    await on_catalogue_changed(db, region_ids)
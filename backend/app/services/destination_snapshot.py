@@ -0,0 +1,112 @@
+# app/services/destination_snapshot.py
+from collections import defaultdict
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.config import settings
+from app.models.hotel import Hotel
+from app.models.place import Place
+from app.models.region import Region
+from app.models.restaurant import Restaurant, RestaurantCuisine
+from app.schemas.hotel import HotelResponse
+from app.schemas.place import PlaceResponse
+from app.schemas.restaurant import RestaurantResponse
+from app.utils.cache import LRUCache
+from app.utils.pagination import keyset_page
+
+# Các phần của trang điểm đến: tên phần -> (model, schema trả về, options load quan hệ)
+SECTIONS = {
+    "hotels": (Hotel, HotelResponse, ()),
+    "restaurants": (
+        Restaurant,
+        RestaurantResponse,
+        (selectinload(Restaurant.cuisines_data).selectinload(RestaurantCuisine.cuisine),),
+    ),
+    "spots": (Place, PlaceResponse, ()),
+}
+
+_COUNTS_SQL = """
+    SELECT (SELECT count(*) FROM hotels WHERE region_id = :region_id) AS hotels,
+           (SELECT count(*) FROM restaurants WHERE region_id = :region_id) AS restaurants,
+           (SELECT count(*) FROM places WHERE region_id = :region_id) AS spots
+"""
+
+# Snapshot đã dựng sẵn của từng vùng: thông tin vùng + số lượng + top-N mỗi phần (dict JSON).
+# Chỉ vùng có hotel/restaurant/place thay đổi mới bị dựng lại (xem catalogue_sync).
+_snapshots = LRUCache(maxsize=settings.DESTINATION_SNAPSHOT_MAX_ENTRIES)
+
+# Đếm số lần invalidate theo vùng: snapshot dựng xong sau một lần ghi thì không được lưu
+_generations = defaultdict(int)
+_global_generation = 0
+
+
+def _region_dict(region: Region) -> dict:
+    return {
+        "id": region.id,
+        "name": region.name,
+        "description": region.description,
+        "cover_image": region.cover_image,
+        "latitude": region.latitude,
+        "longitude": region.longitude,
+    }
+
+
+async def fetch_section(db: AsyncSession, region_id: int, section: str, limit: int = None, after=None) -> tuple:
+    """
+    Một trang của một phần (hotels / restaurants / spots) trong vùng, rating cao trước.
+    after: (rating, id) của dòng cuối trang trước.
+    Trả về (danh sách dict JSON, (rating, id) của dòng cuối nếu còn trang sau, ngược lại None).
+    """
+    model, schema, options = SECTIONS[section]
+    stmt = select(model).where(model.region_id == region_id).options(*options)
+    rows, next_after = await keyset_page(db, stmt, model.rating, model.id, descending=True, after=after, limit=limit)
+    return [schema.model_validate(row[0]).model_dump(mode="json") for row in rows], next_after
+
+
+async def _build(db: AsyncSession, region_id: int):
+    region = await db.get(Region, region_id)
+    if region is None:
+        return None
+
+    counts = (await db.execute(text(_COUNTS_SQL), {"region_id": region_id})).one()
+    snapshot = {
+        **_region_dict(region),
+        "counts": dict(counts._mapping),
+    }
+    for section in SECTIONS:
+        snapshot[section], _ = await fetch_section(db, region_id, section, limit=settings.DESTINATION_TOP_N)
+    return snapshot
+
+
+async def get_snapshot(db: AsyncSession, region_id: int):
+    """
+    Thông tin vùng + số lượng mỗi phần + top-N mỗi phần; None nếu vùng không tồn tại.
+    Dict trả về dùng chung giữa các request: chỉ đọc, không sửa.
+    """
+    snapshot = _snapshots.get(region_id)
+    if snapshot is not None:
+        return snapshot
+
+    generation = (_global_generation, _generations[region_id])
+    snapshot = await _build(db, region_id)
+    if snapshot is not None and generation == (_global_generation, _generations[region_id]):
+        _snapshots.set(region_id, snapshot)
+    return snapshot
+
+
+def invalidate_regions(region_ids):
+    """Gọi sau khi commit thay đổi của vùng hoặc hotel/restaurant/place thuộc vùng."""
+    for region_id in region_ids:
+        if region_id is None:
+            continue
+        _generations[region_id] += 1
+        _snapshots.pop(region_id)
+
+
+def invalidate_all():
+    """Gọi khi dữ liệu dùng chung mọi vùng thay đổi (vd: tên cuisine)."""
+    global _global_generation
+    _global_generation += 1
+    _snapshots.clear()
@@ -0,0 +1,164 @@
+# app/services/facet_service.py
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+# Mốc chia khoảng giá mặc định (đ) theo loại; ghi đè bằng ?price_edges=
+DEFAULT_PRICE_EDGES = {
+    "hotels": [500_000, 1_000_000, 2_000_000, 5_000_000],
+    "restaurants": [100_000, 200_000, 500_000, 1_000_000],
+    "places": [50_000, 100_000, 200_000, 500_000],
+}
+RATING_EDGES = [3.0, 3.5, 4.0, 4.5]
+
+# Loại -> (bảng, biểu thức giá của một dòng); giá nhà hàng = món rẻ nhất
+_KINDS = {
+    "hotels": ("hotels", "t.price_per_night"),
+    "restaurants": (
+        "restaurants",
+        "(SELECT MIN(rc.average_price) FROM restaurant_cuisines rc WHERE rc.restaurant_id = t.id)",
+    ),
+    "places": ("places", "t.average_price"),
+}
+
+# Mỗi nhóm đếm với mọi bộ lọc, trừ bộ lọc của chính nó ở giá / rating
+# (để giao diện vẫn hiện số lượng của các khoảng khác khi đã chọn một khoảng)
+_FACETS_SQL = """
+    WITH base AS (
+        SELECT t.id, {price} AS price, t.rating, t.tags
+        FROM {table} t
+        WHERE {where}
+    ), f AS (
+        SELECT id, price, rating, tags, ({price_ok}) AS price_ok, ({rating_ok}) AS rating_ok FROM base
+    )
+    SELECT 'total' AS facet, NULL AS key, NULL AS label, count(*) AS n
+    FROM f WHERE price_ok AND rating_ok
+    UNION ALL
+    SELECT 'price', width_bucket(CAST(price AS float8), CAST(:price_edges AS float8[]))::text, NULL, count(*)
+    FROM f WHERE rating_ok AND price IS NOT NULL GROUP BY 2
+    UNION ALL
+    SELECT 'rating', width_bucket(CAST(rating AS float8), CAST(:rating_edges AS float8[]))::text, NULL, count(*)
+    FROM f WHERE price_ok AND rating IS NOT NULL GROUP BY 2
+    UNION ALL
+    (SELECT 'tag', tag, NULL, count(*)
+     FROM f, unnest(f.tags) AS tag
+     WHERE price_ok AND rating_ok
+     GROUP BY tag ORDER BY count(*) DESC, tag LIMIT :tag_limit)
+    {cuisine_facet}
+"""
+
+_CUISINE_FACET_SQL = """
+    UNION ALL
+    SELECT 'cuisine', c.id::text, c.name, count(DISTINCT f.id)
+    FROM f
+    JOIN restaurant_cuisines rc ON rc.restaurant_id = f.id
+    JOIN cuisines c ON c.id = rc.cuisine_id
+    WHERE price_ok AND rating_ok
+    GROUP BY c.id, c.name
+"""
+
+# Nhà hàng phải có đủ mọi cuisine đã chọn (giống tags)
+_CUISINE_FILTER_SQL = """
+    t.id IN (
+        SELECT restaurant_id FROM restaurant_cuisines
+        WHERE cuisine_id = ANY(:cuisine_ids)
+        GROUP BY restaurant_id
+        HAVING count(DISTINCT cuisine_id) = :cuisine_count
+    )
+"""
+
+# ?is_active= -> giá trị lọc (None = không lọc)
+_ACTIVE_FILTERS = {"true": True, "false": False, "all": None}
+
+
+def _build_sql(kind: str, filters: dict) -> tuple:
+    table, price = _KINDS[kind]
+    where = ["TRUE"]
+    params = {}
+
+    is_active = _ACTIVE_FILTERS[filters.get("is_active") or "all"]
+    if is_active is not None:
+        where.append("t.is_active = :is_active")
+        params["is_active"] = is_active
+    if filters.get("region_id") is not None:
+        where.append("t.region_id = :region_id")
+        params["region_id"] = filters["region_id"]
+    if filters.get("tags"):
+        where.append("t.tags @> CAST(:tags AS text[])")  # Dùng GIN index trên tags
+        params["tags"] = sorted(set(filters["tags"]))
+    if kind == "restaurants" and filters.get("cuisine_ids"):
+        where.append(_CUISINE_FILTER_SQL)
+        params["cuisine_ids"] = sorted(set(filters["cuisine_ids"]))
+        params["cuisine_count"] = len(params["cuisine_ids"])
+
+    price_ok = ["TRUE"]
+    if filters.get("min_price") is not None:
+        price_ok.append("price >= :min_price")
+        params["min_price"] = filters["min_price"]
+    if filters.get("max_price") is not None:
+        price_ok.append("price <= :max_price")
+        params["max_price"] = filters["max_price"]
+
+    rating_ok = "TRUE"
+    if filters.get("min_rating") is not None:
+        rating_ok = "rating >= :min_rating"
+        params["min_rating"] = filters["min_rating"]
+
+    sql = _FACETS_SQL.format(
+        table=table,
+        price=price,
+        where=" AND ".join(where),
+        price_ok=" AND ".join(price_ok),
+        rating_ok=rating_ok,
+        cuisine_facet=_CUISINE_FACET_SQL if kind == "restaurants" else "",
+    )
+    return sql, params
+
+
+def _buckets(edges: list, counts: dict) -> list:
+    """width_bucket: 0 = dưới mốc đầu, i = [edges[i-1], edges[i]), len(edges) = từ mốc cuối trở lên."""
+    bounds = [None, *edges, None]
+    return [
+        {"min": bounds[i], "max": bounds[i + 1], "count": counts.get(str(i), 0)}
+        for i in range(len(edges) + 1)
+    ]
+
+
+async def get_facets(db: AsyncSession, kind: str, filters: dict, price_edges: list = None) -> dict:
+    """
+    Số lượng theo tag, khoảng giá, khoảng rating (và cuisine với restaurants) cho một tổ hợp bộ lọc.
+    filters: region_id, is_active ("true" / "false" / "all"), tags, cuisine_ids, min_price, max_price,
+    min_rating (bỏ trống = không lọc).
+    Một câu SQL GROUP BY cho mọi nhóm; cache kết quả do http_cache ở API đảm nhận.
+    """
+    price_edges = sorted(price_edges or DEFAULT_PRICE_EDGES[kind])
+    sql, params = _build_sql(kind, filters)
+    params.update({
+        "price_edges": [float(e) for e in price_edges],
+        "rating_edges": RATING_EDGES,
+        "tag_limit": settings.FACET_MAX_TAGS,
+    })
+    rows = (await db.execute(text(sql), params)).fetchall()
+
+    grouped = {"total": {}, "price": {}, "rating": {}, "tag": [], "cuisine": []}
+    for row in rows:
+        if row.facet in ("tag", "cuisine"):
+            grouped[row.facet].append(row)
+        else:
+            grouped[row.facet][row.key] = row.n
+
+    facets = {
+        "kind": kind,
+        "total": grouped["total"].get(None, 0),
+        "price": _buckets(price_edges, grouped["price"]),
+        "rating": _buckets(RATING_EDGES, grouped["rating"]),
+        "tags": [{"tag": row.key, "count": row.n} for row in grouped["tag"]],
+    }
+    if kind == "restaurants":
+        facets["cuisines"] = sorted(
+            ({"id": int(row.key), "name": row.label, "count": row.n} for row in grouped["cuisine"]),
+            key=lambda c: (-c["count"], c["name"]),
+        )
+
+    return facets
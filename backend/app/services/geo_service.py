@@ -0,0 +1,88 @@
+# app/services/geo_service.py
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+GEO_KINDS = ("hotel", "restaurant", "place")
+
+# Cần migrations/006_coordinates.sql (cột latitude / longitude + index GiST ll_to_earth)
+_TABLES = {
+    "hotel": ("hotels", "price_per_night"),
+    "restaurant": ("restaurants", "NULL::integer"),
+    "place": ("places", "average_price"),
+}
+
+# Điều kiện giống hệt predicate của partial index
+_HAS_COORDS = "latitude IS NOT NULL AND longitude IS NOT NULL"
+
+_NEARBY_SQL = """
+    SELECT '{kind}' AS kind, id, region_id, name, latitude, longitude, rating, map_url,
+           image_urls[1] AS image_url, {price} AS price,
+           earth_distance(ll_to_earth(latitude, longitude), ll_to_earth(:lat, :lng)) AS distance_m
+    FROM {table}
+    WHERE is_active = True AND {has_coords} {filters}
+    ORDER BY ll_to_earth(latitude, longitude) <-> ll_to_earth(:lat, :lng)
+    LIMIT :k
+"""
+
+
+async def get_coordinates(db: AsyncSession, kind: str, item_id: int):
+    """(lat, lng) của một hotel / restaurant / place, hoặc None nếu không có / chưa có toạ độ."""
+    table, _price = _TABLES[kind]
+    result = await db.execute(
+        text(f"SELECT latitude, longitude FROM {table} WHERE id = :id AND {_HAS_COORDS}"),
+        {"id": item_id},
+    )
+    row = result.first()
+    return (row.latitude, row.longitude) if row else None
+
+
+async def find_nearby(
+    db: AsyncSession,
+    lat: float,
+    lng: float,
+    kinds=GEO_KINDS,
+    radius_m: float = None,
+    k: int = 20,
+    region_id: int = None,
+    exclude: tuple = None,
+) -> list:
+    """
+    k mục gần (lat, lng) nhất, tuỳ chọn trong bán kính radius_m (mét), sắp theo khoảng cách.
+    Mỗi loại một truy vấn KNN trên index GiST rồi gộp lại; exclude = (kind, id) của mục gốc.
+    """
+    params = {"lat": lat, "lng": lng, "k": k + (1 if exclude else 0)}
+    filters = ""
+    if radius_m is not None:
+        # earth_box dùng index (hộp bao), earth_distance loại các góc hộp nằm ngoài bán kính
+        filters += (" AND earth_box(ll_to_earth(:lat, :lng), :radius) @> ll_to_earth(latitude, longitude)"
+                    " AND earth_distance(ll_to_earth(latitude, longitude), ll_to_earth(:lat, :lng)) <= :radius")
+        params["radius"] = radius_m
+    if region_id is not None:
+        filters += " AND region_id = :region_id"
+        params["region_id"] = region_id
+
+    hits = []
+    for kind in kinds:
+        table, price = _TABLES[kind]
+        result = await db.execute(text(_NEARBY_SQL.format(
+            kind=kind, table=table, price=price, has_coords=_HAS_COORDS, filters=filters
+        )), params)
+        for row in result.fetchall():
+            if exclude and (kind, row.id) == tuple(exclude):
+                continue
+            hits.append({
+                "kind": kind,
+                "id": row.id,
+                "region_id": row.region_id,
+                "name": row.name,
+                "latitude": row.latitude,
+                "longitude": row.longitude,
+                "distance_m": round(float(row.distance_m), 1),
+                "rating": row.rating,
+                "price": row.price,
+                "map_url": row.map_url,
+                "image_url": row.image_url,
+            })
+
+    hits.sort(key=lambda h: (h["distance_m"], h["kind"], h["id"]))
+    return hits[:k]
@@ -0,0 +1,84 @@
+# app/services/itinerary_enrichment.py
+from app.services import catalogue_index
+from app.utils.text import fold_text
+
+ITEM_KINDS = ("hotel", "restaurant", "place")
+
+# Từ khoá (đã bỏ dấu) để đoán loại mục từ trường "type" do AI/người dùng ghi
+_KIND_KEYWORDS = {
+    "hotel": ("hotel", "khach san", "luu tru", "nghi ngoi", "ryokan", "resort", "hostel", "stay", "accommodation", "check in"),
+    "restaurant": ("restaurant", "nha hang", "an uong", "am thuc", "quan an", "food", "dining", "meal", "lunch", "dinner",
+                   "breakfast", "an trua", "an toi", "an sang", "cafe"),
+    "place": ("place", "spot", "tham quan", "diem den", "sightseeing", "attraction", "temple", "chua", "den", "museum",
+              "bao tang", "park", "cong vien", "shopping", "mua sam", "giai tri", "entertainment", "event", "su kien"),
+}
+
+
+def classify_item_type(item_type: str | None):
+    """Đoán loại mục ("hotel" / "restaurant" / "place") từ chuỗi type tự do; None nếu không đoán được."""
+    folded = f" {fold_text(item_type or '')} "
+    for kind, keywords in _KIND_KEYWORDS.items():
+        if any(f" {k} " in folded for k in keywords):
+            return kind
+    return None
+
+
+def name_similarity(a: str | None, b: str | None) -> float:
+    """Độ giống tên (sau khi bỏ dấu): 1.0 nếu tên này chứa tên kia, ngược lại Jaccard theo từ."""
+    a, b = fold_text(a or ""), fold_text(b or "")
+    if not a or not b:
+        return 0.0
+    if a in b or b in a:
+        return 1.0
+    tokens_a, tokens_b = set(a.split()), set(b.split())
+    return len(tokens_a & tokens_b) / len(tokens_a | tokens_b)
+
+
+def names_match(a: str | None, b: str | None) -> bool:
+    return name_similarity(a, b) >= 0.5
+
+
+def _resolve(item: dict, region_id):
+    """Tìm mục catalogue thật ứng với item_id của AI; None nếu ID không hợp lệ."""
+    item_id = item.get("item_id")
+    if isinstance(item_id, str) and item_id.strip().isdigit():
+        item_id = int(item_id)
+    if not isinstance(item_id, int) or isinstance(item_id, bool) or item_id <= 0:
+        return None
+
+    kind = classify_item_type(item.get("type"))
+    candidates = [
+        doc for doc in (catalogue_index.lookup(k, item_id) for k in ((kind,) if kind else ITEM_KINDS))
+        if doc is not None and (region_id is None or doc["region_id"] == region_id)
+    ]
+
+    # ID tồn tại trong vùng (và đúng loại nếu đoán được loại) là đủ: AI hay viết lại tên địa điểm.
+    # Tên chỉ dùng để chọn khi cùng ID có ở nhiều loại.
+    if len(candidates) <= 1:
+        return candidates[0] if candidates else None
+    scored = sorted(((name_similarity(doc["name"], item.get("location")), doc) for doc in candidates),
+                    key=lambda pair: pair[0], reverse=True)
+    if scored[0][0] == 0 or scored[0][0] == scored[1][0]:
+        return None
+    return scored[0][1]
+
+
+def enrich_day(day: dict, region_id=None) -> dict:
+    """
+    Kiểm tra mọi item_id trong ngày với catalogue trong bộ nhớ:
+    bỏ ID bịa/không khớp, và điền giá, map_url, ảnh thật cho các mục hợp lệ.
+    """
+    for item in day.get("items", []):
+        doc = _resolve(item, region_id)
+        if doc is None:
+            item["item_id"] = None
+            continue
+
+        item["item_id"] = doc["id"]
+        if doc["price"] is not None:
+            item["price"] = doc["price"]
+        if doc["map_url"]:
+            item["map_url"] = doc["map_url"]
+        if doc["image_url"]:
+            item["image_url"] = doc["image_url"]
+    return day
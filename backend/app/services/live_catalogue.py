@@ -0,0 +1,86 @@
+# app/services/live_catalogue.py
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.itinerary_enrichment import ITEM_KINDS, classify_item_type, names_match
+
+# Mỗi loại mục một truy vấn IN cho cả response
+_LIVE_SQL = {
+    "hotel": """
+        SELECT id, name, price_per_night AS price, rating, image_urls[1] AS image_url, map_url, is_active
+        FROM hotels WHERE id = ANY(:ids)
+    """,
+    "restaurant": """
+        SELECT r.id, r.name, MIN(rc.average_price) AS price, r.rating, r.image_urls[1] AS image_url,
+               r.map_url, r.is_active
+        FROM restaurants r
+        LEFT JOIN restaurant_cuisines rc ON rc.restaurant_id = r.id
+        WHERE r.id = ANY(:ids)
+        GROUP BY r.id
+    """,
+    "place": """
+        SELECT id, name, average_price AS price, rating, image_urls[1] AS image_url, map_url, is_active
+        FROM places WHERE id = ANY(:ids)
+    """,
+}
+
+
+def _iter_items(itineraries):
+    for itinerary in itineraries:
+        for day in itinerary:
+            for item in day.get("items", []):
+                if item.get("item_id"):
+                    yield item
+
+
+async def attach_live_data(db: AsyncSession, itineraries) -> dict:
+    """
+    Gắn dữ liệu hiện tại của hotel / restaurant / place được tham chiếu (reference_id -> "item_id")
+    vào từng item dưới khoá "live": {"kind", "price", "rating", "image_url", "map_url", "is_active"}.
+    Chỉ mục đã được tra theo loại của nó mà không còn mới có "live": {"kind", "is_active": False, "deleted": True};
+    không đoán được loại hoặc không xác định được mục nào (trùng id ở nhiều loại, không trùng tên)
+    thì "live" là None.
+    Loại mục đoán từ "type"; nếu không đoán được thì tra mọi loại và chọn mục trùng tên với location.
+    Trả về {(kind, id): dữ liệu} đã tra (dùng làm dấu vân tay cho ETag).
+    """
+    itineraries = list(itineraries)
+    wanted = {kind: set() for kind in ITEM_KINDS}
+    for item in _iter_items(itineraries):
+        kind = classify_item_type(item.get("type"))
+        for k in ((kind,) if kind else ITEM_KINDS):
+            wanted[k].add(item["item_id"])
+
+    found = {}
+    for kind, ids in wanted.items():
+        if not ids:
+            continue
+        result = await db.execute(text(_LIVE_SQL[kind]), {"ids": list(ids)})
+        for row in result.fetchall():
+            found[(kind, row.id)] = {
+                "kind": kind,
+                "name": row.name,
+                "price": row.price,
+                "rating": row.rating,
+                "image_url": row.image_url,
+                "map_url": row.map_url,
+                "is_active": bool(row.is_active),
+            }
+
+    for item in _iter_items(itineraries):
+        kind = classify_item_type(item.get("type"))
+        kinds = (kind,) if kind else ITEM_KINDS
+        keys = [(k, item["item_id"]) for k in kinds]
+        candidates = [found[key] for key in keys if key in found]
+
+        if len(candidates) == 1:
+            item["live"] = candidates[0]
+        elif candidates:
+            # Cùng id ở nhiều loại: chọn mục trùng tên, không chắc thì để trống
+            item["live"] = next((c for c in candidates if names_match(c["name"], item.get("location"))), None)
+        elif kind and item["item_id"] in wanted[kind]:
+            # Đã tra id theo đúng loại của mục mà không thấy: mục đã bị xoá
+            item["live"] = {"kind": kind, "is_active": False, "deleted": True}
+        else:
+            item["live"] = None
+
+    return found
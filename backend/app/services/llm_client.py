@@ -0,0 +1,227 @@
+# app/services/llm_client.py
+import asyncio
+import json
+import re
+from abc import ABC, abstractmethod
+
+from app.core.config import settings
+
+
+class LLMProvider(ABC):
+    """
+    Giao diện chung cho nhà cung cấp LLM (Groq, giả lập cục bộ...).
+    Provider thiếu complete / stream báo lỗi ngay khi khởi tạo, không phải giữa request.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    async def complete(self, prompt: str, temperature: float) -> tuple[str, int]:
+        """Trả về (nội dung JSON, tổng số token đã dùng)."""
+
+    @abstractmethod
+    def stream(self, prompt: str, temperature: float):
+        """Async generator sinh ra từng đoạn nội dung JSON."""
+
+
+class GroqProvider(LLMProvider):
+    name = "groq"
+
+    def __init__(self):
+        from groq import AsyncGroq
+
+        # Client async: không chặn event loop của uvicorn trong lúc chờ LLM trả lời
+        self.client = AsyncGroq(
+            api_key=settings.GROQ_API_KEY,
+            timeout=settings.LLM_TIMEOUT_SECONDS,
+            max_retries=1,
+        )
+
+    async def complete(self, prompt: str, temperature: float) -> tuple[str, int]:
+        chat_completion = await self.client.chat.completions.create(
+            messages=[{"role": "user", "content": prompt}],
+            model=settings.GROQ_MODEL,
+            response_format={"type": "json_object"},
+            temperature=temperature,
+        )
+        usage = getattr(chat_completion, "usage", None)
+        total_tokens = getattr(usage, "total_tokens", 0) or 0
+        return chat_completion.choices[0].message.content, total_tokens
+
+    async def stream(self, prompt: str, temperature: float):
+        stream = await self.client.chat.completions.create(
+            messages=[{"role": "user", "content": prompt}],
+            model=settings.GROQ_MODEL,
+            response_format={"type": "json_object"},
+            temperature=temperature,
+            stream=True,
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+class FakeProvider(LLMProvider):
+    """
+    LLM giả lập để load-test / benchmark: không gọi mạng, độ trễ cấu hình được,
+    trả về JSON xác định (cùng prompt -> cùng kết quả) dựng từ DỮ LIỆU CÓ SẴN trong prompt.
+    """
+
+    name = "fake"
+
+    _line_pattern = re.compile(r"^ID:(\d+) \| Tên:(.*?)(?: \| (.*))?$", re.MULTILINE)
+    _days_pattern = re.compile(r"(\d+)\s*(?:ngày|days?|日)", re.IGNORECASE)
+    _region_pattern = re.compile(r'"region_id": (\d+|null)')
+    _request_pattern = re.compile(r'YÊU CẦU: "(.*)"')
+
+    def __init__(self, latency_ms: int | None = None, chunk_size: int = 64):
+        self.latency = (settings.FAKE_LLM_LATENCY_MS if latency_ms is None else latency_ms) / 1000
+        self.chunk_size = chunk_size
+
+    def build_response(self, prompt: str) -> str:
+        entries = []
+        for item_id, name, rest in self._line_pattern.findall(prompt):
+            price = re.search(r"Giá:(\d+)", rest)
+            map_url = re.search(r"Map:(\S+)", rest)
+            kind = "place" if "Loại:" in rest else "hotel" if price else "restaurant"
+            entries.append({
+                "item_id": int(item_id),
+                "location": name,
+                "type": kind,
+                "price": int(price.group(1)) if price else 0,
+                "map_url": map_url.group(1) if map_url and map_url.group(1) != "None" else None,
+            })
+
+        request = self._request_pattern.search(prompt)
+        request = request.group(1) if request else ""
+        days = self._days_pattern.search(request)
+        total_days = min(max(int(days.group(1)), 1), 7) if days else 3
+        region = self._region_pattern.search(prompt)
+        region_id = int(region.group(1)) if region and region.group(1) != "null" else None
+
+        itinerary = []
+        slots = ["08:00", "12:00", "15:00", "19:00"]
+        for day in range(1, total_days + 1):
+            items = []
+            for slot_idx, time_slot in enumerate(slots):
+                if entries:
+                    entry = entries[((day - 1) * len(slots) + slot_idx) % len(entries)]
+                    items.append({"time": time_slot, "activity": f"Ghé {entry['location']}", **entry})
+                else:
+                    items.append({
+                        "time": time_slot, "activity": "Tự do khám phá", "location": "Trung tâm",
+                        "item_id": None, "type": "place", "price": 0, "map_url": None,
+                    })
+            itinerary.append({"day": day, "items": items})
+
+        total = sum(item["price"] for day in itinerary for item in day["items"])
+        return json.dumps({
+            "title": f"Lịch trình {total_days} ngày",
+            "region_id": region_id,
+            "budget_summary": {"total_per_person": total, "note": "Dữ liệu giả lập"},
+            "itinerary": itinerary,
+        }, ensure_ascii=False)
+
+    async def complete(self, prompt: str, temperature: float) -> tuple[str, int]:
+        await asyncio.sleep(self.latency)
+        content = self.build_response(prompt)
+        # Ước lượng token ~4 ký tự / token
+        return content, (len(prompt) + len(content)) // 4
+
+    async def stream(self, prompt: str, temperature: float):
+        content = self.build_response(prompt)
+        chunks = [content[i:i + self.chunk_size] for i in range(0, len(content), self.chunk_size)]
+        for chunk in chunks:
+            await asyncio.sleep(self.latency / len(chunks))
+            yield chunk
+
+
+_PROVIDERS = {
+    "groq": GroqProvider,
+    "fake": FakeProvider,
+}
+
+_provider: LLMProvider | None = None
+
+# Giới hạn số lời gọi LLM chạy song song trên mỗi worker
+_llm_semaphore = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+
+
+def get_provider() -> LLMProvider:
+    global _provider
+    if _provider is None:
+        provider_cls = _PROVIDERS.get(settings.LLM_PROVIDER)
+        if provider_cls is None:
+            raise ValueError(f"LLM_PROVIDER không hợp lệ: {settings.LLM_PROVIDER}")
+        _provider = provider_cls()
+    return _provider
+
+
+def set_provider(provider: LLMProvider):
+    """Thay provider đang dùng (VD: benchmark dùng FakeProvider)."""
+    global _provider
+    _provider = provider
+
+
+async def complete_json(prompt: str, temperature: float = 0.2) -> tuple[str, int]:
+    """
+    Gọi LLM ở chế độ JSON, trả về (nội dung JSON, tổng số token đã dùng).
+    Ném asyncio.TimeoutError nếu quá LLM_TIMEOUT_SECONDS.
+    """
+    provider = get_provider()
+    async with _llm_semaphore:
+        return await asyncio.wait_for(
+            provider.complete(prompt, temperature),
+            timeout=settings.LLM_TIMEOUT_SECONDS,
+        )
+
+
+async def stream_json(prompt: str, temperature: float = 0.2):
+    """
+    Gọi LLM ở chế độ stream, sinh ra từng đoạn nội dung (delta) của chuỗi JSON.
+    Tổng thời gian stream cũng bị giới hạn bởi LLM_TIMEOUT_SECONDS.
+    Một task riêng đọc stream của provider vào hàng đợi và trả slot LLM ngay khi provider
+    trả xong, không phải chờ client đọc hết (client chậm không giữ slot của người khác).
+    """
+    provider = get_provider()
+    queue = asyncio.Queue()
+    done = object()
+
+    async def produce():
+        try:
+            async with _llm_semaphore:
+                loop = asyncio.get_running_loop()
+                deadline = loop.time() + settings.LLM_TIMEOUT_SECONDS
+
+                chunks = provider.stream(prompt, temperature).__aiter__()
+                try:
+                    while True:
+                        try:
+                            chunk = await asyncio.wait_for(chunks.__anext__(), timeout=deadline - loop.time())
+                        except StopAsyncIteration:
+                            break
+                        queue.put_nowait(chunk)
+                finally:
+                    await chunks.aclose()
+            queue.put_nowait(done)
+        except Exception as e:
+            # Chuyển lỗi (kể cả TimeoutError) sang phía tiêu thụ
+            queue.put_nowait(e)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            chunk = await queue.get()
+            if chunk is done:
+                break
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+    finally:
+        # Client ngắt giữa chừng: dừng đọc provider và trả slot
+        if not producer.done():
+            producer.cancel()
+            try:
+                await producer
+            except asyncio.CancelledError:
+                pass
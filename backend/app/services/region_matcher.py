@@ -0,0 +1,159 @@
+# app/services/region_matcher.py
+import asyncio
+import json
+from collections import deque
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.utils.text import fold_text
+
+# Tên gọi khác của các vùng phổ biến (key là tên vùng đã fold_text).
+# Có thể bổ sung/ghi đè qua biến môi trường REGION_ALIASES (JSON: {"Tên vùng hoặc ID": ["alias", ...]}).
+DEFAULT_ALIASES = {
+    "tokyo": ["東京", "とうきょう", "tokio", "to ki o"],
+    "kyoto": ["京都", "きょうと", "kyo to"],
+    "osaka": ["大阪", "おおさか", "o sa ka", "dai phan"],
+    "hokkaido": ["北海道", "ほっかいどう", "hokaido", "bac hai dao"],
+    "okinawa": ["沖縄", "おきなわ", "xung thang"],
+    "nara": ["奈良"],
+    "hiroshima": ["広島", "ひろしま", "quang dao"],
+    "fukuoka": ["福岡", "ふくおか", "phuc cuong"],
+    "nagoya": ["名古屋", "なごや", "danh co oc"],
+    "sapporo": ["札幌", "さっぽろ"],
+    "yokohama": ["横浜", "よこはま", "hoanh tan"],
+    "kobe": ["神戸", "こうべ"],
+    "hakone": ["箱根", "はこね"],
+    "nikko": ["日光", "にっこう"],
+    "kanazawa": ["金沢", "かなざわ"],
+    "fuji": ["富士", "ふじ", "phu si"],
+}
+
+# Alias chữ Hán cũng là một từ thông thường (日光 = ánh nắng, 日光浴 = tắm nắng):
+# chỉ khớp khi không có chữ Hán khác ngay sau
+STANDALONE_ALIASES = {"日光"}
+
+
+class AhoCorasick:
+    """Automaton Aho-Corasick: tìm mọi pattern trong văn bản với một lần quét."""
+
+    def __init__(self, patterns: dict):
+        # patterns: chuỗi pattern -> payload
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+
+        for pattern, payload in patterns.items():
+            node = 0
+            for ch in pattern:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = nxt
+            self._out[node].append((pattern, payload))
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def search(self, text_value: str):
+        """Sinh ra (vị trí bắt đầu, pattern, payload) cho mọi lần khớp."""
+        node = 0
+        for i, ch in enumerate(text_value):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            for pattern, payload in self._out[node]:
+                yield i - len(pattern) + 1, pattern, payload
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isascii() and ch.isalnum()
+
+
+def _is_kanji(ch: str) -> bool:
+    return "\u4e00" <= ch <= "\u9fff" or ch == "々"
+
+
+class RegionMatcher:
+    def __init__(self, regions, aliases: dict):
+        patterns = {}
+        for region in regions:
+            folded_name = fold_text(region.name)
+            names = [region.name]
+            names += DEFAULT_ALIASES.get(folded_name, [])
+            names += aliases.get(region.name, []) + aliases.get(str(region.id), [])
+
+            for name in names:
+                pattern = fold_text(name)
+                if pattern:
+                    # Nếu 2 vùng trùng alias, giữ vùng có tên khớp đúng alias đó
+                    if pattern not in patterns or pattern == folded_name:
+                        patterns[pattern] = region.id
+
+        self.size = len(patterns)
+        self._standalone = {fold_text(alias) for alias in STANDALONE_ALIASES}
+        self._automaton = AhoCorasick(patterns)
+
+    def match(self, prompt: str):
+        """Trả về region_id khớp tốt nhất (pattern dài nhất, xuất hiện sớm nhất) hoặc None."""
+        folded = fold_text(prompt)
+        best = None  # (độ dài, -vị trí, region_id)
+
+        for start, pattern, region_id in self._automaton.search(folded):
+            end = start + len(pattern)
+            # Pattern chữ Latin phải khớp trọn từ ("nara" không khớp trong "narai")
+            if _is_word_char(pattern[0]) and start > 0 and _is_word_char(folded[start - 1]):
+                continue
+            if _is_word_char(pattern[-1]) and end < len(folded) and _is_word_char(folded[end]):
+                continue
+            if pattern in self._standalone and end < len(folded) and _is_kanji(folded[end]):
+                continue
+
+            candidate = (len(pattern), -start, region_id)
+            if best is None or candidate[:2] > best[:2]:
+                best = candidate
+
+        return best[2] if best else None
+
+
+def _load_aliases() -> dict:
+    if not settings.REGION_ALIASES:
+        return {}
+    try:
+        raw = json.loads(settings.REGION_ALIASES)
+        return {str(k): list(v) for k, v in raw.items()}
+    except (ValueError, AttributeError, TypeError) as e:
+        print(f"REGION_ALIASES không hợp lệ: {e}")
+        return {}
+
+
+_matcher: RegionMatcher | None = None
+_lock = asyncio.Lock()
+
+
+async def rebuild(db: AsyncSession):
+    """Dựng lại matcher từ bảng regions. Gọi sau mọi thay đổi ở api/regions.py."""
+    global _matcher
+    async with _lock:
+        result = await db.execute(text("SELECT id, name FROM regions"))
+        _matcher = RegionMatcher(result.fetchall(), _load_aliases())
+
+
+async def detect_region(prompt: str, db: AsyncSession):
+    """Nhận diện vùng trong prompt; chỉ truy vấn DB ở lần đầu (khi matcher chưa được dựng)."""
+    if _matcher is None:
+        await rebuild(db)
+    return _matcher.match(prompt)
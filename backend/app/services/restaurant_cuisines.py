@@ -0,0 +1,38 @@
+# app/services/restaurant_cuisines.py
+from sqlalchemy import delete, or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.restaurant import RestaurantCuisine
+
+# Các cột được cập nhật khi (restaurant_id, cuisine_id) đã tồn tại
+_VALUE_COLUMNS = ("description", "average_price", "price_range", "image_url", "is_available")
+
+
+async def sync_cuisines(db: AsyncSession, restaurant_id: int, cuisines: list) -> dict:
+    """
+    Đồng bộ danh sách ẩm thực của nhà hàng với cuisines (list RestaurantCuisineDTO) bằng 2 câu lệnh:
+    một upsert theo (restaurant_id, cuisine_id) chỉ ghi các dòng thực sự khác,
+    và một DELETE cho các cuisine không còn trong danh sách.
+    Dòng không đổi giữ nguyên id. Cuisine lặp lại trong danh sách: bản cuối cùng được giữ.
+    Trả về {"upserted", "deleted"} (số dòng được thêm / sửa, số dòng bị xoá).
+    """
+    rows = {c.cuisine_id: {"restaurant_id": restaurant_id, **c.model_dump()} for c in cuisines}
+
+    upserted = 0
+    if rows:
+        stmt = insert(RestaurantCuisine).values(list(rows.values()))
+        changed = [getattr(RestaurantCuisine, col).is_distinct_from(stmt.excluded[col]) for col in _VALUE_COLUMNS]
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[RestaurantCuisine.restaurant_id, RestaurantCuisine.cuisine_id],
+            set_={col: stmt.excluded[col] for col in _VALUE_COLUMNS},
+            where=or_(*changed),
+        )
+        upserted = (await db.execute(stmt)).rowcount
+
+    stale = delete(RestaurantCuisine).where(RestaurantCuisine.restaurant_id == restaurant_id)
+    if rows:
+        stale = stale.where(RestaurantCuisine.cuisine_id.not_in(list(rows)))
+    deleted = (await db.execute(stale.execution_options(synchronize_session=False))).rowcount
+
+    return {"upserted": upserted, "deleted": deleted}
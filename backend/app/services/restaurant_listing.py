@@ -0,0 +1,65 @@
+# app/services/restaurant_listing.py
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.models.region import Region
+from app.models.restaurant import Restaurant, RestaurantCuisine
+from app.utils.pagination import keyset_page
+
+
+def _restaurant_dict(r, region_name) -> dict:
+    r_dict = {
+        "id": r.id,
+        "region_id": r.region_id,
+        "name": r.name,
+        "description": r.description,
+        "address": r.address,
+        "map_url": r.map_url,
+        "latitude": r.latitude,
+        "longitude": r.longitude,
+        "rating": r.rating,
+        "image_urls": r.image_urls or [],
+        "tags": r.tags or [],
+        "is_active": r.is_active,
+        "created_at": r.created_at,
+    }
+    r_dict["region_name"] = region_name
+    # Map cuisines_data để lấy tên cuisine
+    r_dict["cuisines_data"] = [
+        {
+            "id": rc.id,
+            "cuisine_id": rc.cuisine_id,
+            "cuisine_name": rc.cuisine.name if rc.cuisine else "Unknown",
+            "description": rc.description,
+            "average_price": rc.average_price,
+            "price_range": rc.price_range,
+            "is_available": rc.is_available,
+            "image_url": rc.image_url,
+        }
+        for rc in r.cuisines_data
+    ]
+    return r_dict
+
+
+async def fetch_listing(db: AsyncSession, region_id=None, limit=None, after_id=None) -> tuple:
+    """
+    Danh sách nhà hàng (kèm tên vùng và các món), mới nhất trước.
+    Trả về (danh sách dict, id dòng cuối nếu còn trang sau, ngược lại None).
+    Response được cache ở tầng HTTP (app/utils/http_cache.py).
+    """
+    # Query nhà hàng + tên vùng + load relationship cuisines
+    query = (
+        select(Restaurant, Region.name.label("region_name"))
+        .join(Region, Restaurant.region_id == Region.id)
+        .options(
+            selectinload(Restaurant.cuisines_data).selectinload(RestaurantCuisine.cuisine)
+        )
+    )
+    if region_id is not None:
+        query = query.where(Restaurant.region_id == region_id)
+
+    after = (after_id, after_id) if after_id is not None else None
+    rows, next_after = await keyset_page(db, query, Restaurant.id, Restaurant.id, descending=True, after=after, limit=limit)
+    data = [_restaurant_dict(row.Restaurant, row.region_name) for row in rows]
+    return data, next_after[1] if next_after else None
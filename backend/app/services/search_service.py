@@ -0,0 +1,107 @@
+# app/services/search_service.py
+import re
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.utils.text import fold_text
+
+SEARCH_KINDS = ("hotel", "restaurant", "place")
+
+# Cần migrations/005_catalogue_search.sql (cột search_vector / search_name + index GIN)
+_BRANCH_SQL = {
+    "hotel": """
+        SELECT 'hotel' AS kind, h.id, h.region_id, h.name, h.address, h.rating,
+               h.image_urls[1] AS image_url, h.price_per_night AS price, {score} AS score
+        FROM hotels h
+        WHERE h.is_active = True AND {match} {region_filter}
+    """,
+    "restaurant": """
+        SELECT 'restaurant' AS kind, h.id, h.region_id, h.name, h.address, h.rating,
+               h.image_urls[1] AS image_url, NULL::integer AS price, {score} AS score
+        FROM restaurants h
+        WHERE h.is_active = True AND {match} {region_filter}
+    """,
+    "place": """
+        SELECT 'place' AS kind, h.id, h.region_id, h.name, h.address, h.rating,
+               h.image_urls[1] AS image_url, h.average_price AS price, {score} AS score
+        FROM places h
+        WHERE h.is_active = True AND {match} {region_filter}
+    """,
+}
+
+# Khớp toàn văn (search_vector) HOẶC gần đúng trên tên (trigram), mỗi vế dùng một index GIN
+_MATCH_SQL = "(h.search_vector @@ to_tsquery('simple', :tsq) OR :term <% h.search_name)"
+_SCORE_SQL = "(ts_rank_cd(h.search_vector, to_tsquery('simple', :tsq)) * 2 + word_similarity(:term, h.search_name))"
+
+
+def build_tsquery(query: str, prefix: bool) -> tuple:
+    """
+    Chuyển chuỗi người dùng gõ thành (tsquery, chuỗi so trigram) đã bỏ dấu.
+    prefix=True (typeahead): từ cuối được khớp theo tiền tố ("kyo" khớp "kyoto").
+    """
+    term = fold_text(query)
+    tokens = re.findall(r"\w+", term)
+    if not tokens:
+        return None, term
+    parts = list(tokens)
+    if prefix:
+        parts[-1] += ":*"
+    return " & ".join(parts), term
+
+
+async def search_catalogue(
+    db: AsyncSession,
+    query: str,
+    kinds=SEARCH_KINDS,
+    region_id: int = None,
+    prefix: bool = False,
+    limit: int = 20,
+    offset: int = 0,
+) -> list:
+    """
+    Tìm trên tên / mô tả / địa chỉ / tags của hotel, restaurant, place đang hoạt động,
+    xếp hạng theo ts_rank_cd (trọng số tên > tags > mô tả) + độ giống tên.
+    Mỗi nhánh chỉ giữ top (offset + limit) trước khi gộp, nên chi phí không tăng theo số dòng khớp.
+    """
+    tsq, term = build_tsquery(query, prefix)
+    if tsq is None:
+        return []
+
+    params = {"tsq": tsq, "term": term, "window": offset + limit, "limit": limit, "offset": offset}
+    region_filter = ""
+    if region_id is not None:
+        region_filter = "AND h.region_id = :region_id"
+        params["region_id"] = region_id
+
+    branches = [
+        "(" + _BRANCH_SQL[kind].format(score=_SCORE_SQL, match=_MATCH_SQL, region_filter=region_filter)
+        + " ORDER BY score DESC, h.id LIMIT :window)"
+        for kind in kinds
+    ]
+
+    result = await db.execute(text(f"""
+        SELECT hits.kind, hits.id, hits.region_id, hits.name, hits.address, hits.rating, hits.image_url,
+               CASE WHEN hits.kind = 'restaurant'
+                    THEN (SELECT MIN(rc.average_price) FROM restaurant_cuisines rc WHERE rc.restaurant_id = hits.id)
+                    ELSE hits.price END AS price,
+               hits.score
+        FROM ({' UNION ALL '.join(branches)}) hits
+        ORDER BY hits.score DESC, hits.kind, hits.id
+        LIMIT :limit OFFSET :offset
+    """), params)
+
+    return [
+        {
+            "kind": row.kind,
+            "id": row.id,
+            "region_id": row.region_id,
+            "name": row.name,
+            "address": row.address,
+            "rating": row.rating,
+            "image_url": row.image_url,
+            "price": row.price,
+            "score": round(float(row.score), 4),
+        }
+        for row in result.fetchall()
+    ]
@@ -0,0 +1,73 @@
+# app/services/trip_cache.py
+import copy
+from collections import defaultdict
+
+from app.core.config import settings
+from app.utils.cache import LRUCache
+from app.utils.text import normalize_prompt
+
+# Cache kết quả /generate theo (prompt đã chuẩn hoá, region_id, phiên bản catalogue)
+_cache = LRUCache(
+    maxsize=settings.TRIP_CACHE_MAX_ENTRIES,
+    ttl=settings.TRIP_CACHE_TTL_SECONDS,
+)
+
+# Phiên bản catalogue theo vùng; key None = context toàn cục (không nhận diện được vùng)
+_catalogue_versions = defaultdict(int)
+
+_stats = {
+    "hits": 0,
+    "misses": 0,
+    "invalidations": 0,
+    "saved_tokens": 0,
+    "saved_seconds": 0.0,
+}
+
+
+def make_key(prompt: str, region_id: int | None):
+    return (normalize_prompt(prompt), region_id, _catalogue_versions[region_id])
+
+
+def get(key):
+    entry = _cache.get(key)
+    if entry is None:
+        _stats["misses"] += 1
+        return None
+
+    _stats["hits"] += 1
+    _stats["saved_tokens"] += entry["tokens"]
+    _stats["saved_seconds"] += entry["latency"]
+    return copy.deepcopy(entry["result"])
+
+
+def put(key, result: dict, tokens: int = 0, latency: float = 0.0):
+    _cache.set(key, {
+        "result": copy.deepcopy(result),
+        "tokens": tokens or 0,
+        "latency": latency,
+    })
+
+
+def invalidate_regions(region_ids):
+    """
+    Gọi khi hotel/restaurant thay đổi. Context toàn cục (None) cũng chứa
+    dữ liệu của mọi vùng nên luôn bị làm mới cùng.
+    """
+    affected = {r for r in region_ids if r is not None} | {None}
+    for region_id in affected:
+        _catalogue_versions[region_id] += 1
+
+    removed = _cache.discard_where(lambda key: key[1] in affected)
+    _stats["invalidations"] += 1
+    return removed
+
+
+def get_stats() -> dict:
+    total = _stats["hits"] + _stats["misses"]
+    return {
+        **_stats,
+        "saved_seconds": round(_stats["saved_seconds"], 3),
+        "hit_rate": round(_stats["hits"] / total, 4) if total else 0.0,
+        "size": len(_cache),
+        "max_size": _cache.maxsize,
+    }
@@ -0,0 +1,49 @@
+# app/services/trip_doc_cache.py
+import copy
+
+from app.core.config import settings
+from app.utils.cache import LRUCache
+
+# Itinerary đã dựng từ trip_items của từng trip: trip_id -> (version, itinerary).
+# Luôn đối chiếu version đọc từ bảng trips nên một entry cũ không bao giờ được trả về,
+# kể cả khi trip được sửa từ một worker khác.
+_cache = LRUCache(
+    maxsize=settings.TRIP_DOC_CACHE_MAX_ENTRIES,
+    ttl=settings.TRIP_DOC_CACHE_TTL_SECONDS,
+)
+
+_stats = {
+    "hits": 0,
+    "misses": 0,
+    "invalidations": 0,
+}
+
+
+def get(trip_id: int, version: int):
+    entry = _cache.get(trip_id)
+    if entry is None or entry[0] != version:
+        _stats["misses"] += 1
+        return None
+
+    _stats["hits"] += 1
+    return copy.deepcopy(entry[1])
+
+
+def put(trip_id: int, version: int, itinerary: list):
+    _cache.set(trip_id, (version, copy.deepcopy(itinerary)))
+
+
+def invalidate(trip_id: int):
+    """Gọi sau khi trip được lưu / cập nhật / xoá."""
+    _cache.pop(trip_id)
+    _stats["invalidations"] += 1
+
+
+def get_stats() -> dict:
+    total = _stats["hits"] + _stats["misses"]
+    return {
+        **_stats,
+        "hit_rate": round(_stats["hits"] / total, 4) if total else 0.0,
+        "size": len(_cache),
+        "max_size": _cache.maxsize,
+    }
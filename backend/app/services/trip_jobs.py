@@ -0,0 +1,173 @@
+# app/services/trip_jobs.py
+import asyncio
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.schemas.trip import TripResponse
+from app.services.ai_service import run_trip_generation
+
+# Worker pool dùng chung: tổng số lịch trình được tạo song song trên mọi job
+_pool = asyncio.Semaphore(settings.TRIP_JOB_WORKERS)
+
+# Các job gần nhất (trong bộ nhớ của worker hiện tại): job_id -> TripJob.
+# Job đang chạy không bao giờ bị bỏ; job đã xong bị bỏ sau _FINISHED_JOB_TTL
+# hoặc khi số job vượt TRIP_JOB_MAX_JOBS (job xong sớm nhất bị bỏ trước).
+_jobs: dict = {}
+_FINISHED_JOB_TTL = timedelta(hours=24)
+
+# Lỗi do AI trả về JSON hỏng / sai cấu trúc -> thử lại
+_RETRYABLE_ERRORS = (json.JSONDecodeError, ValidationError)
+
+
+class TripJob:
+    def __init__(self, user_id: int, prompts: list, concurrency: int):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.concurrency = max(1, min(concurrency, settings.TRIP_JOB_WORKERS))
+        self.status = "queued"  # queued (chờ slot trong pool) | running | completed | cancelled
+        self.created_at = datetime.now(timezone.utc)
+        self.finished_at = None
+        self.items = [
+            {"index": i, "prompt": p, "status": "pending", "attempts": 0, "result": None, "error": None}
+            for i, p in enumerate(prompts)
+        ]
+        self.task = None
+        self._subscribers: list = []
+
+    @property
+    def progress(self) -> dict:
+        counts = {"pending": 0, "running": 0, "succeeded": 0, "failed": 0}
+        for item in self.items:
+            counts[item["status"]] += 1
+        return {"total": len(self.items), **counts}
+
+    def summary(self, include_results: bool = False) -> dict:
+        data = {
+            "job_id": self.id,
+            "status": self.status,
+            "concurrency": self.concurrency,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "progress": self.progress,
+        }
+        if include_results:
+            data["items"] = self.items
+        return data
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue()
+        self._subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        if queue in self._subscribers:
+            self._subscribers.remove(queue)
+
+    def publish(self, event: str, data):
+        for queue in self._subscribers:
+            queue.put_nowait((event, data))
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "cancelled")
+
+
+async def _run_item(job: TripJob, item: dict):
+    async with _pool:
+        if job.status == "queued":
+            job.status = "running"
+        item["status"] = "running"
+        for attempt in range(1, settings.TRIP_JOB_MAX_RETRIES + 2):
+            item["attempts"] = attempt
+            try:
+                # Session riêng: job chạy ngoài vòng đời của request
+                async with AsyncSessionLocal() as db:
+                    result = await run_trip_generation(item["prompt"], db)
+                # Chuẩn hoá theo TripResponse (như response của /generate) để bước lưu nhận đúng kiểu;
+                # sai cấu trúc -> ValidationError -> thử lại
+                item["result"] = TripResponse.model_validate(result).model_dump()
+                item["status"] = "succeeded"
+                item["error"] = None
+                break
+            except _RETRYABLE_ERRORS as e:
+                item["error"] = f"AI trả về dữ liệu không hợp lệ: {e}"
+            except asyncio.TimeoutError:
+                item["error"] = "AI phản hồi quá lâu"
+                break
+            except Exception as e:
+                item["error"] = str(e)
+                break
+
+        if item["status"] != "succeeded":
+            item["status"] = "failed"
+
+    job.publish("item", item)
+    job.publish("progress", job.progress)
+
+
+async def _run_job(job: TripJob):
+    # Job ở trạng thái "queued" cho tới khi item đầu tiên có slot trong pool
+    queue: asyncio.Queue = asyncio.Queue()
+    for item in job.items:
+        queue.put_nowait(item)
+
+    async def worker():
+        while True:
+            try:
+                item = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            await _run_item(job, item)
+
+    try:
+        # Mỗi job chạy tối đa `concurrency` worker, dùng chung pool giới hạn toàn cục
+        await asyncio.gather(*[worker() for _ in range(min(job.concurrency, len(job.items)))])
+        job.status = "completed"
+    except asyncio.CancelledError:
+        job.status = "cancelled"
+        for item in job.items:
+            if item["status"] in ("pending", "running"):
+                item["status"] = "failed"
+                item["error"] = "Job đã bị huỷ"
+        raise
+    finally:
+        job.finished_at = datetime.now(timezone.utc)
+        job.publish("done", job.summary())
+
+
+def _prune_jobs():
+    now = datetime.now(timezone.utc)
+    finished = sorted((j for j in _jobs.values() if j.finished_at is not None), key=lambda j: j.finished_at)
+    overflow = len(_jobs) - settings.TRIP_JOB_MAX_JOBS
+    for job in finished:
+        if now - job.finished_at > _FINISHED_JOB_TTL or overflow > 0:
+            del _jobs[job.id]
+            overflow -= 1
+
+
+def active_job_count(user_id: int) -> int:
+    """Số job chưa xong (đang chờ hoặc đang chạy) của user."""
+    return sum(1 for job in _jobs.values() if job.user_id == user_id and not job.finished)
+
+
+def submit_job(user_id: int, prompts: list, concurrency: int) -> TripJob:
+    _prune_jobs()
+    job = TripJob(user_id, prompts, concurrency)
+    _jobs[job.id] = job
+    job.task = asyncio.create_task(_run_job(job))
+    return job
+
+
+def get_job(job_id: str):
+    _prune_jobs()
+    return _jobs.get(job_id)
+
+
+def cancel_job(job: TripJob):
+    if job.task and not job.task.done():
+        job.task.cancel()
@@ -0,0 +1,624 @@
+# app/services/trip_service.py
+import json
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import AsyncSessionLocal
+from app.schemas.trip import SaveTripSchema
+from app.services import trip_doc_cache
+from app.utils.etag import make_etag
+
+# Các cột trip_items truyền vào dưới dạng mảng (thứ tự giống _ITEM_FIELDS)
+_ITEM_ARRAYS = """
+            CAST(:i_day AS integer[]), CAST(:i_time AS text[]), CAST(:i_act AS text[]),
+            CAST(:i_loc AS text[]), CAST(:i_type AS text[]), CAST(:i_price AS integer[]),
+            CAST(:i_img AS text[]), CAST(:i_det AS text[]), CAST(:i_m_url AS text[]),
+            CAST(:i_ref_id AS integer[])
+        """
+
+# Lưu trips + toàn bộ trip_items trong MỘT câu lệnh (một round-trip tới DB):
+# CTE chèn trip và lấy id, các item được truyền dưới dạng mảng theo cột rồi unnest thành nhiều dòng.
+_SAVE_TRIP_SQL = text(f"""
+    WITH new_trip AS (
+        INSERT INTO trips (
+            user_id, region_id, title, total_days, total_budget, 
+            members, budget_per_person, ai_result,
+            guest_name, guest_phone, guest_email, transport, special_request
+        )
+        VALUES (
+            :u_id, :r_id, :title, :days, :budget, 
+            :mems, :b_per_p, :result,
+            :g_name, :g_phone, :g_email, :trans, :spec
+        )
+        RETURNING id
+    ), new_items AS (
+        INSERT INTO trip_items (
+            trip_id, day_number, time_slot, activity, 
+            location, item_type, price, image_url, details, 
+            map_url, reference_id
+        )
+        SELECT new_trip.id, i.day_number, i.time_slot, i.activity,
+               i.location, i.item_type, i.price, i.image_url, i.details,
+               i.map_url, i.reference_id
+        FROM new_trip, unnest({_ITEM_ARRAYS}) AS i(day_number, time_slot, activity, location, item_type, price,
+               image_url, details, map_url, reference_id)
+    )
+    SELECT id FROM new_trip
+""")
+
+
+def _to_int(value, default=None):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+# Thứ tự cột trip_items dùng cho các mảng unnest: (tên tham số, tên cột)
+_ITEM_FIELDS = (
+    ("i_day", "day_number"), ("i_time", "time_slot"), ("i_act", "activity"),
+    ("i_loc", "location"), ("i_type", "item_type"), ("i_price", "price"),
+    ("i_img", "image_url"), ("i_det", "details"), ("i_m_url", "map_url"),
+    ("i_ref_id", "reference_id"),
+)
+
+
+def item_row(item: dict, day_number, image_default="", details_default="") -> tuple:
+    """Giá trị các cột trip_items (theo thứ tự _ITEM_FIELDS) của một item trong itinerary."""
+    # Trích xuất item_id từ AI để lưu vào reference_id
+    # Nếu AI trả về null hoặc 0, ta lưu None
+    ref_id = _to_int(item.get("item_id"))
+    if not ref_id:
+        ref_id = None
+
+    return (
+        _to_int(day_number),
+        item.get("time"),
+        item.get("activity"),
+        item.get("location"),
+        item.get("type"),
+        _to_int(item.get("price"), 0),  # Schema đã từ chối giá không phải số; bỏ trống = 0
+        item.get("image_url", image_default),
+        item.get("details", details_default),
+        item.get("map_url"),
+        ref_id,  # Lưu ID khách sạn/nhà hàng thật vào đây
+    )
+
+
+def rows_to_columns(rows) -> dict:
+    """Chuyển danh sách item_row thành các mảng theo cột (tham số cho unnest)."""
+    rows = list(rows)
+    return {key: [row[i] for row in rows] for i, (key, _column) in enumerate(_ITEM_FIELDS)}
+
+
+def item_columns(itinerary: list) -> dict:
+    """Chuyển itinerary (list ngày -> items) thành các mảng theo cột cho trip_items."""
+    return rows_to_columns(
+        item_row(item, day_data.get("day"))
+        for day_data in itinerary
+        for item in day_data.get("items", [])
+    )
+
+
+async def save_trip(db: AsyncSession, user_id: int, data: SaveTripSchema) -> int:
+    """
+    Lưu lịch trình vào trips + trip_items và trả về trip_id.
+    Không commit: bên gọi tự quyết định phạm vi transaction.
+    """
+    result = await db.execute(_SAVE_TRIP_SQL, {
+        "u_id": user_id,
+        "r_id": data.region_id,
+        "title": data.title,
+        "days": data.total_days,
+        "budget": data.total_budget,
+        "mems": data.members,
+        "b_per_p": data.budget_per_person,
+        "result": json.dumps(data.ai_result),
+        "g_name": data.guest_name,
+        "g_phone": data.guest_phone,
+        "g_email": data.guest_email,
+        "trans": data.transport,
+        "spec": data.special_request,
+        **item_columns(data.ai_result.get("itinerary", [])),
+    })
+    return result.scalar()
+
+
+# --- ĐỌC LỊCH TRÌNH ---
+
+_TRIP_COLUMNS = "t.id, t.region_id, t.title, t.total_days, t.budget_per_person, t.created_at, t.version"
+
+_ITEMS_SQL = text("""
+    SELECT id AS trip_item_id, trip_id, time_slot, activity, location, item_type, price,
+           image_url, map_url, reference_id, day_number, details
+    FROM trip_items
+    WHERE trip_id = ANY(:trip_ids)
+    ORDER BY trip_id, day_number ASC, time_slot ASC, id ASC
+""")
+
+# Dựng sẵn itinerary [{"day", "items": [...]}] trong Postgres bằng json_agg
+_ITINERARY_JSON_SQL = """
+    COALESCE((
+        SELECT json_agg(json_build_object('day', d.day_number, 'items', d.items) ORDER BY d.day_number)
+        FROM (
+            SELECT ti.day_number,
+                   json_agg(json_build_object(
+                       'id', ti.id, 'time', ti.time_slot, 'activity', ti.activity, 'location', ti.location,
+                       'type', ti.item_type, 'price', ti.price, 'image_url', ti.image_url,
+                       'map_url', ti.map_url, 'details', ti.details, 'item_id', ti.reference_id
+                   ) ORDER BY ti.time_slot, ti.id) AS items
+            FROM trip_items ti
+            WHERE ti.trip_id = t.id
+            GROUP BY ti.day_number
+        ) d
+    ), '[]'::json) AS itinerary
+"""
+
+
+def item_to_dict(item) -> dict:
+    return {
+        "id": item.trip_item_id, # ID dòng trip_items: gửi kèm khi cập nhật để chỉ ghi item thay đổi
+        "time": item.time_slot,
+        "activity": item.activity,
+        "location": item.location,
+        "type": item.item_type,
+        "price": item.price,
+        "image_url": item.image_url,
+        "map_url": item.map_url,
+        "details": item.details,
+        "item_id": item.reference_id # Trả về ID gốc (Hotel/Rest) để làm Link
+    }
+
+
+def group_itineraries(items_rows) -> dict:
+    """Gom các dòng trip_items (đã sắp theo trip, ngày, giờ) thành {trip_id: [{"day", "items"}]}."""
+    grouped = {}
+    for item in items_rows:
+        days = grouped.setdefault(item.trip_id, {})
+        day = days.setdefault(item.day_number, {"day": item.day_number, "items": []})
+        day["items"].append(item_to_dict(item))
+    return {trip_id: list(days.values()) for trip_id, days in grouped.items()}
+
+
+def trip_document(trip, itinerary: list) -> dict:
+    # Đóng gói dữ liệu tương thích với cấu trúc AI Trip Planner
+    return {
+        "id": trip.id,
+        "region_id": trip.region_id, # Thêm ở cấp cao nhất để FE lấy cho Link gốc
+        "title": trip.title,
+        "total_days": trip.total_days,
+        "budget_per_person": trip.budget_per_person,
+        "version": trip.version, # Gửi lại khi cập nhật để phát hiện chỉnh sửa đồng thời
+        "ai_result": {
+            "title": trip.title,
+            "region_id": trip.region_id, # Thêm vào trong ai_result để đồng bộ
+            "itinerary": itinerary,
+            "budget_summary": {
+                "total_per_person": trip.budget_per_person,
+                "note": "Dữ liệu được tải từ lịch sử cá nhân"
+            }
+        }
+    }
+
+
+def trip_summary(trip) -> dict:
+    return {
+        "id": trip.id,
+        "region_id": trip.region_id,
+        "title": trip.title,
+        "total_days": trip.total_days,
+        "budget_per_person": trip.budget_per_person,
+        "created_at": trip.created_at,
+        "version": trip.version,
+    }
+
+
+async def fetch_itineraries(db: AsyncSession, trip_ids: list) -> dict:
+    """Lấy items của nhiều trip trong một truy vấn (thay cho một truy vấn mỗi trip)."""
+    if not trip_ids:
+        return {}
+    result = await db.execute(_ITEMS_SQL, {"trip_ids": list(trip_ids)})
+    return group_itineraries(result.fetchall())
+
+
+async def fetch_user_trip_page(db: AsyncSession, user_id: int, limit: int = None, after: tuple = None) -> tuple:
+    """
+    Một trang trips (chưa có items) của user, mới nhất trước, phân trang keyset trên (created_at, id).
+    Trả về (các dòng, (created_at, id) của dòng cuối nếu còn trang sau, ngược lại None).
+    """
+    conditions = ["t.user_id = :u_id"]
+    params = {"u_id": user_id}
+    if after is not None:
+        conditions.append("(t.created_at, t.id) < (:after_at, :after_id)")
+        params["after_at"], params["after_id"] = after
+
+    limit_sql = ""
+    if limit is not None:
+        # Lấy dư một dòng để biết còn trang sau hay không
+        limit_sql = "LIMIT :limit"
+        params["limit"] = limit + 1
+
+    result = await db.execute(text(f"""
+        SELECT {_TRIP_COLUMNS}
+        FROM trips t
+        WHERE {' AND '.join(conditions)}
+        ORDER BY t.created_at DESC, t.id DESC
+        {limit_sql}
+    """), params)
+    rows = result.fetchall()
+
+    next_after = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_after = (rows[-1].created_at, rows[-1].id)
+    return rows, next_after
+
+
+async def fetch_trip(db: AsyncSession, trip_id: int):
+    """Thông tin một trip (chưa có items) kèm user_id, hoặc None."""
+    result = await db.execute(
+        text(f"SELECT {_TRIP_COLUMNS}, t.user_id FROM trips t WHERE t.id = :t_id"),
+        {"t_id": trip_id},
+    )
+    return result.first()
+
+
+def trips_etag(rows, *variant) -> str:
+    """ETag của danh sách trip: đổi khi trip được thêm / xoá / cập nhật (version) hoặc đổi kiểu hiển thị."""
+    return make_etag(*variant, *(f"{row.id}:{row.version}" for row in rows))
+
+
+async def load_itineraries(db: AsyncSession, rows, assemble: str = "python") -> dict:
+    """
+    {trip_id: itinerary} cho các trip đã đọc; ưu tiên cache (khớp version),
+    các trip chưa có trong cache được dựng trong MỘT truy vấn:
+      - assemble="python": lấy trip_items rồi gom trong Python
+      - assemble="db": Postgres dựng sẵn itinerary bằng json_agg
+    """
+    itineraries = {}
+    missing = []
+    for row in rows:
+        cached = trip_doc_cache.get(row.id, row.version)
+        if cached is not None:
+            itineraries[row.id] = cached
+        else:
+            missing.append(row)
+    if not missing:
+        return itineraries
+
+    missing_ids = [row.id for row in missing]
+    if assemble == "db":
+        result = await db.execute(
+            text(f"SELECT t.id, {_ITINERARY_JSON_SQL} FROM trips t WHERE t.id = ANY(:trip_ids)"),
+            {"trip_ids": missing_ids},
+        )
+        fetched = {}
+        for row in result.fetchall():
+            itinerary = row.itinerary
+            if isinstance(itinerary, str):
+                itinerary = json.loads(itinerary)
+            fetched[row.id] = itinerary
+    else:
+        fetched = await fetch_itineraries(db, missing_ids)
+
+    for row in missing:
+        itinerary = fetched.get(row.id, [])
+        trip_doc_cache.put(row.id, row.version, itinerary)
+        itineraries[row.id] = itinerary
+    return itineraries
+
+
+async def build_trip_documents(db: AsyncSession, rows, mode: str = "full", assemble: str = "python") -> list:
+    """mode="summary": chỉ thông tin trip; mode="full": kèm ai_result / itinerary."""
+    if mode == "summary":
+        return [trip_summary(row) for row in rows]
+    itineraries = await load_itineraries(db, rows, assemble)
+    return [trip_document(row, itineraries.get(row.id, [])) for row in rows]
+
+
+# --- DANH SÁCH LỊCH TRÌNH CHO ADMIN ---
+
+_ADMIN_TRIP_COLUMNS = """
+    t.id, t.region_id, t.title, t.total_days, t.budget_per_person, t.created_at, t.version,
+    u.full_name AS user_name, u.phone AS user_phone,
+    u.email AS user_email, u.avatar_url AS user_avatar
+"""
+
+# Số dòng mỗi lần lấy từ server-side cursor khi stream
+STREAM_BATCH_SIZE = 500
+
+
+def _admin_page_sql(filters: dict, after: tuple, limit: int) -> tuple:
+    """Câu SELECT trips đã lọc + sắp xếp keyset (created_at, id) mới nhất trước, dùng làm subquery."""
+    conditions = []
+    params = {}
+    if filters.get("region_id") is not None:
+        conditions.append("t.region_id = :region_id")
+        params["region_id"] = filters["region_id"]
+    if filters.get("user_id") is not None:
+        conditions.append("t.user_id = :user_id")
+        params["user_id"] = filters["user_id"]
+    if filters.get("created_from") is not None:
+        conditions.append("t.created_at >= CAST(:created_from AS date)")
+        params["created_from"] = filters["created_from"]
+    if filters.get("created_to") is not None:
+        # Bao gồm cả ngày created_to
+        conditions.append("t.created_at < CAST(:created_to AS date) + 1")
+        params["created_to"] = filters["created_to"]
+    if filters.get("min_budget") is not None:
+        conditions.append("t.budget_per_person >= :min_budget")
+        params["min_budget"] = filters["min_budget"]
+    if filters.get("max_budget") is not None:
+        conditions.append("t.budget_per_person <= :max_budget")
+        params["max_budget"] = filters["max_budget"]
+    if after is not None:
+        conditions.append("(t.created_at, t.id) < (:after_at, :after_id)")
+        params["after_at"], params["after_id"] = after
+
+    where_sql = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    limit_sql = ""
+    if limit is not None:
+        limit_sql = "LIMIT :limit"
+        params["limit"] = limit
+
+    sql = f"""
+        SELECT t.id, t.user_id, t.region_id, t.title, t.total_days, t.budget_per_person, t.created_at, t.version
+        FROM trips t
+        {where_sql}
+        ORDER BY t.created_at DESC, t.id DESC
+        {limit_sql}
+    """
+    return sql, params
+
+
+def admin_trip_document(trip, itinerary: list) -> dict:
+    return {
+        "id": trip.id,
+        "title": trip.title,
+        "total_days": trip.total_days,
+        "budget_per_person": trip.budget_per_person,
+        "created_at": trip.created_at,
+        "user_info": {
+            "name": trip.user_name,
+            "phone": trip.user_phone,
+            "email": trip.user_email,
+            "avatar": trip.user_avatar
+        },
+        "itinerary": itinerary
+    }
+
+
+async def list_admin_trips(db: AsyncSession, filters: dict, limit: int = None, after: tuple = None) -> tuple:
+    """
+    Một trang lịch trình (kèm thông tin user) cho admin: 2 truy vấn cho cả trang.
+    Trả về (danh sách, (created_at, id) của dòng cuối nếu còn trang sau, ngược lại None).
+    """
+    page_sql, params = _admin_page_sql(filters, after, limit + 1 if limit is not None else None)
+    result = await db.execute(text(f"""
+        SELECT {_ADMIN_TRIP_COLUMNS}
+        FROM ({page_sql}) t
+        LEFT JOIN users u ON t.user_id = u.id
+        ORDER BY t.created_at DESC, t.id DESC
+    """), params)
+    rows = result.fetchall()
+
+    next_after = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_after = (rows[-1].created_at, rows[-1].id)
+
+    itineraries = await load_itineraries(db, rows)
+    return [admin_trip_document(row, itineraries.get(row.id, [])) for row in rows], next_after
+
+
+async def stream_admin_trips(filters: dict, limit: int = None, after: tuple = None):
+    """
+    Sinh lần lượt từng lịch trình (giống list_admin_trips) từ một server-side cursor trên
+    trips JOIN users JOIN trip_items; các dòng được gom theo trip ngay khi nhận được,
+    nên bộ nhớ không phụ thuộc vào tổng số trip.
+    Dùng session riêng vì generator chạy sau khi session của request đã đóng.
+    """
+    page_sql, params = _admin_page_sql(filters, after, limit)
+    sql = text(f"""
+        SELECT {_ADMIN_TRIP_COLUMNS},
+               ti.id AS trip_item_id, ti.day_number, ti.time_slot, ti.activity, ti.location, ti.item_type, ti.price,
+               ti.image_url, ti.map_url, ti.details, ti.reference_id
+        FROM ({page_sql}) t
+        LEFT JOIN users u ON t.user_id = u.id
+        LEFT JOIN trip_items ti ON ti.trip_id = t.id
+        ORDER BY t.created_at DESC, t.id DESC, ti.day_number ASC, ti.time_slot ASC, ti.id ASC
+    """).execution_options(yield_per=STREAM_BATCH_SIZE)
+
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(sql, params)
+        current, days = None, {}
+        async for row in result:
+            if current is None or row.id != current.id:
+                if current is not None:
+                    yield admin_trip_document(current, list(days.values()))
+                current, days = row, {}
+            if row.day_number is not None:
+                day = days.setdefault(row.day_number, {"day": row.day_number, "items": []})
+                day["items"].append(item_to_dict(row))
+        if current is not None:
+            yield admin_trip_document(current, list(days.values()))
+
+
+# --- CẬP NHẬT LỊCH TRÌNH (DIFF THEO ITEM) ---
+
+
+_UPDATE_TRIP_SQL = text("""
+    UPDATE trips
+    SET title = :title, 
+        region_id = :region_id, 
+        total_days = :days,
+        total_budget = :budget, 
+        members = :mems, 
+        budget_per_person = :b_per_p,
+        ai_result = :result,
+        version = version + 1
+    WHERE id = :t_id AND (CAST(:version AS integer) IS NULL OR version = :version)
+    RETURNING version
+""")
+
+_CURRENT_ITEMS_SQL = text("""
+    SELECT id, day_number, time_slot, activity, location, item_type, price,
+           image_url, details, map_url, reference_id
+    FROM trip_items
+    WHERE trip_id = :t_id
+    ORDER BY day_number, time_slot, id
+""")
+
+_BULK_UPDATE_ITEMS_SQL = text(f"""
+    UPDATE trip_items ti
+    SET day_number = u.day_number, time_slot = u.time_slot, activity = u.activity,
+        location = u.location, item_type = u.item_type, price = u.price,
+        image_url = u.image_url, details = u.details, map_url = u.map_url,
+        reference_id = u.reference_id
+    FROM unnest(CAST(:i_row_id AS integer[]), {_ITEM_ARRAYS})
+         AS u(id, day_number, time_slot, activity, location, item_type, price,
+              image_url, details, map_url, reference_id)
+    WHERE ti.id = u.id AND ti.trip_id = :t_id
+""")
+
+_BULK_INSERT_ITEMS_SQL = text(f"""
+    INSERT INTO trip_items (
+        trip_id, day_number, time_slot, activity, 
+        location, item_type, price, image_url, details, 
+        map_url, reference_id
+    )
+    SELECT :t_id, i.day_number, i.time_slot, i.activity,
+           i.location, i.item_type, i.price, i.image_url, i.details,
+           i.map_url, i.reference_id
+    FROM unnest({_ITEM_ARRAYS}) AS i(day_number, time_slot, activity, location, item_type, price,
+               image_url, details, map_url, reference_id)
+""")
+
+_BULK_DELETE_ITEMS_SQL = text("DELETE FROM trip_items WHERE trip_id = :t_id AND id = ANY(:ids)")
+
+
+def diff_items(current_rows, itinerary: list) -> dict:
+    """
+    So sánh trip_items hiện có với itinerary mới, trả về
+    {"insert": [row], "update": [(id, row)], "delete": [id], "unchanged": n}.
+    Ghép item theo thứ tự: trùng "id" của trip_item -> trùng toàn bộ nội dung -> ghép các phần còn lại
+    với nhau để UPDATE thay vì DELETE + INSERT. Item không có key "item_id" giữ reference_id cũ.
+    """
+    current = {row.id: tuple(getattr(row, column) for _key, column in _ITEM_FIELDS) for row in current_rows}
+    ref_index = len(_ITEM_FIELDS) - 1
+
+    desired = []  # (id đề xuất, có item_id hay không, row)
+    for day_data in itinerary:
+        for item in day_data.get("items", []):
+            row = item_row(item, day_data.get("day"), image_default=None, details_default=None)
+            desired.append((_to_int(item.get("id")), "item_id" in item, row))
+
+    def resolve(has_ref: bool, row: tuple, old: tuple) -> tuple:
+        return row if has_ref else row[:ref_index] + (old[ref_index],)
+
+    unmatched_current = dict(current)
+    plan = {"insert": [], "update": [], "delete": [], "unchanged": 0}
+    pending = []
+
+    # 1. Ghép theo id của trip_item
+    for row_id, has_ref, row in desired:
+        if row_id is not None and row_id in unmatched_current:
+            old = unmatched_current.pop(row_id)
+            new = resolve(has_ref, row, old)
+            if new == old:
+                plan["unchanged"] += 1
+            else:
+                plan["update"].append((row_id, new))
+        else:
+            pending.append((has_ref, row))
+
+    # 2. Ghép theo nội dung (item không kèm id, ví dụ được client dựng lại)
+    by_content = {}
+    for row_id, old in unmatched_current.items():
+        by_content.setdefault(old[:ref_index], []).append(row_id)
+
+    leftover = []
+    for has_ref, row in pending:
+        candidates = by_content.get(row[:ref_index])
+        match = None
+        if candidates:
+            for row_id in candidates:
+                if resolve(has_ref, row, unmatched_current[row_id]) == unmatched_current[row_id]:
+                    match = row_id
+                    break
+        if match is not None:
+            candidates.remove(match)
+            unmatched_current.pop(match)
+            plan["unchanged"] += 1
+        else:
+            leftover.append((has_ref, row))
+
+    # 3. Dùng lại các dòng cũ còn thừa cho các item mới còn lại (UPDATE), phần dư thì INSERT / DELETE
+    spare_ids = sorted(unmatched_current)
+    for (has_ref, row), row_id in zip(leftover, spare_ids):
+        plan["update"].append((row_id, resolve(has_ref, row, unmatched_current[row_id])))
+    plan["insert"] = [row for _has_ref, row in leftover[len(spare_ids):]]
+    plan["delete"] = spare_ids[len(leftover):]
+    return plan
+
+
+async def update_trip(db: AsyncSession, trip_id: int, data) -> dict:
+    """
+    Cập nhật trip và chỉ ghi các trip_items thay đổi (mỗi loại thay đổi một câu lệnh).
+    Nếu data.version được gửi lên mà khác version hiện tại -> HTTPException 409.
+    Không commit: bên gọi tự quyết định phạm vi transaction.
+    """
+    # Cập nhật bảng trips trước: khoá dòng trip nên các lần sửa đồng thời được xếp hàng
+    result = await db.execute(_UPDATE_TRIP_SQL, {
+        "title": data.title,
+        "region_id": data.region_id,
+        "days": data.total_days,
+        "budget": data.total_budget,
+        "mems": data.members,
+        "b_per_p": data.budget_per_person,
+        "result": json.dumps({
+            "title": data.title, 
+            "itinerary": data.itinerary,
+            "budget_summary": {
+                "total_per_person": data.budget_per_person,
+                "note": "Đã cập nhật từ người dùng"
+            }
+        }),
+        "version": data.version,
+        "t_id": trip_id
+    })
+    new_version = result.scalar()
+    if new_version is None:
+        exists = await db.execute(text("SELECT version FROM trips WHERE id = :t_id"), {"t_id": trip_id})
+        current_version = exists.scalar()
+        if current_version is None:
+            raise HTTPException(status_code=404, detail="Không tìm thấy chuyến đi")
+        raise HTTPException(
+            status_code=409,
+            detail=f"Chuyến đi đã được chỉnh sửa ở nơi khác (phiên bản hiện tại: {current_version}), vui lòng tải lại"
+        )
+
+    current_rows = (await db.execute(_CURRENT_ITEMS_SQL, {"t_id": trip_id})).fetchall()
+    plan = diff_items(current_rows, data.itinerary)
+
+    if plan["update"]:
+        await db.execute(_BULK_UPDATE_ITEMS_SQL, {
+            "t_id": trip_id,
+            "i_row_id": [row_id for row_id, _row in plan["update"]],
+            **rows_to_columns(row for _row_id, row in plan["update"]),
+        })
+    if plan["insert"]:
+        await db.execute(_BULK_INSERT_ITEMS_SQL, {"t_id": trip_id, **rows_to_columns(plan["insert"])})
+    if plan["delete"]:
+        await db.execute(_BULK_DELETE_ITEMS_SQL, {"t_id": trip_id, "ids": plan["delete"]})
+
+    return {
+        "version": new_version,
+        "changes": {
+            "inserted": len(plan["insert"]),
+            "updated": len(plan["update"]),
+            "deleted": len(plan["delete"]),
+            "unchanged": plan["unchanged"],
+        },
+    }
@@ -0,0 +1,53 @@
+# app/utils/cache.py
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Cache trong bộ nhớ: loại bỏ theo LRU khi vượt maxsize,
+    và (tuỳ chọn) hết hạn sau ttl giây.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()  # key -> (expires_at, value)
+
+    def get(self, key, default=None):
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+
+        expires_at, value = entry
+        if expires_at is not None and expires_at < time.monotonic():
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        entry = self._data.pop(key, None)
+        return entry[1] if entry else default
+
+    def discard_where(self, predicate) -> int:
+        """Xoá mọi key thoả predicate(key), trả về số key đã xoá."""
+        keys = [k for k in self._data if predicate(k)]
+        for k in keys:
+            del self._data[k]
+        return len(keys)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
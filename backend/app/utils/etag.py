@@ -0,0 +1,18 @@
+# app/utils/etag.py
+import hashlib
+
+
+def make_etag(*parts, weak: bool = True) -> str:
+    """ETag từ các thành phần quyết định nội dung response (id, version, tham số...)."""
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode()).hexdigest()[:32]
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """So khớp header If-None-Match với ETag (so sánh yếu, hỗ trợ danh sách và "*")."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    wanted = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == wanted for tag in if_none_match.split(","))
@@ -0,0 +1,155 @@
+# app/utils/http_cache.py
+"""
+Cache HTTP có điều kiện cho các API đọc catalogue (regions, cuisines, places, restaurants...).
+
+- Mỗi loại tài nguyên có một bộ đếm phiên bản; các handler create/update/delete gọi bump(...)
+  sau khi commit.
+- Dependency cached(...) tính ETag từ phiên bản các tài nguyên + URL, trả 304 khi If-None-Match
+  (hoặc If-Modified-Since) khớp, TRƯỚC khi chạm tới DB.
+- Nếu bytes response của đúng phiên bản + URL đã có trong bộ nhớ thì trả luôn, không truy vấn DB.
+
+Bộ đếm nằm trong bộ nhớ của từng worker (giống các cache khác của app); ETag kèm mã khởi động
+của worker nên sau khi khởi động lại chỉ mất cache chứ không trả 304 sai. Khi chạy nhiều worker,
+thay đổi ghi qua worker khác không bump được bộ đếm ở đây, nên ETag / Last-Modified còn đổi theo
+chu kỳ HTTP_CACHE_TTL_SECONDS: dữ liệu cũ tồn tại tối đa một chu kỳ.
+"""
+import hashlib
+import json
+import time
+import uuid
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+from app.utils.cache import LRUCache
+from app.utils.etag import etag_matches
+
+_BOOT_ID = uuid.uuid4().hex[:8]
+_BOOT_TIME = datetime.now(timezone.utc).replace(microsecond=0)
+
+_versions: dict = {}
+_modified: dict = {}
+
+# (ETag) -> (bytes, headers riêng như X-Next-Cursor)
+_bodies = LRUCache(maxsize=settings.HTTP_CACHE_MAX_ENTRIES)
+
+_adapters: dict = {}
+
+
+def bump(*resources):
+    """Gọi sau khi commit thay đổi của các tài nguyên này."""
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    for resource in resources:
+        _versions[resource] = _versions.get(resource, 0) + 1
+        _modified[resource] = now
+
+
+def version(resource: str) -> int:
+    return _versions.get(resource, 0)
+
+
+def _versions_key(resources) -> str:
+    return f"{_epoch()}|" + ",".join(f"{r}:{version(r)}" for r in resources)
+
+
+def _epoch() -> int:
+    ttl = settings.HTTP_CACHE_TTL_SECONDS
+    return int(time.time() // ttl) if ttl > 0 else 0
+
+
+def last_modified(*resources) -> datetime:
+    modified = max((_modified.get(r, _BOOT_TIME) for r in resources), default=_BOOT_TIME)
+    if settings.HTTP_CACHE_TTL_SECONDS > 0:
+        epoch_start = datetime.fromtimestamp(_epoch() * settings.HTTP_CACHE_TTL_SECONDS, timezone.utc)
+        modified = max(modified, epoch_start)
+    return modified
+
+
+def _not_modified_since(request: Request, modified: datetime) -> bool:
+    header = request.headers.get("if-modified-since")
+    if not header:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return modified <= since
+
+
+def _adapter(model):
+    adapter = _adapters.get(model)
+    if adapter is None:
+        adapter = _adapters[model] = TypeAdapter(model)
+    return adapter
+
+
+class CachedResponse:
+    """Ngữ cảnh cache của một request: ETag, header, bytes đã cache (nếu có)."""
+
+    def __init__(self, request: Request, resources: tuple, max_age: int, s_maxage: int):
+        self.resources = resources
+        self._versions = _versions_key(resources)
+        url = request.url.path + "?" + "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+        digest = hashlib.sha1(f"{url}|{self._versions}".encode()).hexdigest()[:24]
+        self.etag = f'W/"{_BOOT_ID}-{digest}"'
+        self.last_modified = last_modified(*resources)
+        self.headers = {
+            "ETag": self.etag,
+            "Last-Modified": format_datetime(self.last_modified, usegmt=True),
+            # Trình duyệt luôn xác thực lại bằng ETag; CDN / proxy được giữ s-maxage giây
+            "Cache-Control": f"public, max-age={max_age}, s-maxage={s_maxage}, stale-while-revalidate={s_maxage}",
+        }
+
+    def cached(self):
+        """Response từ bytes đã cache của đúng phiên bản + URL, hoặc None."""
+        entry = _bodies.get(self.etag)
+        if entry is None:
+            return None
+        body, extra_headers = entry
+        return Response(content=body, media_type="application/json", headers={**self.headers, **extra_headers})
+
+    def respond(self, data, model=None, headers: dict = None) -> Response:
+        """Serialize data (qua pydantic model nếu có), cache bytes và trả Response kèm header cache."""
+        if model is not None:
+            adapter = _adapter(model)
+            body = adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+        else:
+            body = json.dumps(jsonable_encoder(data), ensure_ascii=False, separators=(",", ":")).encode()
+        extra_headers = dict(headers or {})
+
+        # Chỉ cache nếu không có thay đổi nào xảy ra trong lúc truy vấn
+        if _versions_key(self.resources) == self._versions:
+            _bodies.set(self.etag, (body, extra_headers))
+        return Response(content=body, media_type="application/json", headers={**self.headers, **extra_headers})
+
+
+def cached(*resources, max_age: int = None, s_maxage: int = None):
+    """
+    Dependency cho API đọc: ném 304 (không truy vấn DB) nếu client đã có bản hiện tại.
+    Dùng:
+        cache: CachedResponse = Depends(cached("regions"))
+        if (hit := cache.cached()) is not None: return hit
+        ...
+        return cache.respond(data, model=list[RegionResponse])
+    """
+    max_age = settings.HTTP_CACHE_MAX_AGE if max_age is None else max_age
+    s_maxage = settings.HTTP_CACHE_S_MAXAGE if s_maxage is None else s_maxage
+
+    async def dependency(request: Request) -> CachedResponse:
+        ctx = CachedResponse(request, resources, max_age, s_maxage)
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            if etag_matches(if_none_match, ctx.etag):
+                raise HTTPException(status_code=304, headers=ctx.headers)
+        elif _not_modified_since(request, ctx.last_modified):
+            raise HTTPException(status_code=304, headers=ctx.headers)
+        return ctx
+
+    return dependency
@@ -0,0 +1,76 @@
+# app/utils/json_stream.py
+import json
+import re
+
+
+class JsonArrayStreamer:
+    """
+    Đọc JSON theo từng chunk và trả ra từng object hoàn chỉnh
+    trong mảng của `key` (VD: "itinerary") ngay khi object đó đóng ngoặc.
+    """
+
+    def __init__(self, key: str):
+        self._key_pattern = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+        self._buf = ""
+        self._pos = 0           # vị trí đang quét trong buffer
+        self._in_array = False
+        self._done = False
+        self._depth = 0         # độ sâu {} / [] bên trong phần tử hiện tại
+        self._start = None      # vị trí bắt đầu của phần tử hiện tại
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> list:
+        if self._done:
+            return []
+
+        self._buf += chunk
+        objects = []
+
+        if not self._in_array:
+            match = self._key_pattern.search(self._buf)
+            if not match:
+                return objects
+            self._in_array = True
+            self._pos = match.end()
+
+        buf = self._buf
+        i = self._pos
+        while i < len(buf):
+            ch = buf[i]
+
+            if self._start is None:
+                # Giữa các phần tử: bỏ qua khoảng trắng và dấu phẩy
+                if ch == "{":
+                    self._start = i
+                    self._depth = 1
+                elif ch == "]":
+                    self._done = True
+                    i += 1
+                    break
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    objects.append(json.loads(buf[self._start:i + 1]))
+                    self._start = None
+            i += 1
+
+        # Bỏ phần đã xử lý xong để buffer không phình ra
+        cut = self._start if self._start is not None else i
+        self._buf = buf[cut:]
+        self._pos = i - cut
+        if self._start is not None:
+            self._start = 0
+
+        return objects
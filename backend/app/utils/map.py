@@ -1,22 +1,34 @@
 import re
+from sqlalchemy import inspect
 
-def extract_lat_lng(map_url: str):
+def extract_lat_lng(map_url: str | None):
     """
     Hỗ trợ link Google Maps dạng:
     https://www.google.com/maps?q=21.028511,105.804817
     https://www.google.com/maps/place/.../@21.028511,105.804817,17z
     """
+    if not map_url:
+        return None, None
 
-    pattern = r"@(-?\d+\.\d+),(-?\d+\.\d+)"
-    match = re.search(pattern, map_url)
+    # Thử dạng "@" trước; toạ độ ngoài phạm vi thì thử tiếp dạng "q="
+    for pattern in (r"@(-?\d+\.\d+),(-?\d+\.\d+)", r"q=(-?\d+\.\d+),(-?\d+\.\d+)"):
+        match = re.search(pattern, map_url)
+        if match:
+            lat, lng = float(match.group(1)), float(match.group(2))
+            if -90 <= lat <= 90 and -180 <= lng <= 180:
+                return lat, lng
 
-    if match:
-        return float(match.group(1)), float(match.group(2))
-
-    pattern_q = r"q=(-?\d+\.\d+),(-?\d+\.\d+)"
-    match_q = re.search(pattern_q, map_url)
+    return None, None
 
-    if match_q:
-        return float(match_q.group(1)), float(match_q.group(2))
 
-    return None, None
+def sync_coordinates(mapper, connection, target):
+    """
+    Listener before_insert / before_update cho model có map_url + latitude / longitude:
+    tính lại toạ độ mỗi khi map_url thay đổi (hoặc khi tạo mới mà chưa có toạ độ).
+    """
+    state = inspect(target)
+    if state.has_identity and not state.attrs.map_url.history.has_changes():
+        return
+    if not state.has_identity and target.latitude is not None and target.longitude is not None:
+        return
+    target.latitude, target.longitude = extract_lat_lng(target.map_url)
@@ -0,0 +1,102 @@
+# app/utils/pagination.py
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import tuple_
+
+
+def encode_keyset(*values) -> str:
+    """Mã hoá các giá trị keyset (đã JSON hoá được) thành chuỗi an toàn cho URL."""
+    raw = json.dumps(list(values)).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_keyset(cursor: str) -> list:
+    """Giải mã cursor của encode_keyset; ném ValueError nếu cursor không hợp lệ."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Cursor không hợp lệ") from e
+    if not isinstance(values, list):
+        raise ValueError("Cursor không hợp lệ")
+    return values
+
+
+def cursor_value_ok(column, value) -> bool:
+    """
+    Giá trị giải mã từ cursor có cùng kiểu với cột không (NULL chỉ khi cột cho phép NULL).
+    Kiểm tra trước khi đưa vào SQL để cursor sửa tay / cũ trả 400 thay vì lỗi DB.
+    """
+    if value is None:
+        return bool(column.nullable) and not column.primary_key
+    if isinstance(value, bool):
+        return False
+    python_type = column.type.python_type
+    if python_type is float:
+        return isinstance(value, (int, float))
+    return isinstance(value, python_type)
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Mã hoá vị trí keyset (created_at, id) thành chuỗi an toàn cho URL."""
+    return encode_keyset(created_at.isoformat(), row_id)
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """Giải mã cursor; ném ValueError nếu cursor không hợp lệ."""
+    try:
+        created_at, row_id = decode_keyset(cursor)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Cursor không hợp lệ") from e
+
+
+def keyset_order(sort_col, id_col, descending: bool) -> list:
+    """ORDER BY cho keyset: cột sắp xếp (NULL luôn ở cuối) rồi id cùng chiều."""
+    if sort_col is id_col:
+        return [id_col.desc() if descending else id_col.asc()]
+    if descending:
+        return [sort_col.desc().nulls_last(), id_col.desc()]
+    return [sort_col.asc().nulls_last(), id_col.asc()]
+
+
+async def keyset_page(db, stmt, sort_col, id_col, descending: bool = False, after=None, limit: int = None) -> tuple:
+    """
+    Một trang của stmt theo keyset (sort_col, id_col); sort_col có thể NULL (nằm cuối danh sách).
+    after: (giá trị sort_col, id) của dòng cuối trang trước.
+    Mỗi truy vấn là một range scan trên index (sort_col, id) cùng chiều: phần NULL ở cuối
+    được lấy bằng truy vấn thứ hai khi phần có giá trị đã hết.
+    Trả về (các dòng, (giá trị sort_col, id) của dòng cuối nếu còn trang sau, ngược lại None).
+    """
+    order = keyset_order(sort_col, id_col, descending)
+    stmt = stmt.add_columns(sort_col.label("_sort_key"), id_col.label("_row_id"))
+    if limit is None:
+        return (await db.execute(stmt.order_by(*order))).all(), None
+
+    id_after = (lambda v: id_col < v) if descending else (lambda v: id_col > v)
+
+    if after is None:
+        rows = (await db.execute(stmt.order_by(*order).limit(limit + 1))).all()
+    elif sort_col is id_col:
+        rows = (await db.execute(stmt.where(id_after(after[1])).order_by(*order).limit(limit + 1))).all()
+    elif after[0] is None:
+        # Đang ở phần NULL cuối danh sách
+        rows = (await db.execute(
+            stmt.where(sort_col.is_(None), id_after(after[1])).order_by(*order).limit(limit + 1)
+        )).all()
+    else:
+        key = tuple_(sort_col, id_col)
+        cond = key < tuple_(after[0], after[1]) if descending else key > tuple_(after[0], after[1])
+        rows = (await db.execute(stmt.where(cond).order_by(*order).limit(limit + 1))).all()
+        if len(rows) <= limit:
+            rows += (await db.execute(
+                stmt.where(sort_col.is_(None)).order_by(*order).limit(limit + 1 - len(rows))
+            )).all()
+
+    next_after = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_after = (rows[-1]._sort_key, rows[-1]._row_id)
+    return rows, next_after
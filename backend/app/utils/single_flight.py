@@ -0,0 +1,39 @@
+# app/utils/single_flight.py
+import asyncio
+import copy
+
+
+class SingleFlight:
+    """
+    Gộp các lời gọi trùng key đang chạy đồng thời: chỉ lời gọi đầu tiên thực thi,
+    các lời gọi sau chờ và nhận chung kết quả (hoặc chung exception).
+    """
+
+    def __init__(self):
+        self._inflight: dict = {}
+        self._stats = {"executed": 0, "coalesced": 0}
+
+    async def do(self, key, fn):
+        task = self._inflight.get(key)
+        if task is not None:
+            self._stats["coalesced"] += 1
+            # shield: request bị huỷ không kéo theo huỷ lời gọi chung
+            return copy.deepcopy(await asyncio.shield(task))
+
+        task = asyncio.ensure_future(fn())
+        self._inflight[key] = task
+        self._stats["executed"] += 1
+        task.add_done_callback(lambda _: self._forget(key, task))
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    def get_stats(self) -> dict:
+        total = self._stats["executed"] + self._stats["coalesced"]
+        return {
+            **self._stats,
+            "in_flight": len(self._inflight),
+            "coalesced_rate": round(self._stats["coalesced"] / total, 4) if total else 0.0,
+        }
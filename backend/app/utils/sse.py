@@ -0,0 +1,8 @@
+# app/utils/sse.py
+import json
+
+
+def format_sse(event: str, data) -> str:
+    """Định dạng một Server-Sent Event."""
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {event}\ndata: {payload}\n\n"
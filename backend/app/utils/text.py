@@ -0,0 +1,27 @@
+# app/utils/text.py
+import re
+import unicodedata
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Chuẩn hoá prompt để so khớp: NFC, chữ thường, gộp khoảng trắng."""
+    prompt = unicodedata.normalize("NFC", prompt or "")
+    return re.sub(r"\s+", " ", prompt).strip().lower()
+
+
+def fold_text(value: str) -> str:
+    """
+    Bỏ dấu (tiếng Việt/Latin), chữ thường, đổi ký tự không phải chữ/số thành khoảng trắng.
+    VD: "Tô-ki-ô" -> "to ki o", "Đà Nẵng" -> "da nang". Chữ Nhật (kana/kanji) giữ nguyên.
+    """
+    decomposed = unicodedata.normalize("NFKD", value or "")
+    chars = []
+    for ch in decomposed:
+        # Chỉ bỏ dấu đi kèm chữ Latin, tránh làm hỏng dakuten của kana (ド -> ト)
+        if unicodedata.category(ch) == "Mn" and chars and chars[-1] < "ɐ":
+            continue
+        chars.append(ch)
+
+    folded = unicodedata.normalize("NFC", "".join(chars)).lower().replace("đ", "d")
+    folded = "".join(ch if ch.isalnum() else " " for ch in folded)
+    return re.sub(r"\s+", " ", folded).strip()
@@ -0,0 +1,7 @@
+-- Phân trang keyset cho /api/v1/my-trips: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+CREATE INDEX IF NOT EXISTS ix_trips_user_created_id
+    ON trips (user_id, created_at DESC, id DESC);
+
+-- Lấy items của nhiều trip một lần, đã sắp theo ngày / giờ
+CREATE INDEX IF NOT EXISTS ix_trip_items_trip_day_time
+    ON trip_items (trip_id, day_number, time_slot);
@@ -0,0 +1,7 @@
+-- Phân trang keyset toàn bộ trips cho /api/v1/admin/trips/all: ORDER BY created_at DESC, id DESC
+CREATE INDEX IF NOT EXISTS ix_trips_created_id
+    ON trips (created_at DESC, id DESC);
+
+-- Lọc theo vùng rồi sắp theo thời gian tạo
+CREATE INDEX IF NOT EXISTS ix_trips_region_created_id
+    ON trips (region_id, created_at DESC, id DESC);
@@ -0,0 +1,2 @@
+-- Phiên bản của trip cho optimistic concurrency ở PUT /api/v1/trips/{trip_id}
+ALTER TABLE trips ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
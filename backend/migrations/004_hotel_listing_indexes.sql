@@ -0,0 +1,14 @@
+-- GET /api/hotels: mỗi kiểu sort là một range scan trên index (cột, id) cùng chiều,
+-- có hoặc không lọc theo vùng. Giống __table_args__ của app/models/hotel.py.
+CREATE INDEX IF NOT EXISTS ix_hotels_region_id_id ON hotels (region_id, id);
+CREATE INDEX IF NOT EXISTS ix_hotels_region_price_id ON hotels (region_id, price_per_night, id);
+CREATE INDEX IF NOT EXISTS ix_hotels_region_price_desc_id ON hotels (region_id, price_per_night DESC NULLS LAST, id DESC);
+CREATE INDEX IF NOT EXISTS ix_hotels_region_rating_id ON hotels (region_id, rating DESC NULLS LAST, id DESC);
+CREATE INDEX IF NOT EXISTS ix_hotels_region_name_id ON hotels (region_id, name, id);
+CREATE INDEX IF NOT EXISTS ix_hotels_price_id ON hotels (price_per_night, id);
+CREATE INDEX IF NOT EXISTS ix_hotels_price_desc_id ON hotels (price_per_night DESC NULLS LAST, id DESC);
+CREATE INDEX IF NOT EXISTS ix_hotels_rating_id ON hotels (rating DESC NULLS LAST, id DESC);
+CREATE INDEX IF NOT EXISTS ix_hotels_name_id ON hotels (name, id);
+
+-- Lọc ?tags=a&tags=b (tags @> ARRAY[...])
+CREATE INDEX IF NOT EXISTS ix_hotels_tags_gin ON hotels USING gin (tags);
@@ -0,0 +1,48 @@
+-- Tìm kiếm toàn văn + gần đúng cho GET /api/search trên hotels / restaurants / places.
+-- Cột sinh tự động (STORED) nên không cần sửa code ghi dữ liệu; không khai báo trong model ORM.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE EXTENSION IF NOT EXISTS unaccent;
+
+-- unaccent() và array_to_string() không IMMUTABLE nên không dùng trực tiếp được trong
+-- cột sinh tự động / index; bọc lại bằng hàm IMMUTABLE (dictionary chỉ định rõ).
+CREATE OR REPLACE FUNCTION michi_unaccent(value text) RETURNS text
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+    AS $$ SELECT lower(public.unaccent('public.unaccent'::regdictionary, replace(replace(value, 'đ', 'd'), 'Đ', 'D'))) $$;
+
+CREATE OR REPLACE FUNCTION michi_array_to_string(value text[]) RETURNS text
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE
+    AS $$ SELECT array_to_string(value, ' ') $$;
+
+-- Trọng số: A = tên, B = tags, C = mô tả + địa chỉ
+ALTER TABLE hotels
+    ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(michi_unaccent(name), '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(michi_unaccent(michi_array_to_string(tags)), '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(michi_unaccent(description), '') || ' ' || coalesce(michi_unaccent(address), '')), 'C')
+    ) STORED,
+    ADD COLUMN IF NOT EXISTS search_name text GENERATED ALWAYS AS (michi_unaccent(name)) STORED;
+
+ALTER TABLE restaurants
+    ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(michi_unaccent(name), '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(michi_unaccent(michi_array_to_string(tags)), '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(michi_unaccent(description), '') || ' ' || coalesce(michi_unaccent(address), '')), 'C')
+    ) STORED,
+    ADD COLUMN IF NOT EXISTS search_name text GENERATED ALWAYS AS (michi_unaccent(name)) STORED;
+
+ALTER TABLE places
+    ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(michi_unaccent(name), '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(michi_unaccent(michi_array_to_string(tags)), '') || ' ' || coalesce(michi_unaccent(place_type), '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(michi_unaccent(description), '') || ' ' || coalesce(michi_unaccent(address), '')), 'C')
+    ) STORED,
+    ADD COLUMN IF NOT EXISTS search_name text GENERATED ALWAYS AS (michi_unaccent(name)) STORED;
+
+CREATE INDEX IF NOT EXISTS ix_hotels_search_vector ON hotels USING gin (search_vector);
+CREATE INDEX IF NOT EXISTS ix_restaurants_search_vector ON restaurants USING gin (search_vector);
+CREATE INDEX IF NOT EXISTS ix_places_search_vector ON places USING gin (search_vector);
+
+-- Gõ gần đúng / typeahead trên tên (toán tử <% của word_similarity)
+CREATE INDEX IF NOT EXISTS ix_hotels_search_name_trgm ON hotels USING gin (search_name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_restaurants_search_name_trgm ON restaurants USING gin (search_name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_places_search_name_trgm ON places USING gin (search_name gin_trgm_ops);
@@ -0,0 +1,16 @@
+-- Toạ độ của hotels / restaurants / places (tính từ map_url khi ghi, dữ liệu cũ:
+-- python -m scripts.backfill_coordinates) và index không gian cho GET /api/nearby.
+ALTER TABLE hotels ADD COLUMN IF NOT EXISTS latitude DOUBLE PRECISION, ADD COLUMN IF NOT EXISTS longitude DOUBLE PRECISION;
+ALTER TABLE restaurants ADD COLUMN IF NOT EXISTS latitude DOUBLE PRECISION, ADD COLUMN IF NOT EXISTS longitude DOUBLE PRECISION;
+ALTER TABLE places ADD COLUMN IF NOT EXISTS latitude DOUBLE PRECISION, ADD COLUMN IF NOT EXISTS longitude DOUBLE PRECISION;
+
+CREATE EXTENSION IF NOT EXISTS cube;
+CREATE EXTENSION IF NOT EXISTS earthdistance;
+
+-- GiST trên điểm 3D (cube) của earthdistance: lọc theo earth_box (bán kính) và KNN với <->
+CREATE INDEX IF NOT EXISTS ix_hotels_earth ON hotels USING gist (ll_to_earth(latitude, longitude))
+    WHERE latitude IS NOT NULL AND longitude IS NOT NULL;
+CREATE INDEX IF NOT EXISTS ix_restaurants_earth ON restaurants USING gist (ll_to_earth(latitude, longitude))
+    WHERE latitude IS NOT NULL AND longitude IS NOT NULL;
+CREATE INDEX IF NOT EXISTS ix_places_earth ON places USING gist (ll_to_earth(latitude, longitude))
+    WHERE latitude IS NOT NULL AND longitude IS NOT NULL;
@@ -0,0 +1,5 @@
+-- GET /api/destinations/{region_id}: top-N và từng trang của mỗi mục sắp theo rating
+-- là một range scan trên (region_id, rating, id). Hotels đã có ix_hotels_region_rating_id (004).
+-- Giống __table_args__ của app/models/restaurant.py và app/models/place.py.
+CREATE INDEX IF NOT EXISTS ix_restaurants_region_rating_id ON restaurants (region_id, rating DESC NULLS LAST, id DESC);
+CREATE INDEX IF NOT EXISTS ix_places_region_rating_id ON places (region_id, rating DESC NULLS LAST, id DESC);
@@ -0,0 +1,19 @@
+-- Upsert ẩm thực của nhà hàng theo (restaurant_id, cuisine_id) (app/services/restaurant_cuisines.py).
+-- Giống __table_args__ của RestaurantCuisine trong app/models/restaurant.py.
+
+-- Bỏ các dòng trùng có từ trước, giữ dòng có id lớn nhất (bản được thêm sau cùng)
+DELETE FROM restaurant_cuisines rc
+USING restaurant_cuisines newer
+WHERE newer.restaurant_id = rc.restaurant_id
+  AND newer.cuisine_id = rc.cuisine_id
+  AND newer.id > rc.id;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint WHERE conname = 'uq_restaurant_cuisines_restaurant_cuisine'
+    ) THEN
+        ALTER TABLE restaurant_cuisines
+            ADD CONSTRAINT uq_restaurant_cuisines_restaurant_cuisine UNIQUE (restaurant_id, cuisine_id);
+    END IF;
+END $$;
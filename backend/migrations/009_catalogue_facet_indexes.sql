@@ -0,0 +1,5 @@
+-- GET /api/facets/{kind}: lọc ?tags=a&tags=b (tags @> ARRAY[...]) trên restaurants / places.
+-- Hotels đã có ix_hotels_tags_gin (004); restaurant_cuisines dùng uq_restaurant_cuisines_restaurant_cuisine (008).
+-- Giống __table_args__ của app/models/restaurant.py và app/models/place.py.
+CREATE INDEX IF NOT EXISTS ix_restaurants_tags_gin ON restaurants USING gin (tags);
+CREATE INDEX IF NOT EXISTS ix_places_tags_gin ON places USING gin (tags);
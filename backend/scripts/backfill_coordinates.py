@@ -0,0 +1,73 @@
+"""
+Điền latitude / longitude cho hotels / restaurants / places đã có từ trước,
+bằng cách phân tích map_url (giống lúc ghi). Chạy theo lô, mỗi lô một transaction.
+Chạy lại an toàn: chỉ xử lý các dòng chưa có toạ độ.
+
+Chạy từ thư mục backend (sau migrations/006_coordinates.sql):
+    python -m scripts.backfill_coordinates --batch-size 1000
+"""
+import argparse
+import asyncio
+
+from sqlalchemy import text
+
+from app.core.database import AsyncSessionLocal, engine
+from app.utils.map import extract_lat_lng
+
+TABLES = ("hotels", "restaurants", "places")
+
+
+async def backfill_table(table: str, batch_size: int) -> tuple:
+    scanned = updated = 0
+    last_id = 0
+    while True:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(text(f"""
+                SELECT id, map_url FROM {table}
+                WHERE id > :last_id AND latitude IS NULL AND map_url IS NOT NULL
+                ORDER BY id
+                LIMIT :batch
+            """), {"last_id": last_id, "batch": batch_size})
+            rows = result.fetchall()
+            if not rows:
+                break
+
+            # Keyset theo id: dòng có map_url không phân tích được sẽ không bị đọc lại
+            last_id = rows[-1].id
+            scanned += len(rows)
+
+            ids, lats, lngs = [], [], []
+            for row in rows:
+                lat, lng = extract_lat_lng(row.map_url)
+                if lat is not None:
+                    ids.append(row.id)
+                    lats.append(lat)
+                    lngs.append(lng)
+
+            if ids:
+                await db.execute(text(f"""
+                    UPDATE {table} t
+                    SET latitude = c.lat, longitude = c.lng
+                    FROM unnest(CAST(:ids AS integer[]), CAST(:lats AS float8[]), CAST(:lngs AS float8[]))
+                         AS c(id, lat, lng)
+                    WHERE t.id = c.id
+                """), {"ids": ids, "lats": lats, "lngs": lngs})
+                await db.commit()
+                updated += len(ids)
+
+        print(f"{table}: đã quét {scanned}, đã cập nhật {updated}")
+    return scanned, updated
+
+
+async def main(args):
+    for table in args.tables:
+        scanned, updated = await backfill_table(table, args.batch_size)
+        print(f"== {table}: {updated}/{scanned} dòng có toạ độ hợp lệ")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill latitude/longitude từ map_url")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--tables", nargs="+", choices=TABLES, default=list(TABLES))
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,130 @@
+"""
+Benchmark pipeline tạo lịch trình (/generate) với LLM giả lập, không gọi Groq.
+Đo p50/p95/p99 và throughput. "llm_wait" = thời gian chờ slot LLM (LLM_MAX_CONCURRENCY);
+"overhead" = độ trễ trừ độ trễ giả lập của LLM và llm_wait, tức phần chi phí của
+DB + chọn context + hậu xử lý.
+
+Chạy từ thư mục backend (cần DATABASE_URL):
+    python -m scripts.bench_generate --requests 200 --concurrency 20 --latency-ms 0 --unique
+Giới hạn LLM song song vẫn theo LLM_MAX_CONCURRENCY: --concurrency lớn hơn thì llm_wait tăng.
+"""
+import argparse
+import asyncio
+import contextvars
+import time
+
+from app.core.database import AsyncSessionLocal, engine
+from app.services import ai_service, llm_client
+from app.services.ai_service import run_trip_generation
+
+# Mốc thời gian LLM của request hiện tại: "called" (gọi complete_json), "started" (đã có slot)
+_timing = contextvars.ContextVar("timing", default=None)
+
+PROMPTS = [
+    "3 ngày ở Tokyo",
+    "Kyoto 2 days budget",
+    "Osaka ăn uống 2 ngày",
+    "Hokkaido onsen 4 ngày",
+    "5 ngày khám phá Nhật Bản",
+]
+
+
+class TimedProvider(llm_client.LLMProvider):
+    """Bọc provider để ghi lại lúc lời gọi thật sự bắt đầu (sau khi đã có slot LLM)."""
+
+    def __init__(self, inner: llm_client.LLMProvider):
+        self.inner = inner
+        self.name = inner.name
+
+    async def complete(self, prompt: str, temperature: float) -> tuple[str, int]:
+        timing = _timing.get()
+        if timing is not None:
+            timing["started"] = time.perf_counter()
+        return await self.inner.complete(prompt, temperature)
+
+    def stream(self, prompt: str, temperature: float):
+        return self.inner.stream(prompt, temperature)
+
+
+def _timed(complete_json):
+    async def timed_complete_json(prompt: str, temperature: float = 0.2):
+        timing = _timing.get()
+        if timing is not None:
+            timing["called"] = time.perf_counter()
+        return await complete_json(prompt, temperature)
+    return timed_complete_json
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def _run_one(prompt: str, latencies: list, waits: list, errors: list):
+    timing = {}
+    _timing.set(timing)
+    started = time.perf_counter()
+    try:
+        async with AsyncSessionLocal() as db:
+            await run_trip_generation(prompt, db)
+        latencies.append(time.perf_counter() - started)
+        # Request trúng cache / được gộp không gọi LLM: không chờ slot
+        waits.append(timing["started"] - timing["called"] if "started" in timing else 0.0)
+    except Exception as e:
+        errors.append(str(e))
+
+
+async def main(args):
+    llm_client.set_provider(TimedProvider(llm_client.FakeProvider(latency_ms=args.latency_ms)))
+    ai_service.complete_json = _timed(ai_service.complete_json)
+
+    prompts = [
+        # --unique: mỗi request một prompt khác nhau -> không trúng cache / không bị gộp
+        f"{PROMPTS[i % len(PROMPTS)]} #{i}" if args.unique else PROMPTS[i % len(PROMPTS)]
+        for i in range(args.requests)
+    ]
+
+    # Làm nóng: nạp matcher vùng, snapshot và chỉ mục catalogue
+    await _run_one("warm-up", [], [], [])
+
+    latencies, waits, errors = [], [], []
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def bounded(prompt):
+        async with semaphore:
+            await _run_one(prompt, latencies, waits, errors)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[bounded(p) for p in prompts])
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+
+    llm_latency = args.latency_ms / 1000
+    overhead = sorted(max(0.0, l - llm_latency - w) for l, w in zip(latencies, waits))
+    latencies.sort()
+    waits.sort()
+
+    print(f"requests={args.requests} concurrency={args.concurrency} "
+          f"llm_max_concurrency={llm_client.settings.LLM_MAX_CONCURRENCY} "
+          f"fake_llm_latency={args.latency_ms}ms unique={args.unique}")
+    print(f"ok={len(latencies)} errors={len(errors)} wall={elapsed:.3f}s "
+          f"throughput={len(latencies) / elapsed:.1f} req/s")
+    for label, values in (("latency", latencies), ("llm_wait", waits), ("overhead", overhead)):
+        print(f"{label:>8} (ms): "
+              f"p50={percentile(values, 50) * 1000:.2f} "
+              f"p95={percentile(values, 95) * 1000:.2f} "
+              f"p99={percentile(values, 99) * 1000:.2f} "
+              f"max={(values[-1] if values else 0) * 1000:.2f}")
+    if errors:
+        print(f"first error: {errors[0]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark pipeline /generate với LLM giả lập")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-ms", type=int, default=0, help="Độ trễ giả lập của LLM (ms)")
+    parser.add_argument("--unique", action="store_true", help="Không trùng prompt (bỏ qua cache / gộp request)")
+    asyncio.run(main(parser.parse_args()))
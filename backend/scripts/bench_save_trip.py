@@ -0,0 +1,101 @@
+"""
+Benchmark lưu lịch trình: so sánh cách cũ (mỗi trip_item một INSERT)
+với save_trip hiện tại (một câu lệnh cho trip + mọi item) theo số ngày của lịch trình.
+Mọi thao tác chạy trong transaction và được rollback, không để lại dữ liệu.
+
+Chạy từ thư mục backend (cần DATABASE_URL và một user_id có thật):
+    python -m scripts.bench_save_trip --user-id 1 --days 1 3 7 14 30 --repeat 20
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from sqlalchemy import text
+
+from app.core.database import AsyncSessionLocal, engine
+from app.schemas.trip import SaveTripSchema
+from app.services.trip_service import save_trip, item_columns
+
+ITEMS_PER_DAY = 6
+
+
+def make_trip(days: int) -> SaveTripSchema:
+    itinerary = [
+        {
+            "day": d,
+            "items": [
+                {"time": f"{8 + 2 * i:02d}:00", "activity": f"Hoạt động {i}", "location": f"Địa điểm {d}-{i}",
+                 "type": "place", "price": 1000 * i, "item_id": None, "map_url": None}
+                for i in range(ITEMS_PER_DAY)
+            ],
+        }
+        for d in range(1, days + 1)
+    ]
+    return SaveTripSchema(
+        title=f"Bench {days} ngày", total_days=days, members=2, total_budget=0, budget_per_person=0,
+        guest_name="Bench", guest_phone="0000000000", guest_email="bench@example.com",
+        ai_result={"title": f"Bench {days} ngày", "itinerary": itinerary},
+    )
+
+
+async def legacy_save(db, user_id: int, data: SaveTripSchema):
+    """Cách lưu cũ: INSERT trip rồi INSERT từng item."""
+    result = await db.execute(text("""
+        INSERT INTO trips (user_id, region_id, title, total_days, total_budget, members, budget_per_person,
+                           ai_result, guest_name, guest_phone, guest_email, transport, special_request)
+        VALUES (:u_id, :r_id, :title, :days, :budget, :mems, :b_per_p, :result, :g_name, :g_phone, :g_email, :trans, :spec)
+        RETURNING id
+    """), {
+        "u_id": user_id, "r_id": data.region_id, "title": data.title, "days": data.total_days,
+        "budget": data.total_budget, "mems": data.members, "b_per_p": data.budget_per_person,
+        "result": json.dumps(data.ai_result), "g_name": data.guest_name, "g_phone": data.guest_phone,
+        "g_email": data.guest_email, "trans": data.transport, "spec": data.special_request,
+    })
+    trip_id = result.scalar()
+
+    columns = item_columns(data.ai_result["itinerary"])
+    for i in range(len(columns["i_day"])):
+        await db.execute(text("""
+            INSERT INTO trip_items (trip_id, day_number, time_slot, activity, location, item_type, price,
+                                    image_url, details, map_url, reference_id)
+            VALUES (:t_id, :day, :time, :act, :loc, :type, :price, :img, :det, :m_url, :ref_id)
+        """), {
+            "t_id": trip_id, "day": columns["i_day"][i], "time": columns["i_time"][i], "act": columns["i_act"][i],
+            "loc": columns["i_loc"][i], "type": columns["i_type"][i], "price": columns["i_price"][i],
+            "img": columns["i_img"][i], "det": columns["i_det"][i], "m_url": columns["i_m_url"][i],
+            "ref_id": columns["i_ref_id"][i],
+        })
+    return trip_id
+
+
+async def measure(fn, user_id: int, data: SaveTripSchema, repeat: int) -> list:
+    timings = []
+    for _ in range(repeat):
+        async with AsyncSessionLocal() as db:
+            started = time.perf_counter()
+            await fn(db, user_id, data)
+            timings.append(time.perf_counter() - started)
+            await db.rollback()
+    return timings
+
+
+async def main(args):
+    print(f"{'days':>5} {'items':>6} {'legacy p50 (ms)':>16} {'bulk p50 (ms)':>14} {'speedup':>8}")
+    for days in args.days:
+        data = make_trip(days)
+        legacy = await measure(legacy_save, args.user_id, data, args.repeat)
+        bulk = await measure(save_trip, args.user_id, data, args.repeat)
+        legacy_p50, bulk_p50 = statistics.median(legacy), statistics.median(bulk)
+        print(f"{days:>5} {days * ITEMS_PER_DAY:>6} {legacy_p50 * 1000:>16.2f} {bulk_p50 * 1000:>14.2f} "
+              f"{legacy_p50 / bulk_p50:>7.1f}x")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark lưu lịch trình theo kích thước itinerary")
+    parser.add_argument("--user-id", type=int, required=True)
+    parser.add_argument("--days", type=int, nargs="+", default=[1, 3, 7, 14, 30])
+    parser.add_argument("--repeat", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
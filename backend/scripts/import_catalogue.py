@@ -0,0 +1,84 @@
+"""
+Nhập hàng loạt hotels / restaurants / places từ file CSV, JSONL hoặc XLSX
+(cùng định dạng với POST /api/import/{kind}, xem app/services/catalogue_import.py).
+Dòng lỗi được bỏ qua và in ra cuối; --report ghi toàn bộ báo cáo ra file JSON.
+
+Chạy từ thư mục backend:
+    python -m scripts.import_catalogue hotels data/tokyo_hotels.csv
+    python -m scripts.import_catalogue restaurants data/osaka.xlsx --batch-size 2000 --report report.json
+
+Server đang chạy giữ cache catalogue trong bộ nhớ: truyền --server + --token (token admin, hoặc biến
+môi trường MICHI_ADMIN_TOKEN) để script gọi POST /api/import/refresh sau khi nhập xong.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from app.core.database import AsyncSessionLocal, engine
+from app.services import catalogue_import
+
+
+def notify_server(server: str, token: str, kind: str, region_ids: list):
+    """Báo server đang chạy làm mới cache / chỉ mục của các vùng vừa nhập."""
+    query = urllib.parse.urlencode([("kinds", kind), *[("region_ids", r) for r in region_ids]])
+    request = urllib.request.Request(
+        f"{server.rstrip('/')}/api/import/refresh?{query}",
+        method="POST",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            print(f"== Đã báo server làm mới ({response.status})")
+    except (urllib.error.URLError, OSError) as e:
+        print(f"!! Không báo được server ({e}); khởi động lại server để thấy dữ liệu mới")
+
+
+async def main(args):
+    fmt = args.format or catalogue_import.detect_format(filename=args.path)
+    if fmt is None:
+        raise SystemExit("Không xác định được định dạng, hãy truyền --format csv|jsonl|xlsx")
+
+    started = time.perf_counter()
+    with open(args.path, "rb") as f:
+        async with AsyncSessionLocal() as db:
+            report = await catalogue_import.import_records(
+                db, args.kind, catalogue_import.iter_records(f, fmt), batch_size=args.batch_size
+            )
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+
+    print(f"== {args.kind}: {report['inserted']}/{report['total']} dòng đã nhập, "
+          f"{report['failed']} dòng lỗi, {elapsed:.2f}s")
+    for error in report["errors"][:args.show_errors]:
+        print(f"  dòng {error['row']}: {error['errors']}")
+    if report["failed"] > args.show_errors:
+        print("  ... (xem --report để có đầy đủ)")
+
+    if report["inserted"]:
+        token = args.token or os.getenv("MICHI_ADMIN_TOKEN")
+        if args.server and token:
+            notify_server(args.server, token, args.kind, report["region_ids"])
+        else:
+            print("!! Không có --server / --token: server đang chạy chưa thấy dữ liệu mới cho tới khi khởi động lại")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Nhập hàng loạt catalogue từ CSV / JSONL / XLSX")
+    parser.add_argument("kind", choices=list(catalogue_import.KINDS))
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=catalogue_import.FORMATS, default=None)
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--show-errors", type=int, default=20)
+    parser.add_argument("--report", default=None, help="Ghi báo cáo đầy đủ ra file JSON")
+    parser.add_argument("--server", default=None, help="URL server đang chạy, vd http://localhost:8000")
+    parser.add_argument("--token", default=None, help="Token admin (mặc định: MICHI_ADMIN_TOKEN)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,26 @@
+# tests/test_admin_trips.py
+from datetime import date, datetime
+
+from app.services.trip_service import _admin_page_sql
+
+
+def test_no_filters_no_where():
+    sql, params = _admin_page_sql({}, None, None)
+    assert "WHERE" not in sql and "LIMIT" not in sql
+    assert params == {}
+    assert "ORDER BY t.created_at DESC, t.id DESC" in sql
+
+
+def test_filters_and_keyset_become_params():
+    after = (datetime(2024, 5, 1, 8, 0), 42)
+    sql, params = _admin_page_sql({
+        "region_id": 1, "user_id": None, "created_from": date(2024, 1, 1), "created_to": date(2024, 1, 31),
+        "min_budget": 0, "max_budget": 900,
+    }, after, 11)
+    assert params == {
+        "region_id": 1, "created_from": date(2024, 1, 1), "created_to": date(2024, 1, 31),
+        "min_budget": 0, "max_budget": 900, "after_at": after[0], "after_id": 42, "limit": 11,
+    }
+    assert "t.user_id =" not in sql
+    assert "(t.created_at, t.id) < (:after_at, :after_id)" in sql
+    assert "LIMIT :limit" in sql
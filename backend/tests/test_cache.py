@@ -0,0 +1,107 @@
+# tests/test_cache.py
+import pytest
+
+from app.services import trip_cache
+from app.utils import cache as cache_module
+from app.utils.cache import LRUCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    return clock
+
+
+def test_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" vừa được dùng -> "b" bị loại
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = LRUCache(maxsize=10, ttl=5)
+    cache.set("a", 1)
+    clock.now += 4.9
+    assert cache.get("a") == 1
+    clock.now += 0.2
+    assert cache.get("a", "hết hạn") == "hết hạn"
+    assert len(cache) == 0
+
+
+def test_set_refreshes_ttl(clock):
+    cache = LRUCache(ttl=5)
+    cache.set("a", 1)
+    clock.now += 4
+    cache.set("a", 2)
+    clock.now += 4
+    assert cache.get("a") == 2
+
+
+def test_no_ttl_never_expires(clock):
+    cache = LRUCache()
+    cache.set("a", 1)
+    clock.now += 10 ** 9
+    assert cache.get("a") == 1
+
+
+def test_pop_and_discard_where():
+    cache = LRUCache()
+    for key in [("x", 1), ("x", 2), ("y", 1)]:
+        cache.set(key, key)
+    assert cache.pop(("y", 1)) == ("y", 1)
+    assert cache.pop(("y", 1), "không có") == "không có"
+    assert cache.discard_where(lambda key: key[0] == "x") == 2
+    assert len(cache) == 0
+
+
+@pytest.fixture
+def fresh_trip_cache(monkeypatch):
+    monkeypatch.setattr(trip_cache, "_cache", LRUCache(maxsize=10))
+    monkeypatch.setattr(trip_cache, "_catalogue_versions", trip_cache.defaultdict(int))
+    monkeypatch.setattr(trip_cache, "_stats", dict.fromkeys(trip_cache._stats, 0))
+
+
+def test_trip_cache_key_normalizes_prompt(fresh_trip_cache):
+    assert trip_cache.make_key("  Tokyo   3 NGÀY ", 1) == trip_cache.make_key("tokyo 3 ngày", 1)
+    assert trip_cache.make_key("tokyo", 1) != trip_cache.make_key("tokyo", 2)
+
+
+def test_trip_cache_returns_copies(fresh_trip_cache):
+    key = trip_cache.make_key("tokyo", 1)
+    result = {"itinerary": [{"day": 1}]}
+    trip_cache.put(key, result, tokens=100, latency=2.0)
+    result["itinerary"].clear()
+
+    hit = trip_cache.get(key)
+    assert hit == {"itinerary": [{"day": 1}]}
+    hit["itinerary"].clear()
+    assert trip_cache.get(key) == {"itinerary": [{"day": 1}]}
+
+    stats = trip_cache.get_stats()
+    assert stats["hits"] == 2 and stats["saved_tokens"] == 200
+
+
+def test_invalidation_drops_region_and_global_entries(fresh_trip_cache):
+    keys = {region: trip_cache.make_key("tokyo", region) for region in (1, 2, None)}
+    for key in keys.values():
+        trip_cache.put(key, {"ok": True})
+
+    assert trip_cache.invalidate_regions([1]) == 2
+    assert trip_cache.get(keys[2]) == {"ok": True}
+    assert trip_cache.get(keys[1]) is None and trip_cache.get(keys[None]) is None
+    # Phiên bản catalogue đã tăng: key mới khác key cũ
+    assert trip_cache.make_key("tokyo", 1) != keys[1]
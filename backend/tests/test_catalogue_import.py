@@ -0,0 +1,125 @@
+# tests/test_catalogue_import.py
+import io
+import json
+
+import pytest
+from openpyxl import Workbook
+
+from app.services import catalogue_import
+from app.services.catalogue_import import _prepare_batch, detect_format, iter_records
+
+HOTELS_CSV = (
+    "region_id,name,price_per_night,rating,tags,map_url\n"
+    "1,Hotel A,1200000,4.5,onsen|view,\"https://www.google.com/maps?q=35.0,139.0\"\n"
+    "9,Hotel B,900000,4.0,,\n"
+    "1,,500000,3.0,,\n"
+    "1,Hotel D,rẻ,3.0,,\n"
+    "2,Hotel E,,, ,\n"
+)
+
+
+def _report():
+    return {"kind": "hotels", "total": 0, "inserted": 0, "failed": 0, "errors": [], "errors_truncated": False}
+
+
+def _csv(text_value):
+    return iter_records(io.BytesIO(text_value.encode()), "csv")
+
+
+@pytest.mark.parametrize("content_type, filename, expected", [
+    ("text/csv; charset=utf-8", None, "csv"),
+    ("application/x-ndjson", None, "jsonl"),
+    (None, "hotels.XLSX", "xlsx"),
+    ("application/octet-stream", "data.ndjson", "jsonl"),
+    (None, "hotels.txt", None),
+])
+def test_detect_format(content_type, filename, expected):
+    assert detect_format(content_type, filename) == expected
+
+
+def test_csv_rows_are_cleaned():
+    rows = list(_csv(HOTELS_CSV))
+    assert rows[0] == (1, {
+        "region_id": "1", "name": "Hotel A", "price_per_night": "1200000", "rating": "4.5",
+        "tags": ["onsen", "view"], "map_url": "https://www.google.com/maps?q=35.0,139.0",
+    })
+    # Ô trống bị bỏ để schema dùng giá trị mặc định
+    assert rows[4] == (5, {"region_id": "2", "name": "Hotel E"})
+
+
+def test_prepare_batch_validates_rows_and_references():
+    report = _report()
+    batch, regions, done = _prepare_batch("hotels", _csv(HOTELS_CSV), 100, {1, 2}, set(), report)
+
+    assert done
+    assert [row_no for row_no, _values, _cuisines in batch] == [1, 5]
+    assert regions == {1, 2}
+    values = batch[0][1]
+    assert values["price_per_night"] == 1_200_000 and values["tags"] == ["onsen", "view"]
+    assert (values["latitude"], values["longitude"]) == (35.0, 139.0)
+    assert batch[1][1]["tags"] == [] and batch[1][1]["image_urls"] == []
+
+    assert report["total"] == 5 and report["failed"] == 3
+    errors = {e["row"]: e["errors"] for e in report["errors"]}
+    assert errors[2][0]["loc"] == ["region_id"]
+    assert errors[3][0]["loc"] == ("name",)
+    assert errors[4][0]["loc"] == ("price_per_night",)
+
+
+def test_prepare_batch_stops_at_batch_size():
+    records = _csv(HOTELS_CSV)
+    report = _report()
+    first, _, done = _prepare_batch("hotels", records, 1, {1, 2}, set(), report)
+    assert [r[0] for r in first] == [1] and not done
+    second, _, done = _prepare_batch("hotels", records, 1, {1, 2}, set(), report)
+    assert [r[0] for r in second] == [5] and not done
+    rest, _, done = _prepare_batch("hotels", records, 1, {1, 2}, set(), report)
+    assert rest == [] and done
+
+
+def test_restaurant_cuisine_references():
+    lines = [
+        {"region_id": 1, "name": "Ramen", "cuisines": [{"cuisine_id": 1, "average_price": 900}]},
+        {"region_id": 1, "name": "Lặp", "cuisines": [{"cuisine_id": 1}, {"cuisine_id": 1}]},
+        {"region_id": 1, "name": "Thiếu", "cuisines": [{"cuisine_id": 7}]},
+    ]
+    data = "\n".join(json.dumps(line, ensure_ascii=False) for line in lines) + "\nkhông phải json\n[1]\n"
+    report = _report()
+    batch, _, _ = _prepare_batch("restaurants", iter_records(io.BytesIO(data.encode()), "jsonl"), 100, {1}, {1}, report)
+
+    assert len(batch) == 1
+    assert batch[0][2][0]["cuisine_id"] == 1 and batch[0][2][0]["average_price"] == 900
+    messages = {e["row"]: e["errors"][0]["msg"] for e in report["errors"]}
+    assert "bị lặp" in messages[2]
+    assert "không tồn tại" in messages[3]
+    assert messages[4].startswith("JSON không hợp lệ")
+    assert messages[5] == "Mỗi dòng phải là một object JSON"
+
+
+def test_xlsx_rows():
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["region_id", "name", "average_price"])
+    sheet.append([1, "Chùa Vàng", 500])
+    sheet.append([None, None, None])
+    sheet.append([2, "Đền", None])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+
+    assert list(iter_records(buffer, "xlsx")) == [
+        (1, {"region_id": 1, "name": "Chùa Vàng", "average_price": 500}),
+        (2, {"region_id": 2, "name": "Đền"}),
+    ]
+
+
+def test_broken_file_reports_one_error():
+    rows = list(iter_records(io.BytesIO(b"not a zip"), "xlsx"))
+    assert len(rows) == 1 and rows[0][1].startswith("Không đọc được file")
+
+
+def test_error_list_is_capped(monkeypatch):
+    monkeypatch.setattr(catalogue_import.settings, "IMPORT_MAX_ERRORS", 2)
+    report = _report()
+    _prepare_batch("hotels", _csv("region_id,name\n" + "x,A\n" * 5), 100, {1}, set(), report)
+    assert report["failed"] == 5 and len(report["errors"]) == 2 and report["errors_truncated"]
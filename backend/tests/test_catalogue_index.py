@@ -0,0 +1,70 @@
+# tests/test_catalogue_index.py
+from collections import Counter
+
+from app.services.catalogue_index import CatalogueIndex, tokenize
+
+
+def _doc(kind, item_id, region_id, text_value, rating=0):
+    return {
+        "kind": kind, "id": item_id, "region_id": region_id, "name": text_value,
+        "rating": rating, "line": text_value, "terms": Counter(tokenize(text_value)),
+    }
+
+
+def _index(*docs):
+    index = CatalogueIndex()
+    index.replace_docs(docs)
+    return index
+
+
+def test_tokenize_folds_and_drops_stopwords():
+    assert tokenize("Đi chùa Kinkaku và ăn Ramen") == ["chua", "kinkaku", "ramen"]
+    assert tokenize("金閣寺") == ["金閣", "閣寺"]
+
+
+def test_ranks_by_relevance_and_skips_unrelated():
+    index = _index(
+        _doc("place", 1, 1, "chùa Kinkaku vàng"),
+        _doc("restaurant", 2, 1, "quán ramen ramen Ichiran"),
+        _doc("hotel", 3, 1, "khách sạn gần ga"),
+    )
+    hits = index.search("ăn ramen rồi đi chùa Kinkaku", limit=10)
+    assert {doc["id"] for doc, _score in hits} == {1, 2}
+    assert all(score > 0 for _doc_, score in hits)
+
+
+def test_rare_terms_score_higher():
+    index = _index(
+        _doc("place", 1, 1, "onsen núi"),
+        _doc("place", 2, 1, "onsen biển"),
+        _doc("place", 3, 1, "onsen hakone"),
+    )
+    hits = index.search("onsen hakone")
+    assert hits[0][0]["id"] == 3
+
+
+def test_filters_by_region_and_limit():
+    index = _index(*[_doc("place", i, 1 + i % 2, "công viên sakura") for i in range(10)])
+    hits = index.search("sakura", region_id=2, limit=3)
+    assert len(hits) == 3
+    assert all(doc["region_id"] == 2 for doc, _score in hits)
+
+
+def test_rating_breaks_ties():
+    index = _index(_doc("hotel", 1, 1, "ryokan", rating=3.5), _doc("hotel", 2, 1, "ryokan", rating=4.8))
+    assert [doc["id"] for doc, _score in index.search("ryokan")] == [2, 1]
+
+
+def test_replace_docs_by_region_rebuilds_lazily():
+    index = _index(_doc("place", 1, 1, "đền fushimi"), _doc("place", 2, 2, "đền fushimi"))
+    assert len(index.search("fushimi")) == 2
+    version = index.version
+
+    index.replace_docs([_doc("place", 3, 1, "tháp tokyo")], region_ids=[1])
+    assert index.version != version
+    assert [doc["id"] for doc, _score in index.search("fushimi")] == [2]
+    assert [doc["id"] for doc, _score in index.search("tháp")] == [3]
+
+
+def test_empty_index():
+    assert CatalogueIndex().search("bất kỳ") == []
@@ -0,0 +1,41 @@
+# tests/test_destinations_api.py
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.database import get_db
+from app.main import app
+from app.models.hotel import Hotel
+from app.utils.pagination import cursor_value_ok, encode_keyset
+
+
+async def _no_db():
+    yield None
+
+
+@pytest.fixture
+def client():
+    app.dependency_overrides[get_db] = _no_db
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_db, None)
+
+
+@pytest.mark.parametrize("value, ok", [(4.5, True), (4, True), (None, True), ("4.5", False), (True, False)])
+def test_cursor_value_ok_for_nullable_float(value, ok):
+    assert cursor_value_ok(Hotel.rating, value) is ok
+
+
+@pytest.mark.parametrize("value, ok", [(3, True), (None, False), (3.0, False), ("3", False)])
+def test_cursor_value_ok_for_primary_key(value, ok):
+    assert cursor_value_ok(Hotel.id, value) is ok
+
+
+@pytest.mark.parametrize("cursor", [
+    encode_keyset("hotels", "cao", 3),
+    encode_keyset("hotels", 4.5, "3"),
+    encode_keyset("hotels", 4.5),
+    encode_keyset("spots", 4.5, 3),
+    "###",
+])
+def test_bad_section_cursor_is_400(client, cursor):
+    response = client.get("/api/destinations/1/hotels", params={"cursor": cursor})
+    assert response.status_code == 400
@@ -0,0 +1,91 @@
+# tests/test_facet_service.py
+import asyncio
+from types import SimpleNamespace
+
+from app.services.facet_service import _buckets, _build_sql, get_facets
+
+
+def test_buckets_cover_open_ranges():
+    assert _buckets([100, 200], {"0": 4, "2": 1}) == [
+        {"min": None, "max": 100, "count": 4},
+        {"min": 100, "max": 200, "count": 0},
+        {"min": 200, "max": None, "count": 1},
+    ]
+
+
+def test_default_filters_only_active():
+    sql, params = _build_sql("hotels", {"is_active": "true"})
+    assert params == {"is_active": True}
+    assert "t.is_active = :is_active" in sql
+    assert "FROM hotels t" in sql
+    assert "'cuisine'" not in sql
+
+
+def test_is_active_all_drops_filter():
+    sql, params = _build_sql("places", {"is_active": "all"})
+    assert "is_active" not in params
+    assert "t.is_active" not in sql
+
+
+def test_filters_become_params():
+    sql, params = _build_sql("hotels", {
+        "is_active": "false", "region_id": 3, "tags": ["onsen", "view", "onsen"],
+        "min_price": 100, "max_price": 900, "min_rating": 4.0,
+    })
+    assert params == {
+        "is_active": False, "region_id": 3, "tags": ["onsen", "view"],
+        "min_price": 100, "max_price": 900, "min_rating": 4.0,
+    }
+    assert "t.tags @> CAST(:tags AS text[])" in sql
+    assert "price >= :min_price AND price <= :max_price" in sql
+    assert "rating >= :min_rating" in sql
+
+
+def test_restaurants_add_cuisine_facet_and_filter():
+    sql, params = _build_sql("restaurants", {"cuisine_ids": [5, 2, 5]})
+    assert params["cuisine_ids"] == [2, 5]
+    assert params["cuisine_count"] == 2
+    assert "'cuisine'" in sql
+    assert "HAVING count(DISTINCT cuisine_id) = :cuisine_count" in sql
+
+
+def test_cuisine_ids_ignored_for_other_kinds():
+    sql, params = _build_sql("hotels", {"cuisine_ids": [1]})
+    assert "cuisine_ids" not in params
+    assert "restaurant_cuisines" not in sql
+
+
+
+class FakeDB:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = 0
+
+    async def execute(self, stmt, params=None):
+        self.calls += 1
+        return SimpleNamespace(fetchall=lambda: self.rows)
+
+
+def _facet_row(facet, key, n, label=None):
+    return SimpleNamespace(facet=facet, key=key, label=label, n=n)
+
+
+def test_get_facets_groups_rows_and_always_queries():
+    db = FakeDB([
+        _facet_row("total", None, 7),
+        _facet_row("price", "1", 5),
+        _facet_row("rating", "4", 2),
+        _facet_row("tag", "sushi", 4),
+        _facet_row("cuisine", "3", 2, "Ramen"),
+        _facet_row("cuisine", "1", 6, "Sushi"),
+    ])
+    facets = asyncio.run(get_facets(db, "restaurants", {"is_active": "true"}, price_edges=[200, 100]))
+    asyncio.run(get_facets(db, "restaurants", {"is_active": "true"}, price_edges=[200, 100]))
+
+    assert db.calls == 2  # Cache nằm ở http_cache của API, không ở service
+    assert facets["total"] == 7
+    assert [b["count"] for b in facets["price"]] == [0, 5, 0]
+    assert facets["price"][1] == {"min": 100, "max": 200, "count": 5}
+    assert facets["rating"][4]["count"] == 2
+    assert facets["tags"] == [{"tag": "sushi", "count": 4}]
+    assert [c["name"] for c in facets["cuisines"]] == ["Sushi", "Ramen"]
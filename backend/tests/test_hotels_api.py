@@ -0,0 +1,41 @@
+# tests/test_hotels_api.py
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.database import get_db
+from app.main import app
+from app.utils.pagination import encode_keyset
+
+
+async def _no_db():
+    # Các case dưới đây phải bị từ chối trước khi chạm tới DB
+    yield None
+
+
+@pytest.fixture
+def client():
+    app.dependency_overrides[get_db] = _no_db
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_db, None)
+
+
+@pytest.mark.parametrize("sort, cursor", [
+    ("price_asc", encode_keyset("price_asc", "1500 yen", 3)),
+    ("rating", encode_keyset("rating", 4.5, "3")),
+    ("name", encode_keyset("name", None, 3)),
+    ("id", encode_keyset("id", True, True)),
+    ("price_asc", encode_keyset("price_asc", 100)),
+    ("price_asc", encode_keyset("name", "A", 3)),
+    ("price_asc", "không-phải-cursor"),
+])
+def test_bad_cursor_is_400(client, sort, cursor):
+    response = client.get("/api/hotels", params={"sort": sort, "cursor": cursor})
+    assert response.status_code == 400
+
+
+def test_limit_is_capped(client):
+    assert client.get("/api/hotels", params={"limit": 201}).status_code == 422
+
+
+def test_unknown_field_is_400(client):
+    assert client.get("/api/hotels", params={"fields": "id,password"}).status_code == 400
@@ -0,0 +1,95 @@
+# tests/test_http_cache.py
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.utils import http_cache
+from app.utils.cache import LRUCache
+
+calls = {"n": 0}
+
+app = FastAPI()
+
+
+@app.get("/items")
+async def list_items(page: int = 1, cache: http_cache.CachedResponse = Depends(http_cache.cached("items"))):
+    if (hit := cache.cached()) is not None:
+        return hit
+    calls["n"] += 1
+    return cache.respond([{"page": page, "call": calls["n"]}], headers={"X-Next-Cursor": "abc"})
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(http_cache, "_versions", {})
+    monkeypatch.setattr(http_cache, "_modified", {})
+    monkeypatch.setattr(http_cache, "_bodies", LRUCache(maxsize=16))
+    calls["n"] = 0
+    return TestClient(app)
+
+
+def test_second_read_served_from_memory(client):
+    first = client.get("/items")
+    second = client.get("/items")
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json() == [{"page": 1, "call": 1}]
+    assert second.headers["X-Next-Cursor"] == "abc"
+    assert first.headers["ETag"] == second.headers["ETag"]
+    assert "max-age=" in first.headers["Cache-Control"]
+
+
+def test_if_none_match_gives_304(client):
+    etag = client.get("/items").headers["ETag"]
+    response = client.get("/items", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert client.get("/items", headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_etag_depends_on_query(client):
+    assert client.get("/items?page=1").headers["ETag"] != client.get("/items?page=2").headers["ETag"]
+    # Thứ tự tham số không làm đổi ETag
+    assert client.get("/items?page=2&x=1").headers["ETag"] == client.get("/items?x=1&page=2").headers["ETag"]
+
+
+def test_bump_invalidates(client):
+    etag = client.get("/items").headers["ETag"]
+    http_cache.bump("items")
+    response = client.get("/items", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json() == [{"page": 1, "call": 2}]
+    assert response.headers["ETag"] != etag
+
+    # Tài nguyên khác không ảnh hưởng
+    http_cache.bump("others")
+    assert client.get("/items", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+
+
+def test_if_modified_since(client):
+    response = client.get("/items")
+    last_modified = response.headers["Last-Modified"]
+    assert client.get("/items", headers={"If-Modified-Since": last_modified}).status_code == 304
+    assert client.get("/items", headers={"If-Modified-Since": "not a date"}).status_code == 200
+    assert client.get("/items", headers={"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"}).status_code == 200
+
+
+def test_etag_rolls_over_with_ttl_epoch(client, monkeypatch):
+    monkeypatch.setattr(http_cache.settings, "HTTP_CACHE_TTL_SECONDS", 60)
+    monkeypatch.setattr(http_cache.time, "time", lambda: 6000.0)
+    etag = client.get("/items").headers["ETag"]
+    monkeypatch.setattr(http_cache.time, "time", lambda: 6061.0)
+    response = client.get("/items", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_write_during_query_is_not_cached(client, monkeypatch):
+    original = http_cache.CachedResponse.respond
+
+    def respond_after_write(self, data, model=None, headers=None):
+        http_cache.bump("items")
+        return original(self, data, model=model, headers=headers)
+
+    monkeypatch.setattr(http_cache.CachedResponse, "respond", respond_after_write)
+    client.get("/items")
+    assert len(http_cache._bodies) == 0
@@ -0,0 +1,73 @@
+# tests/test_itinerary_enrichment.py
+import pytest
+
+from app.services import catalogue_index
+from app.services.itinerary_enrichment import classify_item_type, enrich_day, name_similarity
+
+
+def _doc(kind, item_id, region_id, name, price=None, map_url=None, image_url=None):
+    return {"kind": kind, "id": item_id, "region_id": region_id, "name": name,
+            "price": price, "map_url": map_url, "image_url": image_url}
+
+
+CATALOGUE = {
+    ("hotel", 1): _doc("hotel", 1, 1, "Hotel Gracery Shinjuku", price=12000, map_url="https://maps/h1"),
+    ("place", 1): _doc("place", 1, 1, "Senso-ji", image_url="https://img/p1"),
+    ("restaurant", 2): _doc("restaurant", 2, 2, "Ichiran Ramen", price=1000),
+}
+
+
+@pytest.fixture(autouse=True)
+def catalogue(monkeypatch):
+    monkeypatch.setattr(catalogue_index, "lookup", lambda kind, item_id: CATALOGUE.get((kind, item_id)))
+
+
+def _day(*items):
+    return {"day": 1, "items": [dict(item) for item in items]}
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("Khách sạn", "hotel"),
+    ("ăn trưa", "restaurant"),
+    ("Tham quan chùa", "place"),
+    ("???", None),
+    (None, None),
+])
+def test_classify_item_type(value, expected):
+    assert classify_item_type(value) == expected
+
+
+def test_name_similarity():
+    assert name_similarity("Chùa Senso-ji", "chua senso-ji") == 1.0
+    assert name_similarity("Ichiran Ramen Shibuya", "Ichiran Ramen") == 1.0
+    assert name_similarity("Ichiran Ramen", "Ramen Ippudo") == pytest.approx(1 / 3)
+    assert name_similarity("", "Ramen") == 0.0
+
+
+def test_valid_id_gets_catalogue_data_even_if_name_rewritten():
+    day = enrich_day(_day({"item_id": "1", "type": "hotel", "location": "KS ở Shinjuku", "price": 0}), region_id=1)
+    item = day["items"][0]
+    assert item["item_id"] == 1
+    assert item["price"] == 12000 and item["map_url"] == "https://maps/h1"
+
+
+def test_invented_or_out_of_region_ids_are_dropped():
+    day = enrich_day(_day(
+        {"item_id": 99, "type": "place", "location": "Không có", "price": 500},
+        {"item_id": 2, "type": "restaurant", "location": "Ichiran Ramen", "price": 500},
+        {"item_id": True, "type": "place", "location": "Senso-ji"},
+        {"item_id": None, "type": "place", "location": "Tự do"},
+    ), region_id=1)
+    assert [item["item_id"] for item in day["items"]] == [None] * 4
+    # Giá AI ghi được giữ nguyên khi không khớp catalogue
+    assert day["items"][0]["price"] == 500
+
+
+def test_same_id_in_several_kinds_chosen_by_name():
+    day = enrich_day(_day(
+        {"item_id": 1, "type": "", "location": "Senso-ji"},
+        {"item_id": 1, "type": "", "location": "Ga Tokyo"},
+    ), region_id=1)
+    first, second = day["items"]
+    assert first["item_id"] == 1 and first["image_url"] == "https://img/p1"
+    assert second["item_id"] is None
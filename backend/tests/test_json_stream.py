@@ -0,0 +1,48 @@
+# tests/test_json_stream.py
+import json
+
+from app.utils.json_stream import JsonArrayStreamer
+
+PAYLOAD = json.dumps({
+    "title": "Tokyo 2 ngày",
+    "itinerary": [
+        {"day": 1, "items": [{"activity": "Ăn {sushi} \"ngon\"", "tags": ["a]", "b"]}]},
+        {"day": 2, "items": []},
+    ],
+    "budget_summary": {"total_per_person": 1},
+}, ensure_ascii=False)
+
+
+def _feed_all(chunks):
+    streamer = JsonArrayStreamer("itinerary")
+    out = []
+    for chunk in chunks:
+        out.extend(streamer.feed(chunk))
+    return out
+
+
+def test_whole_payload():
+    days = _feed_all([PAYLOAD])
+    assert [d["day"] for d in days] == [1, 2]
+    assert days[0]["items"][0]["activity"] == 'Ăn {sushi} "ngon"'
+
+
+def test_char_by_char_matches_whole():
+    assert _feed_all(list(PAYLOAD)) == json.loads(PAYLOAD)["itinerary"]
+
+
+def test_object_emitted_as_soon_as_it_closes():
+    streamer = JsonArrayStreamer("itinerary")
+    head = '{"itinerary": [{"day": 1, "items": []}'
+    assert streamer.feed(head[:-1]) == []
+    assert streamer.feed(head[-1]) == [{"day": 1, "items": []}]
+
+
+def test_ignores_input_after_array_end():
+    streamer = JsonArrayStreamer("itinerary")
+    assert streamer.feed('{"itinerary": []') == []
+    assert streamer.feed(', "other": [{"day": 9}]}') == []
+
+
+def test_missing_key_yields_nothing():
+    assert _feed_all(['{"days": [{"day": 1}]}']) == []
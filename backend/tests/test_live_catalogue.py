@@ -0,0 +1,80 @@
+# tests/test_live_catalogue.py
+import asyncio
+from types import SimpleNamespace
+
+from app.services.live_catalogue import attach_live_data
+
+
+def _row(row_id, name, price=None, is_active=True):
+    return SimpleNamespace(id=row_id, name=name, price=price, rating=4.0, image_url=None, map_url=None,
+                           is_active=is_active)
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def fetchall(self):
+        return self._rows
+
+
+class FakeDB:
+    """Trả về các dòng có id được hỏi; ghi lại mỗi truy vấn (bảng, ids)."""
+
+    def __init__(self, tables):
+        self.tables = tables
+        self.queries = []
+
+    async def execute(self, stmt, params=None):
+        table = next(name for name in self.tables if f"FROM {name}" in str(stmt))
+        self.queries.append((table, sorted(params["ids"])))
+        return FakeResult([row for row in self.tables[table] if row.id in params["ids"]])
+
+
+def _item(item_id, item_type, location="x"):
+    return {"item_id": item_id, "type": item_type, "location": location}
+
+
+def test_one_query_per_kind_for_whole_response():
+    db = FakeDB({"hotels": [_row(1, "Hotel A", 9000)], "restaurants": [_row(2, "Ramen", 800)], "places": []})
+    trips = [
+        [{"day": 1, "items": [_item(1, "hotel"), _item(2, "restaurant")]}],
+        [{"day": 1, "items": [_item(1, "khách sạn"), _item(None, "place")]}],
+    ]
+    found = asyncio.run(attach_live_data(db, trips))
+
+    assert db.queries == [("hotels", [1]), ("restaurants", [2])]
+    assert set(found) == {("hotel", 1), ("restaurant", 2)}
+    assert trips[0][0]["items"][0]["live"]["price"] == 9000
+    assert trips[1][0]["items"][0]["live"] == trips[0][0]["items"][0]["live"]
+    assert "live" not in trips[1][0]["items"][1]
+
+
+def test_missing_item_of_known_kind_marked_deleted():
+    db = FakeDB({"hotels": [_row(2, "Cũ", is_active=False)], "restaurants": [], "places": []})
+    trips = [[{"day": 1, "items": [_item(1, "hotel"), _item(2, "hotel")]}]]
+    asyncio.run(attach_live_data(db, trips))
+
+    deleted, inactive = trips[0][0]["items"]
+    assert deleted["live"] == {"kind": "hotel", "is_active": False, "deleted": True}
+    assert inactive["live"]["is_active"] is False and "deleted" not in inactive["live"]
+
+
+def test_unknown_kind_resolved_by_name_or_left_empty():
+    db = FakeDB({
+        "hotels": [_row(5, "Hotel Kyoto")],
+        "restaurants": [_row(5, "Ramen Kyoto")],
+        "places": [],
+    })
+    trips = [[{"day": 1, "items": [
+        _item(5, "", location="Ramen Kyoto"),
+        _item(5, "", location="Ga Osaka"),
+        _item(6, ""),
+    ]}]]
+    asyncio.run(attach_live_data(db, trips))
+
+    by_name, ambiguous, unknown = trips[0][0]["items"]
+    assert by_name["live"]["kind"] == "restaurant"
+    assert ambiguous["live"] is None
+    # Không đoán được loại: không khẳng định là đã bị xoá
+    assert unknown["live"] is None
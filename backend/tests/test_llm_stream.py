@@ -0,0 +1,83 @@
+# tests/test_llm_stream.py
+import asyncio
+
+import pytest
+
+from app.services import llm_client
+from app.services.llm_client import FakeProvider, LLMProvider, stream_json
+
+PROMPT = 'YÊU CẦU: "2 ngày ở Tokyo"\nID:1 | Tên:Senso-ji | Loại:temple | Giá:0đ | Map:None'
+
+
+@pytest.fixture(autouse=True)
+def fake_provider():
+    previous = llm_client._provider
+    llm_client.set_provider(FakeProvider(latency_ms=0, chunk_size=32))
+    yield
+    llm_client.set_provider(previous)
+
+
+def _free_slots():
+    return llm_client._llm_semaphore._value
+
+
+def test_stream_yields_full_response():
+    async def collect():
+        return "".join([chunk async for chunk in stream_json(PROMPT)])
+
+    assert asyncio.run(collect()) == FakeProvider().build_response(PROMPT)
+
+
+def test_slot_released_before_client_finishes_reading():
+    async def slow_client():
+        free = _free_slots()
+        chunks = stream_json(PROMPT)
+        await chunks.__anext__()
+        await asyncio.sleep(0.01)  # provider đã trả xong, client chưa đọc hết
+        released = _free_slots() == free
+        await chunks.aclose()
+        return released
+
+    assert asyncio.run(slow_client())
+
+
+def test_client_disconnect_releases_slot():
+    async def disconnect():
+        free = _free_slots()
+        chunks = stream_json(PROMPT)
+        await chunks.__anext__()
+        await chunks.aclose()
+        return _free_slots() == free
+
+    assert asyncio.run(disconnect())
+
+
+class BrokenProvider(LLMProvider):
+    async def complete(self, prompt, temperature):
+        raise RuntimeError("hỏng")
+
+    async def stream(self, prompt, temperature):
+        yield "{"
+        raise RuntimeError("hỏng")
+
+
+def test_provider_error_reaches_client():
+    llm_client.set_provider(BrokenProvider())
+
+    async def collect():
+        return [chunk async for chunk in stream_json(PROMPT)]
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(collect())
+    assert _free_slots() == llm_client.settings.LLM_MAX_CONCURRENCY
+
+
+def test_provider_missing_stream_fails_on_creation():
+    class CompleteOnly(LLMProvider):
+        async def complete(self, prompt, temperature):
+            return "{}", 0
+
+    with pytest.raises(TypeError):
+        CompleteOnly()
+    with pytest.raises(TypeError):
+        LLMProvider()
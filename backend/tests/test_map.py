@@ -0,0 +1,20 @@
+# tests/test_map.py
+import pytest
+
+from app.utils.map import extract_lat_lng
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://www.google.com/maps?q=35.714765,139.796655", (35.714765, 139.796655)),
+    ("https://www.google.com/maps/place/Senso-ji/@35.714765,139.796655,17z", (35.714765, 139.796655)),
+    ("https://www.google.com/maps/@-33.856784,151.215297,15z", (-33.856784, 151.215297)),
+    # "@" ngoài phạm vi: dùng toạ độ trong q=
+    ("https://www.google.com/maps/place/@135.0,139.7,17z?q=35.0116,135.7681", (35.0116, 135.7681)),
+    ("https://www.google.com/maps/@12.5,200.5,15z", (None, None)),
+    ("https://www.google.com/maps?q=Senso-ji", (None, None)),
+    ("https://maps.app.goo.gl/abc", (None, None)),
+    ("", (None, None)),
+    (None, (None, None)),
+])
+def test_extract_lat_lng(url, expected):
+    assert extract_lat_lng(url) == expected
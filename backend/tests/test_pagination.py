@@ -0,0 +1,80 @@
+# tests/test_pagination.py
+import asyncio
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, Table, create_engine, insert, select
+
+from app.utils.pagination import decode_keyset, encode_keyset, keyset_page
+
+metadata = MetaData()
+items = Table("items", metadata, Column("id", Integer, primary_key=True), Column("price", Integer))
+
+PRICES = [300, None, 100, 300, 200, None, 100, 500, None, 200, 300]
+
+
+class SyncDB:
+    """Bọc kết nối SQLite đồng bộ thành giao diện execute bất đồng bộ mà keyset_page dùng."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def execute(self, stmt):
+        return self.conn.execute(stmt)
+
+
+@pytest.fixture(scope="module")
+def db():
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+    with engine.connect() as conn:
+        conn.execute(insert(items), [{"id": i + 1, "price": p} for i, p in enumerate(PRICES)])
+        yield SyncDB(conn)
+
+
+def _expected(descending):
+    rows = [(p, i + 1) for i, p in enumerate(PRICES)]
+    present = sorted((r for r in rows if r[0] is not None), reverse=descending)
+    missing = sorted((r for r in rows if r[0] is None), reverse=descending)
+    return [row_id for _price, row_id in present + missing]
+
+
+def _walk(db, sort_col, descending, limit):
+    seen, after, pages = [], None, 0
+    while True:
+        rows, after = asyncio.run(keyset_page(db, select(items.c.id), sort_col, items.c.id, descending, after, limit))
+        seen += [row.id for row in rows]
+        pages += 1
+        if after is None:
+            return seen, pages
+        # Cursor đi qua JSON như khi gửi cho client
+        after = tuple(decode_keyset(encode_keyset(*after)))
+
+
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("limit", [1, 3, 4, 20])
+def test_walk_visits_every_row_once_with_nulls_last(db, descending, limit):
+    seen, _pages = _walk(db, items.c.price, descending, limit)
+    assert seen == _expected(descending)
+
+
+def test_walk_by_id(db):
+    seen, _pages = _walk(db, items.c.id, True, 4)
+    assert seen == list(range(len(PRICES), 0, -1))
+
+
+def test_no_limit_returns_everything(db):
+    rows, after = asyncio.run(keyset_page(db, select(items.c.id), items.c.price, items.c.id))
+    assert [row.id for row in rows] == _expected(False)
+    assert after is None
+
+
+def test_keyset_roundtrip():
+    cursor = encode_keyset("price_asc", None, 42)
+    assert "=" not in cursor
+    assert decode_keyset(cursor) == ["price_asc", None, 42]
+
+
+@pytest.mark.parametrize("cursor", ["###", "bm90IGpzb24", "eyJhIjogMX0"])
+def test_decode_rejects_garbage(cursor):
+    with pytest.raises(ValueError):
+        decode_keyset(cursor)
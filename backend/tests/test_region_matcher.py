@@ -0,0 +1,59 @@
+# tests/test_region_matcher.py
+from types import SimpleNamespace
+
+from app.services.region_matcher import RegionMatcher
+
+REGIONS = [
+    SimpleNamespace(id=1, name="Tokyo"),
+    SimpleNamespace(id=2, name="Kyoto"),
+    SimpleNamespace(id=3, name="Nara"),
+    SimpleNamespace(id=4, name="Hokkaido"),
+    SimpleNamespace(id=5, name="Nikko"),
+]
+
+
+def _matcher(aliases=None):
+    return RegionMatcher(REGIONS, aliases or {})
+
+
+def test_matches_name_ignoring_case_and_accents():
+    assert _matcher().match("Lịch trình 3 ngày ở TOKYO") == 1
+    assert _matcher().match("đi Tô-ki-ô 2 ngày") == 1
+
+
+def test_matches_japanese_alias_without_spaces():
+    assert _matcher().match("京都で3日間") == 2
+
+
+def test_latin_pattern_must_match_whole_word():
+    assert _matcher().match("ăn món narai") is None
+    assert _matcher().match("đi nara ngắm hươu") == 3
+
+
+def test_longest_then_earliest_match_wins():
+    aliases = {"Hokkaido": ["tokyo bay hokkaido"]}
+    assert _matcher(aliases).match("tokyo bay hokkaido tour") == 4
+    assert _matcher().match("kyoto rồi tokyo") == 2
+
+
+def test_generic_capital_word_does_not_match_kyoto():
+    assert _matcher().match("du lịch kinh đô ánh sáng") is None
+
+
+def test_common_words_do_not_match_regions():
+    assert _matcher().match("温泉に行くなら、3日間") is None
+    assert _matcher().match("日光浴ができるビーチ") is None
+    assert _matcher().match("du lịch Đông Kinh (Hà Nội) 3 ngày") is None
+
+
+def test_standalone_kanji_alias_still_matches():
+    assert _matcher().match("日光で紅葉を見たい") == 5
+    assert _matcher().match("日光浴のあと日光へ") == 5
+
+
+def test_aliases_by_region_id():
+    assert _matcher({"3": ["cố đô nara"]}).match("Co do Nara") == 3
+
+
+def test_no_match():
+    assert _matcher().match("Đà Nẵng 3 ngày") is None
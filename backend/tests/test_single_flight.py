@@ -0,0 +1,87 @@
+# tests/test_single_flight.py
+import asyncio
+
+import pytest
+
+from app.utils.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    async def run():
+        flights = SingleFlight()
+        calls = 0
+
+        async def fn():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"days": [1, 2]}
+
+        results = await asyncio.gather(*[flights.do("k", fn) for _ in range(5)])
+        return calls, results, flights.get_stats()
+
+    calls, results, stats = asyncio.run(run())
+    assert calls == 1
+    assert all(r == {"days": [1, 2]} for r in results)
+    # Lời gọi gộp nhận bản sao, không dùng chung object
+    assert len({id(r) for r in results}) == 5
+    assert stats["executed"] == 1 and stats["coalesced"] == 4 and stats["in_flight"] == 0
+
+
+def test_different_keys_run_separately():
+    async def run():
+        flights = SingleFlight()
+
+        async def fn(value):
+            await asyncio.sleep(0.01)
+            return value
+
+        return await asyncio.gather(flights.do("a", lambda: fn(1)), flights.do("b", lambda: fn(2)))
+
+    assert asyncio.run(run()) == [1, 2]
+
+
+def test_error_reaches_every_waiter_and_key_is_released():
+    async def run():
+        flights = SingleFlight()
+        calls = 0
+
+        async def failing():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            raise ValueError("LLM lỗi")
+
+        results = await asyncio.gather(*[flights.do("k", failing) for _ in range(3)], return_exceptions=True)
+
+        async def ok():
+            return "ok"
+
+        retry = await flights.do("k", ok)
+        return calls, results, retry
+
+    calls, results, retry = asyncio.run(run())
+    assert calls == 1
+    assert all(isinstance(r, ValueError) for r in results)
+    assert retry == "ok"
+
+
+def test_cancelled_waiter_does_not_cancel_shared_call():
+    async def run():
+        flights = SingleFlight()
+        done = asyncio.Event()
+
+        async def fn():
+            await asyncio.sleep(0.02)
+            done.set()
+            return 1
+
+        first = asyncio.create_task(flights.do("k", fn))
+        second = asyncio.create_task(flights.do("k", fn))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second, done.is_set()
+
+    assert asyncio.run(run()) == (1, True)
@@ -0,0 +1,60 @@
+# tests/test_trip_doc_cache.py
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import trip_doc_cache, trip_service
+from app.services.trip_service import load_itineraries, trips_etag
+from app.utils.cache import LRUCache
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(trip_doc_cache, "_cache", LRUCache(maxsize=16))
+
+
+def _trip(trip_id, version=1):
+    return SimpleNamespace(id=trip_id, version=version)
+
+
+def test_entry_only_returned_for_matching_version():
+    itinerary = [{"day": 1, "items": []}]
+    trip_doc_cache.put(1, 2, itinerary)
+    assert trip_doc_cache.get(1, 2) == itinerary
+    assert trip_doc_cache.get(1, 3) is None
+
+    trip_doc_cache.invalidate(1)
+    assert trip_doc_cache.get(1, 2) is None
+
+
+def test_cached_itinerary_is_a_copy():
+    itinerary = [{"day": 1, "items": []}]
+    trip_doc_cache.put(1, 1, itinerary)
+    itinerary[0]["items"].append("x")
+    trip_doc_cache.get(1, 1)[0]["items"].append("y")
+    assert trip_doc_cache.get(1, 1) == [{"day": 1, "items": []}]
+
+
+def test_trips_etag_follows_version_and_variant():
+    etag = trips_etag([_trip(1), _trip(2)], "full")
+    assert etag == trips_etag([_trip(1), _trip(2)], "full")
+    assert etag != trips_etag([_trip(1), _trip(2, version=2)], "full")
+    assert etag != trips_etag([_trip(1)], "full")
+    assert etag != trips_etag([_trip(1), _trip(2)], "summary")
+
+
+def test_load_itineraries_only_fetches_missing_trips(monkeypatch):
+    fetched = []
+
+    async def fake_fetch(db, trip_ids):
+        fetched.append(list(trip_ids))
+        return {trip_id: [{"day": 1, "items": [{"id": trip_id}]}] for trip_id in trip_ids}
+
+    monkeypatch.setattr(trip_service, "fetch_itineraries", fake_fetch)
+
+    first = asyncio.run(load_itineraries(None, [_trip(1), _trip(2)]))
+    second = asyncio.run(load_itineraries(None, [_trip(1), _trip(2, version=2)]))
+
+    assert fetched == [[1, 2], [2]]
+    assert first[1] == second[1]
@@ -0,0 +1,35 @@
+# tests/test_trip_documents.py
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.trip_service import group_itineraries
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+def _item(trip_id, day, time_slot, item_id):
+    return SimpleNamespace(
+        trip_id=trip_id, trip_item_id=item_id, day_number=day, time_slot=time_slot, activity="a", location="l",
+        item_type="place", price=0, image_url=None, map_url=None, details=None, reference_id=None,
+    )
+
+
+def test_group_itineraries_by_trip_and_day():
+    rows = [_item(1, 1, "08:00", 10), _item(1, 1, "12:00", 11), _item(1, 2, "09:00", 12), _item(2, 1, "10:00", 13)]
+    grouped = group_itineraries(rows)
+    assert [d["day"] for d in grouped[1]] == [1, 2]
+    assert [i["id"] for i in grouped[1][0]["items"]] == [10, 11]
+    assert [i["id"] for i in grouped[2][0]["items"]] == [13]
+
+
+def test_cursor_roundtrip():
+    created_at = datetime(2024, 5, 1, 8, 30, tzinfo=timezone.utc)
+    assert decode_cursor(encode_cursor(created_at, 7)) == (created_at, 7)
+
+
+@pytest.mark.parametrize("cursor", ["abc", encode_cursor(datetime(2024, 1, 1), 1)[:-3]])
+def test_bad_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
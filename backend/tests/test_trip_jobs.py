@@ -0,0 +1,160 @@
+# tests/test_trip_jobs.py
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.dependencies import get_current_user
+from app.main import app
+from app.services import trip_jobs
+
+
+def _plan(total_per_person=1500):
+    return {
+        "title": "Tokyo",
+        "region_id": 1,
+        "budget_summary": {"total_per_person": total_per_person, "note": ""},
+        "itinerary": [{"day": 1, "items": [
+            {"time": "08:00", "activity": "Ghé", "location": "Senso-ji", "type": "place", "price": 0},
+        ]}],
+    }
+
+
+class _Session:
+    async def __aenter__(self):
+        return None
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def generation(monkeypatch):
+    """Thay lời gọi LLM bằng hàm giả; trả về dict để test đổi kết quả theo prompt."""
+    results = {}
+
+    async def fake_run(prompt, db):
+        await asyncio.sleep(0.005)
+        value = results.get(prompt, _plan())
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    monkeypatch.setattr(trip_jobs, "run_trip_generation", fake_run)
+    monkeypatch.setattr(trip_jobs, "AsyncSessionLocal", _Session)
+    monkeypatch.setattr(trip_jobs, "_jobs", {})
+    monkeypatch.setattr(trip_jobs, "_pool", asyncio.Semaphore(2))
+    return results
+
+
+def test_job_stays_queued_until_pool_has_a_slot(generation, monkeypatch):
+    async def run():
+        pool = asyncio.Semaphore(1)
+        monkeypatch.setattr(trip_jobs, "_pool", pool)
+        await pool.acquire()  # Pool đang bận
+        job = trip_jobs.submit_job(1, ["a", "b"], concurrency=2)
+        await asyncio.sleep(0.01)
+        queued = job.status
+        pool.release()
+        await job.task
+        return queued, job
+
+    queued, job = asyncio.run(run())
+    assert queued == "queued"
+    assert job.status == "completed" and job.finished_at is not None
+    assert job.progress["succeeded"] == 2
+
+
+def test_results_are_normalised_and_bad_shapes_retried(generation):
+    generation["số thực"] = _plan(total_per_person=1500.0)
+    generation["lẻ"] = _plan(total_per_person=1500.5)
+    generation["chữ"] = _plan(total_per_person="1500 yen")
+
+    async def run():
+        job = trip_jobs.submit_job(1, ["số thực", "lẻ", "chữ"], concurrency=3)
+        await job.task
+        return job
+
+    items = asyncio.run(run()).items
+    assert items[0]["status"] == "succeeded"
+    assert items[0]["result"]["budget_summary"]["total_per_person"] == 1500
+    assert isinstance(items[0]["result"]["budget_summary"]["total_per_person"], int)
+    for item in items[1:]:
+        assert item["status"] == "failed"
+        assert item["attempts"] == trip_jobs.settings.TRIP_JOB_MAX_RETRIES + 1
+
+
+def test_cancel_marks_unfinished_items_failed(generation):
+    async def run():
+        job = trip_jobs.submit_job(1, [str(i) for i in range(10)], concurrency=1)
+        await asyncio.sleep(0.008)
+        trip_jobs.cancel_job(job)
+        with pytest.raises(asyncio.CancelledError):
+            await job.task
+        return job
+
+    job = asyncio.run(run())
+    assert job.status == "cancelled"
+    assert all(item["status"] in ("succeeded", "failed") for item in job.items)
+    assert any(item["error"] == "Job đã bị huỷ" for item in job.items)
+
+
+def test_finished_jobs_pruned_but_running_jobs_kept(generation, monkeypatch):
+    monkeypatch.setattr(trip_jobs.settings, "TRIP_JOB_MAX_JOBS", 1)
+
+    async def run():
+        first = trip_jobs.submit_job(1, ["a"], concurrency=1)
+        await first.task
+        running = trip_jobs.submit_job(1, ["b"], concurrency=1)
+        extra = trip_jobs.submit_job(1, ["c"], concurrency=1)
+        ids = set(trip_jobs._jobs)
+        await asyncio.gather(running.task, extra.task)
+        return first, running, extra, ids
+
+    first, running, extra, ids = asyncio.run(run())
+    assert first.id not in ids
+    assert {running.id, extra.id} <= ids
+
+
+@pytest.fixture
+def client(generation):
+    user = SimpleNamespace(id=7, role="user")
+    app.dependency_overrides[get_current_user] = lambda: user
+    with TestClient(app) as client:
+        yield client
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+def _events(body: str) -> list:
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line)
+        events.append((fields.get("event"), json.loads(fields.get("data", "null"))))
+    return events
+
+
+def test_events_send_each_item_once(client):
+    job_id = client.post("/api/v1/trip-jobs", json={"prompts": [f"p{i}" for i in range(6)], "concurrency": 2}).json()["job_id"]
+
+    events = _events(client.get(f"/api/v1/trip-jobs/{job_id}/events").text)
+    indices = [data["index"] for event, data in events if event == "item"]
+    assert sorted(indices) == list(range(6))
+    assert events[-1][0] == "done"
+
+    # Kết nối lại sau khi xong: nhận lại trạng thái cuối, mỗi item một lần
+    replay = _events(client.get(f"/api/v1/trip-jobs/{job_id}/events").text)
+    assert sorted(data["index"] for event, data in replay if event == "item") == list(range(6))
+
+
+def test_per_user_active_job_cap(client, monkeypatch):
+    monkeypatch.setattr(trip_jobs.settings, "TRIP_JOB_MAX_ACTIVE_PER_USER", 1)
+    monkeypatch.setattr(trip_jobs, "_pool", asyncio.Semaphore(0))  # Không job nào chạy xong
+
+    first = client.post("/api/v1/trip-jobs", json={"prompts": ["a"]})
+    second = client.post("/api/v1/trip-jobs", json={"prompts": ["b"]})
+    assert first.status_code == 200
+    assert second.status_code == 429
+
+    client.delete(f"/api/v1/trip-jobs/{first.json()['job_id']}")
@@ -0,0 +1,38 @@
+# tests/test_trip_schemas.py
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.trip import SaveTripSchema, TripUpdateSchema
+from app.services.trip_service import item_columns
+
+
+def _itinerary(*prices):
+    return [{"day": 1, "items": [{"time": "08:00", "activity": "a", "price": p} for p in prices]}]
+
+
+def _save(itinerary):
+    return SaveTripSchema(
+        title="Tokyo", total_days=1, members=1, total_budget=0, budget_per_person=0,
+        guest_name="A", guest_phone="0900", guest_email="a@example.com",
+        ai_result={"itinerary": itinerary},
+    )
+
+
+def test_numeric_prices_are_saved_as_integers():
+    data = _save(_itinerary(1500, "2000", " 30 ", 400.0, None))
+    assert item_columns(data.ai_result["itinerary"])["i_price"] == [1500, 2000, 30, 400, 0]
+
+
+@pytest.mark.parametrize("price", ["1500 yen", "1,500", "1.500", 12.5, True, [1]])
+def test_non_numeric_price_is_rejected(price):
+    with pytest.raises(ValidationError, match="Giá không hợp lệ"):
+        _save(_itinerary(100, price))
+
+
+def test_update_schema_checks_prices():
+    fields = dict(region_id=1, title="t", total_days=1, total_budget=0, members=1, budget_per_person=0)
+    assert TripUpdateSchema(**fields, itinerary=_itinerary(10)).itinerary[0]["items"][0]["price"] == 10
+    with pytest.raises(ValidationError):
+        TripUpdateSchema(**fields, itinerary=_itinerary("mười nghìn"))
+    with pytest.raises(ValidationError):
+        TripUpdateSchema(**fields, itinerary=[{"day": 1, "items": ["không phải object"]}])
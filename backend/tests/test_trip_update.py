@@ -0,0 +1,138 @@
+# tests/test_trip_update.py
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.schemas.trip import TripUpdateSchema
+from app.services import trip_service
+from app.services.trip_service import diff_items, update_trip
+
+
+def _row(row_id, day, time_slot, location, reference_id=None, price=0):
+    return SimpleNamespace(
+        id=row_id, day_number=day, time_slot=time_slot, activity=f"Ghé {location}", location=location,
+        item_type="place", price=price, image_url=None, details=None, map_url=None, reference_id=reference_id,
+    )
+
+
+def _item(time_slot, location, price=0, **extra):
+    return {"time": time_slot, "activity": f"Ghé {location}", "location": location,
+            "type": "place", "price": price, **extra}
+
+
+CURRENT = [_row(10, 1, "08:00", "Asakusa", 7), _row(11, 1, "12:00", "Ueno"), _row(12, 2, "09:00", "Shibuya")]
+
+
+def test_diff_unchanged_itinerary_writes_nothing():
+    itinerary = [
+        {"day": 1, "items": [_item("08:00", "Asakusa", item_id=7), _item("12:00", "Ueno")]},
+        {"day": 2, "items": [_item("09:00", "Shibuya")]},
+    ]
+    plan = diff_items(CURRENT, itinerary)
+    assert plan == {"insert": [], "update": [], "delete": [], "unchanged": 3}
+
+
+def test_diff_matches_by_id_and_updates_changed_fields():
+    itinerary = [
+        {"day": 1, "items": [_item("08:00", "Asakusa", price=500, id=10, item_id=7)]},
+        {"day": 2, "items": [_item("09:00", "Shibuya", id=12)]},
+    ]
+    plan = diff_items(CURRENT, itinerary)
+    assert [row_id for row_id, _row in plan["update"]] == [10]
+    assert plan["update"][0][1][5] == 500
+    assert plan["delete"] == [11]
+    assert plan["insert"] == []
+    assert plan["unchanged"] == 1
+
+
+def test_diff_keeps_reference_id_when_item_id_missing():
+    itinerary = [{"day": 1, "items": [_item("08:00", "Asakusa", price=900, id=10)]}]
+    plan = diff_items(CURRENT[:1], itinerary)
+    (row_id, row), = plan["update"]
+    assert row_id == 10 and row[-1] == 7
+
+
+def test_diff_reuses_spare_rows_before_inserting():
+    itinerary = [{"day": 3, "items": [_item("10:00", f"Mới {i}") for i in range(4)]}]
+    plan = diff_items(CURRENT, itinerary)
+    assert [row_id for row_id, _row in plan["update"]] == [10, 11, 12]
+    assert len(plan["insert"]) == 1
+    assert plan["delete"] == []
+
+
+class FakeResult:
+    def __init__(self, scalar=None, rows=()):
+        self._scalar = scalar
+        self._rows = list(rows)
+
+    def scalar(self):
+        return self._scalar
+
+    def fetchall(self):
+        return self._rows
+
+
+class FakeDB:
+    """AsyncSession giả: trả kết quả dựng sẵn theo câu SQL, ghi lại các lệnh đã chạy."""
+
+    def __init__(self, new_version=None, current_version=None, rows=()):
+        self.new_version = new_version
+        self.current_version = current_version
+        self.rows = rows
+        self.executed = []
+
+    async def execute(self, stmt, params=None):
+        self.executed.append((stmt, params))
+        if stmt is trip_service._UPDATE_TRIP_SQL:
+            return FakeResult(scalar=self.new_version)
+        if stmt is trip_service._CURRENT_ITEMS_SQL:
+            return FakeResult(rows=self.rows)
+        if "SELECT version FROM trips" in str(stmt):
+            return FakeResult(scalar=self.current_version)
+        return FakeResult()
+
+
+def _update(itinerary, version=None):
+    return TripUpdateSchema(
+        region_id=1, title="Tokyo", total_days=2, total_budget=1000, members=2,
+        budget_per_person=500, itinerary=itinerary, version=version,
+    )
+
+
+def test_update_trip_writes_only_changes():
+    db = FakeDB(new_version=4, rows=CURRENT)
+    itinerary = [{"day": 1, "items": [_item("08:00", "Asakusa", id=10, item_id=7), _item("13:00", "Ueno", id=11)]}]
+
+    result = asyncio.run(update_trip(db, 5, _update(itinerary, version=3)))
+
+    assert result == {"version": 4, "changes": {"inserted": 0, "updated": 1, "deleted": 1, "unchanged": 1}}
+    statements = [stmt for stmt, _params in db.executed]
+    assert trip_service._BULK_UPDATE_ITEMS_SQL in statements
+    assert trip_service._BULK_DELETE_ITEMS_SQL in statements
+    assert trip_service._BULK_INSERT_ITEMS_SQL not in statements
+    assert db.executed[0][1]["version"] == 3
+
+
+def test_update_trip_version_conflict_is_409():
+    db = FakeDB(new_version=None, current_version=6)
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(update_trip(db, 5, _update([], version=3)))
+    assert exc.value.status_code == 409
+    assert "6" in exc.value.detail
+    assert trip_service._CURRENT_ITEMS_SQL not in [stmt for stmt, _params in db.executed]
+
+
+def test_update_missing_trip_is_404():
+    db = FakeDB(new_version=None, current_version=None)
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(update_trip(db, 5, _update([])))
+    assert exc.value.status_code == 404
+
+
+def test_update_without_version_overwrites():
+    db = FakeDB(new_version=2, rows=[])
+    result = asyncio.run(update_trip(db, 5, _update([{"day": 1, "items": [_item("08:00", "Ueno")]}])))
+    assert db.executed[0][1]["version"] is None
+    assert result["changes"]["inserted"] == 1
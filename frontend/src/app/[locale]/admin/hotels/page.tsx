@@ -86,7 +86,7 @@ export default function HotelsManagement() {
     const fetchHotels = async () => {
         setLoading(true);
         try {
-            const res = await fetch(API_ROUTES.ADMIN.HOTELS);
+            const res = await fetch(`${API_ROUTES.ADMIN.HOTELS}?all=true`);
             const data = await res.json();
 
             const sanitizedData = Array.isArray(data)
@@ -28,7 +28,7 @@ export default function AdminTripsPage() {
                 }
 
                 // 2. Gọi API với token động
-                const response = await fetch('http://localhost:8000/api/v1/admin/trips/all', {
+                const response = await fetch('http://localhost:8000/api/v1/admin/trips/all?all=true', {
                     method: 'GET',
                     headers: {
                         'accept': 'application/json',
@@ -74,7 +74,7 @@ export default function AITripPlanner() {
     const fetchMyTrips = async () => {
         try {
             const token = localStorage.getItem("michi_token");
-            const res = await fetch("http://localhost:8000/api/v1/my-trips", {
+            const res = await fetch("http://localhost:8000/api/v1/my-trips?all=true", {
                 headers: { "Authorization": `Bearer ${token}` }
             });
 